@@ -9,9 +9,8 @@ from PyQt5.QtWidgets import (
     QLabel,
     QComboBox,
 )
-from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import (
-    QFontMetrics,
     QPainter,
     QFont,
     QIcon,
@@ -19,14 +18,30 @@ from PyQt5.QtGui import (
     QColor,
     QStandardItemModel,
     QStandardItem,
-    QLinearGradient,
+)
+import cardcache
+import fontcache
+from cardcache import paint_card
+from model import (
+    Activity,
+    DAY_END,
+    DAY_START,
+    DAYS,
+    PASTEL_COLORS,
+    GRADIENT_COLORS,
+    format_slot,
+    pack_color,
 )
 
 
 class ActivityDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(
+        self, parent=None, schedule=None, day_range=(DAY_START, DAY_END)
+    ):
         super().__init__(parent)
         self.setWindowTitle("Adicionar Atividade Acadêmica")
+        self.schedule = schedule  # usado só para sugerir horários livres
+        self.day_range = day_range
 
         self.code = QLineEdit()
         self.title = QLineEdit()
@@ -38,30 +53,14 @@ class ActivityDialog(QDialog):
 
         self.day_combo = QComboBox()
         self.day_combo.addItem("(Dia)")
-        self.PASTEL_COLORS = [
-            ("Azul", "#66c5cc"),
-            ("Verde", "#87c55f"),
-            ("Amarelo", "#f6cf71"),
-            ("Laranja", "#f89c74"),
-            ("Rosa", "#fe88b1"),
-            ("Lilás", "#dcb0f2"),
-            ("Cinza", "#dbdbdb"),
-        ]
-        self.GRADIENT_COLORS = [
-            ("Azul", "#448388"),
-            ("Verde", "#4e743b"),
-            ("Amarelo", "#a59357"),
-            ("Laranja", "#9a6850"),
-            ("Rosa", "#a7627d"),
-            ("Lilás", "#88739b"),
-            ("Cinza", "#818585"),
-        ]
+        self.PASTEL_COLORS = PASTEL_COLORS
+        self.GRADIENT_COLORS = GRADIENT_COLORS
         model = self.day_combo.model()
         item = model.item(0)
         if item:
             item.setSelectable(False)
             item.setEnabled(False)
-        self.day_combo.addItems(["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"])
+        self.day_combo.addItems(DAYS)
         self.day_combo.setCurrentIndex(1)
         self.code.setPlaceholderText("(Código)")
         self.title.setPlaceholderText("(Título)")
@@ -82,7 +81,7 @@ class ActivityDialog(QDialog):
             p.end()
             icon = QIcon(pix)
             item = QStandardItem(icon, name)
-            item.setData(QColor(hexc), Qt.UserRole)
+            item.setData(pack_color(hexc), Qt.UserRole)
             item.setData(name, Qt.UserRole + 1)  # guarda o nome da cor
             self.color_combo.model().appendRow(item)
 
@@ -93,6 +92,15 @@ class ActivityDialog(QDialog):
         layout.addRow("Início:", self.start_time)
         layout.addRow("Fim:", self.end_time)
         layout.addRow("Cor:", self.color_combo)
+
+        # Sugestões de horários livres, atualizadas a cada alteração
+        self.hint = QLabel()
+        self.hint.setWordWrap(True)
+        layout.addRow(self.hint)
+        self.start_time.timeChanged.connect(self.update_hint)
+        self.end_time.timeChanged.connect(self.update_hint)
+        self.day_combo.currentIndexChanged.connect(self.update_hint)
+
         layout.addWidget(buttons)
 
     def choose_color(self):
@@ -100,54 +108,79 @@ class ActivityDialog(QDialog):
         if col.isValid():
             self.color = col
 
-    def get_data(self):
-        color = self.color_combo.currentData(Qt.UserRole)
-        name = self.color_combo.currentData(Qt.UserRole + 1)
-        return {
-            "day": self.day_combo.currentIndex(),
-            "code": self.code.text(),
-            "title": self.title.text(),
-            "start": self.start_time.time(),
-            "end": self.end_time.time(),
-            "color": color,
-            "color_name": name,
-        }
+    def minutes(self):
+        start, end = self.start_time.time(), self.end_time.time()
+        return start.hour() * 60 + start.minute(), end.hour() * 60 + end.minute()
 
-    def create_widget(self, fonts, parent, height_px):
-        data = self.get_data()
-        time_str = (
-            f"{data['start'].toString('HH:mm')} – {data['end'].toString('HH:mm')}"
+    def get_activity(self):
+        start, end = self.minutes()
+        return Activity(
+            day=self.day_combo.currentIndex() - 1,
+            start=start,
+            end=end,
+            code=self.code.text(),
+            title=self.title.text(),
+            color=self.color_combo.currentData(Qt.UserRole),
+            color_name=self.color_combo.currentData(Qt.UserRole + 1),
         )
-        base_font = QFont(fonts["Poppins-Medium.ttf"], 10)
-        line_h = QFontMetrics(base_font).lineSpacing()
-        rows = height_px // line_h  # usado só para cálculo de linhas de texto
-
-        widget = AdaptiveLabel(fonts, parent=parent)
-        widget.set_parts(data["code"], data["title"], time_str)
 
-        # NÃO usa setFixedHeight — o layout controla o tamanho do widget
-        # widget.setFixedHeight(height_px)  <-- REMOVIDO
+    def update_hint(self):
+        day = self.day_combo.currentIndex() - 1
+        start, end = self.minutes()
+        activity = self.get_activity()
+        # clashes e não o bitset semanal: compara também as datas das regras
+        if (
+            self.schedule is None
+            or day < 0
+            or end <= start
+            or not self.schedule.clashes(activity)
+        ):
+            self.hint.setText("")
+            return
 
-        # Aplica degradê com base no nome da cor
-        grad_dict = dict(self.GRADIENT_COLORS)
-        grad_hex = grad_dict.get(data["color_name"], "#000000")
-        widget.set_gradient_colors(data["color"].name(), grad_hex)
+        day_start, day_end = self.day_range
+        slots = self.schedule.suggest_slots(
+            day,
+            start,
+            end - start,
+            limit=3,
+            day_start=day_start,
+            day_end=day_end,
+            recurrence=activity.recurrence,
+        )
+        if slots:
+            text = ", ".join(format_slot(*slot) for slot in slots)
+            self.hint.setText(f"Horário ocupado. Livres: {text}")
+        else:
+            self.hint.setText("Horário ocupado e sem horários livres dessa duração.")
 
-        return widget
+    def create_widget(self, fonts, parent, height_px):
+        return create_activity_widget(self.get_activity(), fonts, parent, height_px)
 
     def adjust_label_font(self, label):
-        font = label.font()
-        fm = QFontMetrics(font)
+        font = QFont(label.font())  # cópia: mantém itálico, espaçamento etc.
+        fm = fontcache.metrics_for(font, label)
         w = label.width() * 0.9
         text = label.text().replace("\n", " ")
         size = font.pointSize()
         while size > 6 and fm.width(text) > w:
             size -= 1
             font.setPointSize(size)
-            fm = QFontMetrics(font)
+            fm = fontcache.metrics_for(font, label)
         label.setFont(font)
 
 
+def create_activity_widget(activity, fonts, parent, height_px):
+    widget = AdaptiveLabel(fonts, parent=parent)
+    widget.set_parts(activity.code, activity.title, activity.time_str())
+
+    # NÃO usa setFixedHeight — o layout controla o tamanho do widget
+    # Aplica degradê com base no nome da cor
+    widget.set_gradient_colors(activity.color_hex, activity.gradient_color)
+
+    return widget
+
+
 class AdaptiveLabel(QLabel):
     def __init__(self, fonts, parent=None):
         super().__init__(parent)
@@ -164,6 +197,7 @@ class AdaptiveLabel(QLabel):
 
         self.base_color = None
         self.gradient_color = None
+        self.conflict = False  # destaca sobreposições com uma borda
 
     def set_gradient_colors(self, base_hex, grad_hex=None):
         self.base_color = QColor(base_hex)
@@ -171,72 +205,55 @@ class AdaptiveLabel(QLabel):
             QColor(grad_hex) if grad_hex else QColor(base_hex).darker(130)
         )
 
+    def set_conflict(self, conflict):
+        if conflict != self.conflict:
+            self.conflict = conflict
+            self.update()
+
     def set_parts(self, code, title, time):
         self.code, self.title, self.time = code, title, time
         self.update()
 
     def paintEvent(self, e):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.TextAntialiasing)
+        # O cartão pronto fica no cache; repinturas sem mudança são uma cópia
         rect = self.contentsRect().adjusted(4, 4, -4, -4)
-
-        radius = 10
         base = self.base_color or self.palette().window().color()
         grad = self.gradient_color or base.darker(130)
-
-        # Aplica opacidade ao gradiente
-        grad_opaco = QColor(grad)
-        grad_opaco.setAlpha(180)  # valor de 0 (transparente) a 255 (opaco)
-
-        gradient = QLinearGradient(rect.topLeft(), rect.bottomLeft())  # vertical
-
-        # Degradê começa só perto do fim
-        gradient.setColorAt(0.0, base)
-        gradient.setColorAt(0.6, base)
-        gradient.setColorAt(1.0, grad_opaco)
-
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(gradient)
-        painter.drawRoundedRect(rect, radius, radius)
-
-        # Fonte e textos
-        base_font = self.font()
-        line_h = QFontMetrics(base_font).lineSpacing()
-        rows = rect.height() // line_h
-
-        pop = QFont(self.fonts["Poppins-Bold.ttf"], base_font.pointSize())
-        pop.setBold(True)
-        painter.setFont(pop)
-        painter.setPen(self.palette().text().color())
-        painter.drawText(
-            QRect(rect.left(), rect.top(), rect.width(), line_h),
-            Qt.AlignHCenter | Qt.AlignTop,
+        size = self.font().pointSize()
+        line_h = fontcache.metrics_for(self.font(), self).lineSpacing()
+        text_color = self.palette().text().color()
+        dpr = self.devicePixelRatioF()
+        key = (
             self.code,
-        )
-
-        if rows <= 2:
-            return
-
-        inter = QFont(self.fonts["Poppins-Medium.ttf"], base_font.pointSize())
-        painter.setFont(inter)
-        painter.setPen(self.palette().text().color())
-        if rows > 3:
-            self.setWordWrap(True)
-            middle = QRect(
-                rect.left(),
-                rect.top() + line_h,
-                rect.width(),
-                rect.height() - 2 * line_h,
-            )
-            painter.drawText(middle, Qt.TextWordWrap | Qt.AlignCenter, self.title)
-
-        small = QFont(self.fonts["Roboto-Light.ttf"], max(6, base_font.pointSize() - 2))
-        small.setBold(True)
-        painter.setFont(small)
-        painter.setPen(Qt.white)
-        painter.drawText(
-            QRect(rect.left(), rect.bottom() - line_h + 1, rect.width(), line_h),
-            Qt.AlignHCenter | Qt.AlignVCenter,
+            self.title,
             self.time,
+            base.rgba(),
+            grad.rgba(),
+            self.conflict,
+            self.width(),
+            self.height(),
+            dpr,
+            size,
+            text_color.rgba(),
         )
+        pixmap = cardcache.cache.card(
+            key,
+            self.size(),
+            dpr,
+            lambda painter: paint_card(
+                painter,
+                rect,
+                self.code,
+                self.title,
+                self.time,
+                base,
+                grad,
+                self.fonts,
+                size,
+                line_h,
+                text_color,
+                self.conflict,
+            ),
+        )
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, pixmap)
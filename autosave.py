@@ -0,0 +1,133 @@
+# autosave.py
+# Salvamento automático em segundo plano.
+#
+# Rajadas de edições são agrupadas (debounce): o salvamento só dispara depois
+# de `delay_ms` sem novas edições. A gravação roda num QRunnable do
+# QThreadPool, sem travar o laço de eventos. Com snapshot=True o estado é
+# congelado na thread principal (Schedule.snapshot, O(n) referências) e
+# passado a save(); destinos que já acompanham as edições sozinhos (o diário)
+# usam snapshot=False e save() é chamado sem argumentos, sem cópia nenhuma.
+# Falhas são tentadas de novo até max_retries vezes, com espera crescente.
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+class _SaveSignals(QObject):
+    done = pyqtSignal(int, str)  # geração salva, mensagem de erro ("" = ok)
+
+
+class _SaveTask(QRunnable):
+    def __init__(self, save, args, generation, signals):
+        super().__init__()
+        self.save = save
+        self.args = args
+        self.generation = generation
+        self.signals = signals
+
+    def run(self):
+        try:
+            self.save(*self.args)
+        except Exception as e:  # reportado pelo sinal, não derruba a thread
+            self.signals.done.emit(self.generation, str(e) or type(e).__name__)
+        else:
+            self.signals.done.emit(self.generation, "")
+
+
+class AutoSaver(QObject):
+    saving = pyqtSignal()
+    saved = pyqtSignal(int)  # geração (nº de edições) gravada
+    failed = pyqtSignal(str)  # falha de uma tentativa
+    abandoned = pyqtSignal(str)  # desistiu depois de max_retries tentativas
+
+    def __init__(
+        self,
+        schedule,
+        save,
+        delay_ms=800,
+        pool=None,
+        parent=None,
+        snapshot=True,
+        max_retries=3,
+    ):
+        super().__init__(parent)
+        self.schedule = schedule
+        self.save = save  # chamado fora da thread principal
+        self.snapshot = snapshot  # False: save() sem o estado
+        self.max_retries = max_retries
+        self.pool = pool or QThreadPool.globalInstance()
+        self.generation = 0  # edições vistas
+        self.saved_generation = 0
+        self.failures = 0  # falhas seguidas
+        self._running = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._start)
+        self._retry = QTimer(self)
+        self._retry.setSingleShot(True)
+        self._retry.timeout.connect(self._start)
+
+        self._signals = _SaveSignals()
+        self._signals.done.connect(self._finished)
+        schedule.subscribe(self._changed)
+
+    @property
+    def delay_ms(self):
+        return self._timer.interval()
+
+    @delay_ms.setter
+    def delay_ms(self, value):
+        self._timer.setInterval(value)
+
+    @property
+    def dirty(self):
+        return self.saved_generation != self.generation
+
+    def _changed(self, event, activity_id, activity):
+        if event in ("add", "add_many", "remove", "move"):
+            self.generation += 1
+            self._timer.start()  # reinicia a contagem a cada edição
+
+    def _start(self):
+        if self._running or not self.dirty:
+            return  # _finished agenda de novo se algo mudou no meio
+        self._running = True
+        self.saving.emit()
+        task = _SaveTask(self.save, self._args(), self.generation, self._signals)
+        self.pool.start(task)
+
+    def _args(self):
+        return (self.schedule.snapshot(),) if self.snapshot else ()
+
+    def _finished(self, generation, error):
+        self._running = False
+        if error:
+            self.failures += 1
+            if self.failures > self.max_retries:
+                # Só tenta de novo na próxima edição
+                self.abandoned.emit(error)
+                return
+            self.failed.emit(error)
+            self._retry.start(self.delay_ms * 2**self.failures)
+            return
+        self.failures = 0
+        # flush() pode já ter gravado uma geração mais nova
+        self.saved_generation = max(self.saved_generation, generation)
+        self.saved.emit(generation)
+        if self.dirty and not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        # Grava o que falta e espera terminar (ao fechar a janela); devolve
+        # False se a gravação falhou
+        self._timer.stop()
+        self._retry.stop()
+        self.pool.waitForDone()
+        if self.dirty:
+            try:
+                self.save(*self._args())
+            except Exception as e:
+                self.abandoned.emit(str(e) or type(e).__name__)
+                return False
+            self.saved_generation = self.generation
+        return True
@@ -0,0 +1,38 @@
+# bench_csvimport.py
+# Importação de uma planilha de 1.000.000 de turmas (meta: poucos segundos).
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from csvimport import find_conflicts, read_csv  # noqa: E402
+
+ROWS = 1_000_000
+DAY_NAMES = ["Seg", "Ter", "Qua", "Qui", "Sex", "segunda", "sexta-feira", "Sáb"]
+
+
+def write_csv(path, rng):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("codigo;titulo;dia;inicio;fim\n")
+        for i in range(ROWS):
+            hour = rng.randrange(7, 21)
+            minute = rng.choice(("00", "30"))
+            day = rng.choice(DAY_NAMES)
+            start, end = f"{hour}:{minute}", f"{hour + 1}:{minute}"
+            f.write(f"C{i % 5000};Turma {i};{day};{start};{end}\n")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "turmas.csv")
+        write_csv(path, random.Random(42))
+
+        t0 = time.perf_counter()
+        result = read_csv(path)
+        t1 = time.perf_counter()
+        rows, _ = find_conflicts(result.table)
+        t2 = time.perf_counter()
+    print(f"leitura: {len(result.table)} linhas em {t1 - t0:.2f} s")
+    print(f"conflitos: {len(rows)} em {(t2 - t1) * 1e3:.1f} ms")
@@ -0,0 +1,83 @@
+# bench_delete.py
+# Custo por remoção no caminho real, de 10 a 100 mil atividades: Schedule.remove
+# (índices de intervalos, bitset de ocupação) e, com a tela offscreen,
+# CronogramaWindow.delete_activity (Schedule + remoção do widget da grade).
+# Na janela o custo ainda cresce com o número de widgets: o QGridLayout
+# procura o item a remover numa lista (as grades --canvas e --table não têm
+# um widget por atividade).
+import datetime
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from main import load_fonts  # noqa: E402
+from model import Activity, Schedule  # noqa: E402
+from recurrence import Recurrence  # noqa: E402
+from scheduler import CronogramaWindow  # noqa: E402
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+WINDOW_SIZES = [10, 100, 1_000, 10_000]  # um widget por atividade na grade
+FIRST_MONDAY = datetime.date(2026, 1, 5)
+
+
+def activities(n):
+    # Cronograma denso de várias semanas: 7 aulas de 2 h por dia, cada uma
+    # numa data só, semana após semana
+    per_week = 7 * 7
+    result = []
+    for i in range(n):
+        week, slot = divmod(i, per_week)
+        day, start = slot % 7, 7 * 60 + 2 * 60 * (slot // 7)
+        date = FIRST_MONDAY + datetime.timedelta(weeks=week, days=day)
+        result.append(
+            Activity(
+                day,
+                start,
+                start + 120,
+                f"C{i}",
+                "Turma",
+                0x66C5CC,
+                "Azul",
+                Recurrence(date, date),
+            )
+        )
+    return result
+
+
+def bench_schedule(n):
+    schedule = Schedule()
+    schedule.add_many(activities(n))
+    order = list(schedule.activities)
+    random.shuffle(order)
+    t0 = time.perf_counter()
+    for activity_id in order:
+        schedule.remove(activity_id)
+    return (time.perf_counter() - t0) / n
+
+
+def bench_window(n, fonts):
+    window = CronogramaWindow(fonts, Schedule())
+    window.add_many(activities(n))
+    order = list(window.schedule.activities)
+    random.shuffle(order)
+    t0 = time.perf_counter()
+    for activity_id in order:
+        window.delete_activity(activity_id)
+    elapsed = (time.perf_counter() - t0) / n
+    window.close()
+    window.deleteLater()
+    return elapsed
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    fonts = load_fonts()
+    print(f"{'atividades':>10}  {'Schedule (µs)':>14}  {'janela (µs)':>12}")
+    for n in SIZES:
+        window = f"{bench_window(n, fonts) * 1e6:>12.1f}" if n in WINDOW_SIZES else ""
+        print(f"{n:>10}  {bench_schedule(n) * 1e6:>14.1f}  {window}")
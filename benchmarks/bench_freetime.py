@@ -0,0 +1,33 @@
+# bench_freetime.py
+# Janelas livres em comum para uma turma de 5.000 alunos (meta: bem menos de 1 s).
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from freetime import common_free_windows  # noqa: E402
+from occupancy import WeekOccupancy  # noqa: E402
+
+STUDENTS = 5_000
+CLASSES_PER_STUDENT = 12
+
+
+def random_week(rng):
+    week = WeekOccupancy()
+    for _ in range(CLASSES_PER_STUDENT):
+        day = rng.randrange(5)
+        start = rng.randrange(7, 20) * 60
+        week.occupy(day, start, start + rng.choice((60, 90, 120)))
+    return week
+
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    cohort = [random_week(rng) for _ in range(STUDENTS)]
+
+    for quorum in (None, 0.8):
+        t0 = time.perf_counter()
+        windows = common_free_windows(cohort, min_minutes=60, quorum=quorum)
+        elapsed = time.perf_counter() - t0
+        print(f"quórum={quorum}: {len(windows)} janelas em {elapsed * 1e3:.1f} ms")
@@ -0,0 +1,78 @@
+# bench_graphicsview.py
+# ScheduleView com 50.000 atividades: quadro de longe (todos os blocos
+# visíveis) e de perto (poucos cartões completos).
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from PyQt5.QtGui import QImage, QPainter  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from graphicsview import ScheduleScene, ScheduleView  # noqa: E402
+from main import load_fonts  # noqa: E402
+from model import PASTEL_COLORS, Activity, Schedule, pack_color  # noqa: E402
+
+ITEMS = 50_000
+FRAMES = 10
+
+
+def room(rng):
+    # Sala ocupada do início ao fim do dia, sem sobreposição (~10 aulas/dia)
+    schedule = Schedule()
+    activities = []
+    for day in range(7):
+        start = 7 * 60
+        while True:
+            end = start + rng.choice((50, 90, 120))
+            if end > 21 * 60:
+                break
+            name, color = rng.choice(PASTEL_COLORS)
+            code = f"C{len(activities)}"
+            activities.append(
+                Activity(day, start, end, code, "Turma", pack_color(color), name)
+            )
+            start = end + rng.choice((0, 10))
+    schedule.add_many(activities)
+    return schedule
+
+
+def render(view, image):
+    image.fill(0)
+    painter = QPainter(image)
+    view.viewport().render(painter)
+    painter.end()
+
+
+def frame_ms(view, image):
+    render(view, image)  # aquece caches (glifos, cartões)
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        render(view, image)
+    return (time.perf_counter() - t0) / FRAMES * 1e3
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    rng = random.Random(42)
+    scene = ScheduleScene(load_fonts())
+    t0 = time.perf_counter()
+    items = 0
+    while items < ITEMS:
+        schedule = room(rng)
+        scene.add_band(f"Sala {len(scene.bands) + 1}", schedule)
+        items += len(schedule)
+    elapsed = time.perf_counter() - t0
+    print(f"{items} itens em {len(scene.bands)} salas, montados em {elapsed:.2f} s")
+
+    view = ScheduleView(scene)
+    view.resize(1400, 900)
+    image = QImage(view.viewport().size(), QImage.Format_ARGB32_Premultiplied)
+
+    view.set_zoom(view.min_scale)
+    view.centerOn(scene.sceneRect().center())
+    print(f"de longe: {frame_ms(view, image):.1f} ms por quadro")
+    view.set_zoom(1.0)
+    view.centerOn(scene.sceneRect().center())
+    print(f"zoom 1: {frame_ms(view, image):.1f} ms por quadro")
@@ -0,0 +1,74 @@
+# bench_tablemodel.py
+# TimetableView com linhas de 10 min cheias: quadro pintado e custo por edição.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from PyQt5.QtGui import QImage, QPainter  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from main import load_fonts  # noqa: E402
+from model import PASTEL_COLORS, Activity, Schedule, pack_color  # noqa: E402
+from tablemodel import TimetableModel, TimetableView  # noqa: E402
+
+SLOT = 10
+EDITS = 1_000
+FRAMES = 30
+
+
+def frame(view, image):
+    image.fill(0)
+    painter = QPainter(image)
+    view.viewport().render(painter)
+    painter.end()
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    schedule = Schedule()
+    activities = []
+    for day in range(7):
+        for n, start in enumerate(range(7 * 60, 21 * 60, 30)):
+            name, color = PASTEL_COLORS[(day + n) % len(PASTEL_COLORS)]
+            activities.append(
+                Activity(
+                    day,
+                    start,
+                    start + 30,
+                    f"C{day}{n}",
+                    "Turma",
+                    pack_color(color),
+                    name,
+                )
+            )
+    schedule.add_many(activities)
+
+    view = TimetableView(load_fonts(), row_height=20)
+    t0 = time.perf_counter()
+    view.setModel(TimetableModel(schedule, slot_minutes=SLOT, parent=view))
+    build = time.perf_counter() - t0
+    view.resize(1200, 900)
+    view.show()
+    app.processEvents()
+    image = QImage(view.viewport().size(), QImage.Format_ARGB32_Premultiplied)
+
+    frame(view, image)
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        frame(view, image)
+    warm = (time.perf_counter() - t0) / FRAMES
+
+    ids = [i for i, _ in schedule.snapshot()]
+    t0 = time.perf_counter()
+    for n in range(EDITS):
+        activity_id = ids[n % len(ids)]
+        a = schedule.get(activity_id)
+        schedule.remove(activity_id)
+        ids[n % len(ids)] = schedule.add(a)
+    app.processEvents()
+    edit = (time.perf_counter() - t0) / EDITS
+
+    print(f"{len(schedule)} atividades, modelo montado em {build * 1e3:.1f} ms")
+    print(f"quadro com cache: {warm * 1e3:.1f} ms ({1 / warm:.0f} fps)")
+    print(f"remover + adicionar: {edit * 1e6:.0f} µs por edição")
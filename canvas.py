@@ -0,0 +1,293 @@
+# canvas.py
+# Grade do cronograma pintada à mão num único widget.
+#
+# Em vez de um widget por atividade num QGridLayout, um só paintEvent desenha
+# linhas, cabeçalhos e cartões direto de uma lista de registros. Cada dia
+# guarda os cartões ordenados pelo início, então tanto a pintura (só a área
+# exposta) quanto o clique (atividade sob o cursor) são buscas com bisect.
+# Atividades sobrepostas dividem a coluna em faixas lado a lado.
+import heapq
+from bisect import bisect_right
+
+from PyQt5.QtCore import QRect, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+import cardcache
+import fontcache
+from cardcache import paint_card
+from model import DAY_END, DAY_START, DAYS, ruler_marks
+
+HEADER_HEIGHT = 28
+CARD_MARGIN = 3
+
+
+class _Card:
+    __slots__ = ("activity_id", "activity", "lane", "lanes", "base", "grad", "time")
+
+    def __init__(self, activity_id, activity):
+        self.activity_id = activity_id
+        self.activity = activity
+        self.lane = 0
+        self.lanes = 1
+        self.base = QColor(activity.color_hex)
+        self.grad = QColor(activity.gradient_color)
+        self.time = activity.time_str()
+
+
+def _assign_lanes(cards):
+    # cards ordenados por início; faixas por grupo de atividades encadeadas
+    group = []
+    free = []  # (fim, faixa) das faixas ocupadas no grupo
+    reach = -1
+    for card in cards:
+        a = card.activity
+        if a.start >= reach and group:
+            lanes = max(c.lane for c in group) + 1
+            for c in group:
+                c.lanes = lanes
+            group, free = [], []
+        if free and free[0][0] <= a.start:
+            _, card.lane = heapq.heappop(free)
+        else:
+            card.lane = len(group) and max(c.lane for c in group) + 1
+        heapq.heappush(free, (a.end, card.lane))
+        group.append(card)
+        reach = max(reach, a.end)
+    if group:
+        lanes = max(c.lane for c in group) + 1
+        for c in group:
+            c.lanes = lanes
+
+
+class TimetableCanvas(QWidget):
+    activityClicked = pyqtSignal(int)
+
+    def __init__(
+        self,
+        fonts,
+        parent=None,
+        day_start=DAY_START,
+        day_end=DAY_END,
+        slot_minutes=60,
+        row_height=60,
+    ):
+        super().__init__(parent)
+        self.fonts = fonts
+        self.day_start = day_start
+        self.day_end = day_end
+        self.slot_minutes = slot_minutes
+        self.row_height = row_height  # pixels por linha da grade
+        self.ruler_width = self.fontMetrics().width("00:00 - 00:00") + 18
+        self.week = None  # segunda-feira exibida; None = todas as semanas
+        self.schedule = None
+        self._activities = {}  # id: Activity
+        self._days = [[] for _ in DAYS]  # _Card por dia, ordenados por início
+        self._starts = [[] for _ in DAYS]
+        self._longest = [0] * len(DAYS)  # maior duração do dia (para o bisect)
+        self._dirty = set(range(len(DAYS)))
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setMinimumHeight(self.sizeHint().height())
+
+    def sizeHint(self):
+        rows = -(-(self.day_end - self.day_start) // self.slot_minutes)
+        return QSize(800, HEADER_HEIGHT + rows * self.row_height + 1)
+
+    # Dados
+
+    def set_activities(self, items):
+        # items: (id, Activity); substitui tudo o que está na tela
+        self._activities = dict(items)
+        self._dirty = set(range(len(DAYS)))
+        self.update()
+
+    def set_schedule(self, schedule):
+        if self.schedule is not None:
+            self.schedule.unsubscribe(self._changed)
+        self.schedule = schedule
+        schedule.subscribe(self._changed)
+        self.set_activities(schedule.snapshot())
+
+    def set_week(self, monday):
+        self.week = monday
+        self._dirty = set(range(len(DAYS)))
+        self.update()
+
+    def _changed(self, event, activity_id, activity):
+        if event == "add":
+            self._activities[activity_id] = activity
+            self._dirty.add(activity.day)
+        elif event == "add_many":
+            for i, a in activity:
+                self._activities[i] = a
+                self._dirty.add(a.day)
+        elif event in ("remove", "before_move"):
+            self._activities.pop(activity_id, None)
+            self._dirty.add(activity.day)
+        elif event == "move":
+            self._activities[activity_id] = activity
+            self._dirty.add(activity.day)
+        self.update()
+
+    def _rebuild(self):
+        for day in self._dirty:
+            cards = [
+                _Card(i, a)
+                for i, a in self._activities.items()
+                if a.day == day and (self.week is None or a.occurs_in_week(self.week))
+            ]
+            cards.sort(key=lambda c: (c.activity.start, c.activity.end))
+            _assign_lanes(cards)
+            self._days[day] = cards
+            self._starts[day] = [c.activity.start for c in cards]
+            self._longest[day] = max((c.activity.duration for c in cards), default=0)
+        self._dirty.clear()
+
+    def _visible(self, day, first, last):
+        # Cartões do dia que cruzam [first, last) em minutos
+        if self._dirty:
+            self._rebuild()
+        starts = self._starts[day]
+        lo = bisect_right(starts, first - self._longest[day])
+        hi = bisect_right(starts, last)
+        for card in self._days[day][lo:hi]:
+            if card.activity.end > first:
+                yield card
+
+    # Geometria
+
+    def column_width(self):
+        return (self.width() - self.ruler_width) / len(DAYS)
+
+    def minute_y(self, minute):
+        offset = (minute - self.day_start) * self.row_height / self.slot_minutes
+        return HEADER_HEIGHT + round(offset)
+
+    def y_minute(self, y):
+        offset = (y - HEADER_HEIGHT) * self.slot_minutes / self.row_height
+        return self.day_start + offset
+
+    def card_rect(self, card):
+        a = card.activity
+        width = self.column_width()
+        lane_width = width / card.lanes
+        left = self.ruler_width + a.day * width + card.lane * lane_width
+        top = self.minute_y(max(a.start, self.day_start))
+        bottom = self.minute_y(min(a.end, self.day_end))
+        return QRect(round(left), top, round(lane_width), bottom - top).adjusted(
+            CARD_MARGIN, CARD_MARGIN, -CARD_MARGIN, -CARD_MARGIN
+        )
+
+    def activity_at(self, pos):
+        # id da atividade sob o ponto (coordenadas do widget), ou None
+        width = self.column_width()
+        day = int((pos.x() - self.ruler_width) // width)
+        if pos.x() < self.ruler_width or not 0 <= day < len(DAYS):
+            return None
+        minute = self.y_minute(pos.y())
+        for card in self._visible(day, minute, minute):
+            if card.activity.start <= minute and self.card_rect(card).contains(pos):
+                return card.activity_id
+        return None
+
+    def mousePressEvent(self, e):
+        activity_id = self.activity_at(e.pos())
+        if activity_id is not None:
+            self.activityClicked.emit(activity_id)
+
+    # Pintura
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        exposed = e.rect()
+        palette = self.palette()
+        text_color = palette.text().color()
+        width = self.column_width()
+        right = self.ruler_width + round(width * len(DAYS))
+
+        # Cabeçalho dos dias
+        painter.setPen(text_color)
+        if exposed.top() < HEADER_HEIGHT:
+            for day, name in enumerate(DAYS):
+                left = round(self.ruler_width + day * width)
+                rect = QRect(left, 0, round(width), HEADER_HEIGHT)
+                painter.drawText(rect, Qt.AlignCenter, name)
+
+        # Régua de horários e linhas, só na faixa exposta
+        first = self.y_minute(exposed.top())
+        last = self.y_minute(exposed.bottom() + 1)
+        line_color = QColor(0, 0, 0, 30)
+        marks = ruler_marks(
+            self.day_start, self.day_end, self.slot_minutes, first, last
+        )
+        for minute, end, text in marks:
+            y = self.minute_y(minute)
+            painter.setPen(line_color)
+            painter.drawLine(self.ruler_width, y, right, y)
+            painter.setPen(text_color)
+            if self.slot_minutes >= 60:
+                rect = QRect(0, y, self.ruler_width - 8, self.minute_y(end) - y)
+                painter.drawText(rect, Qt.AlignRight | Qt.AlignVCenter, text)
+            else:
+                rect = QRect(0, y, self.ruler_width - 8, self.row_height)
+                painter.drawText(rect, Qt.AlignRight | Qt.AlignTop, text)
+        if last >= self.day_end:
+            y = self.minute_y(self.day_end)
+            painter.setPen(line_color)
+            painter.drawLine(self.ruler_width, y, right, y)
+
+        # Cartões: cada um vem pronto do cache de pixmaps
+        size = self.font().pointSize()
+        line_h = fontcache.metrics_for(self.font(), self).lineSpacing()
+        dpr = self.devicePixelRatioF()
+        conflicts = self.schedule.conflict_graph if self.schedule is not None else {}
+        for day in range(len(DAYS)):
+            left = self.ruler_width + day * width
+            if left > exposed.right() or left + width < exposed.left():
+                continue
+            for card in self._visible(day, first, last):
+                rect = self.card_rect(card)
+                if rect.width() <= 0 or rect.height() <= 0:
+                    continue
+                conflict = bool(conflicts.get(card.activity_id))
+                painter.drawPixmap(
+                    rect.topLeft(),
+                    self._card_pixmap(card, rect, conflict, size, line_h, dpr),
+                )
+
+    def _card_pixmap(self, card, rect, conflict, size, line_h, dpr):
+        a = card.activity
+        text_color = self.palette().text().color()
+        key = (
+            a.code,
+            a.title,
+            card.time,
+            card.base.rgba(),
+            card.grad.rgba(),
+            conflict,
+            rect.width(),
+            rect.height(),
+            dpr,
+            size,
+            text_color.rgba(),
+        )
+        local = QRect(0, 0, rect.width(), rect.height())
+        return cardcache.cache.card(
+            key,
+            rect.size(),
+            dpr,
+            lambda painter: paint_card(
+                painter,
+                local.adjusted(1, 1, -1, -1),
+                a.code,
+                a.title,
+                card.time,
+                card.base,
+                card.grad,
+                self.fonts,
+                size,
+                line_h,
+                text_color,
+                conflict,
+            ),
+        )
@@ -0,0 +1,146 @@
+# cardcache.py
+# Desenho dos cartões de atividade e cache dos cartões já prontos.
+#
+# paint_card desenha um cartão (retângulo arredondado com degradê, código,
+# título e horário) em qualquer QPainter, de modo que widgets, telas pintadas
+# à mão e delegates usam o mesmo desenho. CardCache guarda os cartões prontos
+# como QPixmap, com descarte do menos usado (LRU) quando passa do orçamento
+# de memória: rolagens e exposições viram uma só cópia de pixmap.
+from collections import OrderedDict
+
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QColor, QFont, QLinearGradient, QPainter, QPen, QPixmap
+
+import fontcache
+
+CONFLICT_COLOR = QColor("#d7263d")
+
+
+def paint_card(
+    painter,
+    rect,
+    code,
+    title,
+    time,
+    base,
+    grad,
+    fonts,
+    point_size,
+    line_h,
+    text_color,
+    conflict=False,
+):
+    radius = 10
+
+    # Aplica opacidade ao gradiente
+    grad_opaco = QColor(grad)
+    grad_opaco.setAlpha(180)  # valor de 0 (transparente) a 255 (opaco)
+
+    gradient = QLinearGradient(rect.topLeft(), rect.bottomLeft())  # vertical
+
+    # Degradê começa só perto do fim
+    gradient.setColorAt(0.0, base)
+    gradient.setColorAt(0.6, base)
+    gradient.setColorAt(1.0, grad_opaco)
+
+    painter.setPen(QPen(CONFLICT_COLOR, 3) if conflict else Qt.NoPen)
+    painter.setBrush(gradient)
+    painter.drawRoundedRect(rect, radius, radius)
+
+    rows = rect.height() // line_h
+
+    pop = fontcache.font(fonts["Poppins-Bold.ttf"], point_size, QFont.Bold)
+    painter.setFont(pop)
+    painter.setPen(text_color)
+    painter.drawText(
+        QRect(rect.left(), rect.top(), rect.width(), line_h),
+        Qt.AlignHCenter | Qt.AlignTop,
+        code,
+    )
+
+    if rows <= 2:
+        return
+
+    inter = fontcache.font(fonts["Poppins-Medium.ttf"], point_size)
+    painter.setFont(inter)
+    if rows > 3:
+        middle = QRect(
+            rect.left(),
+            rect.top() + line_h,
+            rect.width(),
+            rect.height() - 2 * line_h,
+        )
+        painter.drawText(middle, Qt.TextWordWrap | Qt.AlignCenter, title)
+
+    small_size = max(6, point_size - 2)
+    small = fontcache.font(fonts["Roboto-Light.ttf"], small_size, QFont.Bold)
+    painter.setFont(small)
+    painter.setPen(Qt.white)
+    painter.drawText(
+        QRect(rect.left(), rect.bottom() - line_h + 1, rect.width(), line_h),
+        Qt.AlignHCenter | Qt.AlignVCenter,
+        time,
+    )
+
+
+class CardCache:
+    def __init__(self, budget_bytes=32 << 20):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._pixmaps = OrderedDict()  # chave: (pixmap, bytes)
+
+    def __len__(self):
+        return len(self._pixmaps)
+
+    def get(self, key):
+        entry = self._pixmaps.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pixmaps.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, pixmap):
+        cost = pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        if cost > self.budget_bytes:
+            return  # maior que o orçamento inteiro: não guarda
+        old = self._pixmaps.pop(key, None)
+        if old is not None:
+            self.used_bytes -= old[1]
+        self._pixmaps[key] = (pixmap, cost)
+        self.used_bytes += cost
+        self.trim()
+
+    def trim(self):
+        while self.used_bytes > self.budget_bytes:
+            _, (_, cost) = self._pixmaps.popitem(last=False)
+            self.used_bytes -= cost
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.trim()
+
+    def clear(self):
+        self._pixmaps.clear()
+        self.used_bytes = 0
+
+    def card(self, key, size, dpr, paint):
+        # Pixmap do cartão `key`; se faltar, paint(painter) desenha num novo
+        pixmap = self.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(int(size.width() * dpr), int(size.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setRenderHint(QPainter.TextAntialiasing)
+            paint(painter)
+            painter.end()
+            self.put(key, pixmap)
+        return pixmap
+
+
+cache = CardCache()  # compartilhado por todos os AdaptiveLabel
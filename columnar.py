@@ -0,0 +1,174 @@
+# columnar.py
+# Armazenamento colunar para catálogos inteiros (dezenas de milhares de turmas).
+#
+# Cada campo da Activity vira uma coluna NumPy; textos e cores ficam em
+# tabelas compartilhadas e as colunas guardam só os índices. Filtros são
+# máscaras vetorizadas, e fatiar a tabela devolve uma visão que reaproveita
+# as mesmas colunas, sem cópia.
+import numpy as np
+
+from model import Activity
+
+COLUMNS = {
+    "day": np.int8,
+    "start": np.int16,
+    "end": np.int16,
+    "color": np.uint16,  # índice em ActivityTable.colors
+    "code": np.int32,  # índice em ActivityTable.strings
+    "title": np.int32,
+}
+
+
+class ActivityTable:
+    def __init__(self, capacity=1024):
+        self._columns = {
+            name: np.empty(capacity, dtype) for name, dtype in COLUMNS.items()
+        }
+        self._size = 0
+        self._readonly = False
+        self.strings = []  # textos internados
+        self._string_ids = {}
+        self.colors = []  # (0xRRGGBB, nome)
+        self._color_ids = {}
+
+    @classmethod
+    def from_activities(cls, activities):
+        table = cls()
+        table.extend(activities)
+        return table
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return (self.activity(i) for i in range(self._size))
+
+    def __repr__(self):
+        kind = "visão" if self._readonly else "tabela"
+        return f"<ActivityTable ({kind}) com {self._size} atividades>"
+
+    def __getattr__(self, name):
+        # table.day, table.start... devolvem a coluna como visão
+        if name in COLUMNS:
+            return self._columns[name][: self._size]
+        raise AttributeError(name)
+
+    def string_id(self, text):
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def color_id(self, rgb, name=None):
+        key = (rgb, name)
+        color_id = self._color_ids.get(key)
+        if color_id is None:
+            color_id = self._color_ids[key] = len(self.colors)
+            self.colors.append(key)
+        return color_id
+
+    def _reserve(self, extra):
+        if self._readonly:
+            raise TypeError("visões de ActivityTable são somente leitura")
+        needed = self._size + extra
+        capacity = len(self._columns["day"])
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+
+    def append(self, activity):
+        self.extend([activity])
+
+    def extend(self, activities):
+        rows = [
+            (
+                a.day,
+                a.start,
+                a.end,
+                self.color_id(a.color, a.color_name),
+                self.string_id(a.code),
+                self.string_id(a.title),
+            )
+            for a in activities
+        ]
+        if rows:
+            self.extend_columns(*zip(*rows))
+
+    def extend_columns(self, day, start, end, color, code, title):
+        # Acrescenta colunas já codificadas (índices de cor e de texto)
+        n = len(day)
+        self._reserve(n)
+        values = (day, start, end, color, code, title)
+        for column, value in zip(self._columns.values(), values):
+            column[self._size : self._size + n] = value
+        self._size += n
+
+    def activity(self, i):
+        rgb, color_name = self.colors[self.color[i]]
+        return Activity(
+            int(self.day[i]),
+            int(self.start[i]),
+            int(self.end[i]),
+            self.strings[self.code[i]],
+            self.strings[self.title[i]],
+            rgb,
+            color_name,
+        )
+
+    def _view(self, columns, size):
+        view = ActivityTable.__new__(ActivityTable)
+        view._columns = columns
+        view._size = size
+        view._readonly = True
+        view.strings, view._string_ids = self.strings, self._string_ids
+        view.colors, view._color_ids = self.colors, self._color_ids
+        return view
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Fatia básica do NumPy: visão sobre as mesmas colunas
+            columns = {name: getattr(self, name)[index] for name in COLUMNS}
+            return self._view(columns, len(columns["day"]))
+        if isinstance(index, (int, np.integer)):
+            if not -self._size <= index < self._size:
+                raise IndexError(index)
+            return self.activity(index % self._size)
+        return self.take(index)
+
+    def take(self, index):
+        # Máscara booleana ou vetor de posições; copia só as linhas escolhidas
+        columns = {name: getattr(self, name)[index] for name in COLUMNS}
+        return self._view(columns, len(columns["day"]))
+
+    # Filtros vetorizados: devolvem máscaras booleanas combináveis com & e |
+
+    def on_day(self, day):
+        return self.day == day
+
+    def overlapping(self, start, end):
+        return (self.start < end) & (self.end > start)
+
+    def within(self, start, end):
+        return (self.start >= start) & (self.end <= end)
+
+    def with_color(self, color):
+        # color: 0xRRGGBB, "#rrggbb" ou nome da paleta ("Azul"...)
+        if isinstance(color, str) and not color.startswith("#"):
+            ids = [i for i, (_, name) in enumerate(self.colors) if name == color]
+        else:
+            rgb = int(color.lstrip("#"), 16) if isinstance(color, str) else color
+            ids = [i for i, (value, _) in enumerate(self.colors) if value == rgb]
+        return np.isin(self.color, ids)
+
+    def code_prefix(self, prefix):
+        # O prefixo é testado só nos textos distintos, não em cada linha
+        ids = [i for i, text in enumerate(self.strings) if text.startswith(prefix)]
+        return np.isin(self.code, ids)
+
+    def where(self, mask):
+        return self.take(np.flatnonzero(mask))
@@ -0,0 +1,300 @@
+# csvimport.py
+# Importação em massa de planilhas da secretaria (código, título, dia, início,
+# fim) direto para uma ActivityTable.
+#
+# O CSV é lido em blocos; dias e horários são normalizados de forma vetorizada
+# (np.unique + tabela de conversão: cada texto distinto é interpretado uma só
+# vez). Os conflitos saem de uma passada: as linhas são ordenadas por
+# dia*1440 + início, np.maximum.accumulate separa os grupos de linhas
+# encadeadas e só os grupos com sobreposição são escolhidos linha a linha.
+import argparse
+import csv
+import itertools
+import re
+import sys
+import unicodedata
+
+import numpy as np
+
+from columnar import ActivityTable
+from model import DAYS, PASTEL_COLORS, pack_color
+from occupancy import MINUTES_PER_DAY
+
+HEADERS = {
+    "code": ("code", "codigo", "cod", "disciplina"),
+    "title": ("title", "titulo", "nome", "turma"),
+    "day": ("day", "dia", "weekday"),
+    "start": ("start", "inicio", "hora_inicio", "de"),
+    "end": ("end", "fim", "termino", "hora_fim", "ate"),
+}
+FIELDS = list(HEADERS)
+REPORT_COLUMNS = [
+    "linha",
+    "tipo",
+    "codigo",
+    "dia",
+    "inicio",
+    "fim",
+    "outra_linha",
+    "outro_codigo",
+]
+
+_ENGLISH_DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_TIME = re.compile(r"^(\d{1,2})(?:[:hH]?(\d{2}))?[hH]?$")
+
+
+def _plain(text):
+    # "Sábado" -> "sabado"
+    text = unicodedata.normalize("NFKD", text.strip().lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+_DAY_PREFIXES = {
+    **{_plain(day)[:3]: i for i, day in enumerate(DAYS)},
+    **{day: i for i, day in enumerate(_ENGLISH_DAYS)},
+}
+
+
+def parse_day(text):
+    # "Seg", "segunda-feira", "SÁB", "Mon", "0"... -> 0–6; -1 se inválido
+    text = _plain(text)
+    if text.isdigit():
+        return int(text) if int(text) < 7 else -1
+    return _DAY_PREFIXES.get(text[:3], -1)
+
+
+def parse_time(text):
+    # "8:00", "08:00", "0800", "8h", "8h30" -> minutos; -1 se inválido
+    match = _TIME.match(text.strip())
+    if not match:
+        return -1
+    hours, minutes = int(match.group(1)), int(match.group(2) or 0)
+    if hours > 24 or minutes > 59 or hours * 60 + minutes > MINUTES_PER_DAY:
+        return -1
+    return hours * 60 + minutes
+
+
+def normalize(values, parse):
+    # Interpreta cada valor distinto uma vez e espalha pelo vetor inteiro
+    unique, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    lookup = np.fromiter((parse(u) for u in unique), np.int16, len(unique))
+    return lookup[inverse]
+
+
+def _columns(header):
+    # Posição de cada campo pelo cabeçalho; None se a primeira linha já é dado
+    names = [_plain(h).replace(" ", "_") for h in header]
+    positions = {}
+    for field, aliases in HEADERS.items():
+        for alias in aliases:
+            if alias in names:
+                positions[field] = names.index(alias)
+                break
+    if len(positions) == len(FIELDS):
+        return [positions[field] for field in FIELDS]
+    if positions:
+        missing = ", ".join(f for f in FIELDS if f not in positions)
+        raise ValueError(f"colunas ausentes no cabeçalho: {missing}")
+    return None
+
+
+class CsvImport:
+    def __init__(self):
+        self.table = ActivityTable()
+        self.lines = np.empty(0, np.int64)  # linha do CSV de cada atividade
+        self.errors = []  # (linha, motivo)
+        self._colors = [
+            self.table.color_id(pack_color(hexc), name) for name, hexc in PASTEL_COLORS
+        ]
+
+    def _intern(self, text):
+        return self.table.string_id(text.strip())
+
+    def add_rows(self, rows, first_line):
+        lines = np.arange(first_line, first_line + len(rows))
+        good = [i for i, row in enumerate(rows) if len(row) == len(FIELDS)]
+        if len(good) < len(rows):
+            bad = set(range(len(rows))) - set(good)
+            self.errors.extend(
+                (int(lines[i]), "número de colunas") for i in sorted(bad)
+            )
+            rows = [rows[i] for i in good]
+            lines = lines[good]
+        if not rows:
+            return
+        code, title, day, start, end = zip(*rows)
+
+        day = normalize(day, parse_day)
+        start = normalize(start, parse_time)
+        end = normalize(end, parse_time)
+        # Para textos, ordenar com np.unique sai mais caro que o dicionário
+        code = np.fromiter(map(self._intern, code), np.int32, len(code))
+        title = np.fromiter(map(self._intern, title), np.int32, len(title))
+
+        problems = [
+            (day < 0, "dia inválido"),
+            ((start < 0) | (end < 0), "horário inválido"),
+            (end <= start, "fim antes do início"),
+            (code == self.table.string_id(""), "código vazio"),
+        ]
+        valid = np.ones(len(rows), bool)
+        for mask, reason in problems:
+            mask = mask & valid
+            self.errors.extend((int(line), reason) for line in lines[mask])
+            valid &= ~mask
+
+        # Cor da paleta escolhida pelo código: turmas da mesma disciplina
+        # ficam com a mesma cor
+        colors = np.asarray(self._colors, np.uint16)[code % len(self._colors)]
+        columns = (day, start, end, colors, code, title)
+        self.table.extend_columns(*(column[valid] for column in columns))
+        self.lines = np.concatenate([self.lines, lines[valid]])
+
+
+def read_csv(path, chunk_rows=100_000, encoding="utf-8-sig"):
+    # Lê o arquivo em blocos de chunk_rows linhas; devolve um CsvImport
+    result = CsvImport()
+    with open(path, newline="", encoding=encoding) as fp:
+        sample = fp.read(4096)
+        fp.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(fp, dialect)
+        first = next(reader, None)
+        if first is None:
+            return result
+        order = _columns(first)
+        line = 2
+        if order is None:
+            order = list(range(len(FIELDS)))
+            result.add_rows([first], 1)
+        while True:
+            chunk = list(itertools.islice(reader, chunk_rows))
+            if not chunk:
+                break
+            if order != list(range(len(FIELDS))):
+                chunk = [
+                    [row[i] for i in order] if len(row) > max(order) else row
+                    for row in chunk
+                ]
+            result.add_rows(chunk, line)
+            line += len(chunk)
+    return result
+
+
+def find_conflicts(table):
+    # Escolha gulosa na ordem de início: uma linha é recusada se começa antes
+    # do maior fim entre as linhas mantidas do dia. Devolve (recusadas,
+    # parceiras), a parceira sendo a mantida de maior fim até ali.
+    empty = np.empty(0, np.int64)
+    if not len(table):
+        return empty, empty
+    offset = table.day.astype(np.int64) * MINUTES_PER_DAY
+    starts = offset + table.start
+    ends = offset + table.end
+    order = np.lexsort((ends, starts))
+    starts, ends = starts[order], ends[order]
+
+    # Sem sobreposição com nada antes, a linha abre um grupo e é mantida;
+    # só os grupos com alguma sobreposição precisam da escolha linha a linha
+    reach = np.maximum.accumulate(ends)
+    clash = np.zeros(len(ends), bool)
+    clash[1:] = starts[1:] < reach[:-1]
+    if not clash.any():
+        return empty, empty
+    group = np.cumsum(~clash)
+    positions = np.flatnonzero(np.isin(group, group[clash]))
+
+    rows, partners = [], []
+    current = kept_end = holder = -1
+    for pos, g, start, end in zip(
+        positions.tolist(),
+        group[positions].tolist(),
+        starts[positions].tolist(),
+        ends[positions].tolist(),
+    ):
+        if g != current or start >= kept_end:
+            current, kept_end, holder = g, end, pos
+        else:
+            rows.append(pos)
+            partners.append(holder)
+    return order[rows], order[partners]
+
+
+def write_report(fp, result, conflicts=None):
+    # Relatório CSV: uma linha por erro e por conflito (linha, tipo, ...)
+    table = result.table
+    rows, partners = find_conflicts(table) if conflicts is None else conflicts
+    writer = csv.writer(fp)
+    writer.writerow(REPORT_COLUMNS)
+    for line, reason in sorted(result.errors):
+        writer.writerow([line, reason] + [""] * (len(REPORT_COLUMNS) - 2))
+    strings = table.strings
+    for row, other in zip(rows.tolist(), partners.tolist()):
+        writer.writerow(
+            [
+                int(result.lines[row]),
+                "conflito",
+                strings[table.code[row]],
+                DAYS[table.day[row]],
+                f"{table.start[row] // 60:02d}:{table.start[row] % 60:02d}",
+                f"{table.end[row] // 60:02d}:{table.end[row] % 60:02d}",
+                int(result.lines[other]),
+                strings[table.code[other]],
+            ]
+        )
+
+
+def iter_activity_chunks(path, chunk_size=500, skipped=None, report=None):
+    # Lê e confere o arquivo e gera (lote de Activities, fração) para
+    # Schedule.add_many, como ical.iter_activity_chunks. Fica de fora quem
+    # começa antes de outra terminar (as restantes não se sobrepõem entre si);
+    # erros e conflitos vão para `skipped` e, se pedido, para o relatório.
+    result = read_csv(path)
+    rows, partners = conflicts = find_conflicts(result.table)
+    if skipped is not None:
+        skipped.extend((f"linha {line}", reason) for line, reason in result.errors)
+        lines = result.lines
+        skipped.extend(
+            (f"linha {lines[row]}", f"conflito com a linha {lines[other]}")
+            for row, other in zip(rows.tolist(), partners.tolist())
+        )
+    if report is not None and (len(rows) or result.errors):
+        with open(report, "w", newline="", encoding="utf-8") as fp:
+            write_report(fp, result, conflicts)
+
+    keep = np.ones(len(result.table), bool)
+    keep[rows] = False
+    table = result.table.where(keep)
+    total = len(table) or 1
+    for first in range(0, len(table), chunk_size):
+        chunk = list(table[first : first + chunk_size])
+        yield chunk, min(first + chunk_size, total) / total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Confere uma planilha de turmas")
+    parser.add_argument("csv", help="arquivo CSV (código, título, dia, início, fim)")
+    parser.add_argument(
+        "-r", "--report", help="relatório de conflitos (padrão: stdout)"
+    )
+    args = parser.parse_args(argv)
+
+    result = read_csv(args.csv)
+    conflicts = find_conflicts(result.table)
+    if args.report:
+        with open(args.report, "w", newline="", encoding="utf-8") as fp:
+            write_report(fp, result, conflicts)
+    else:
+        write_report(sys.stdout, result, conflicts)
+    print(
+        f"{len(result.table)} atividades, {len(conflicts[0])} conflitos, "
+        f"{len(result.errors)} linhas com erro",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
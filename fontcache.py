@@ -0,0 +1,77 @@
+# fontcache.py
+# Cache de QFont e QFontMetrics para o processo inteiro.
+#
+# Os cartões de atividade repintam a cada rolagem e redimensionamento; criar
+# fontes e métricas a cada pintura custava mais que desenhar. As entradas são
+# indexadas por (família, tamanho em pontos, peso) e, nas métricas, também
+# pela razão de pixels do dispositivo. metrics_for() indexa pela descrição
+# completa da fonte (itálico, espaçamento, estratégia de estilo...). As fontes
+# devolvidas são compartilhadas: quem precisar alterar uma deve copiá-la
+# (QFont(fonte)).
+from PyQt5.QtGui import QFont, QFontMetrics
+
+_fonts = {}
+_metrics = {}
+hits = 0
+misses = 0
+
+
+def font(family, point_size, weight=QFont.Normal):
+    global hits, misses
+    key = (family, point_size, weight)
+    cached = _fonts.get(key)
+    if cached is None:
+        misses += 1
+        cached = _fonts[key] = QFont(family, point_size, weight)
+    else:
+        hits += 1
+    return cached
+
+
+def metrics(family, point_size, weight=QFont.Normal, device=None):
+    # device (widget, pixmap...) define a razão de pixels; None = tela padrão
+    global hits, misses
+    dpr = device.devicePixelRatioF() if device is not None else 1.0
+    key = (family, point_size, weight, dpr)
+    cached = _metrics.get(key)
+    if cached is None:
+        misses += 1
+        f = font(family, point_size, weight)
+        if device is not None:
+            cached = QFontMetrics(f, device)
+        else:
+            cached = QFontMetrics(f)
+        _metrics[key] = cached
+    else:
+        hits += 1
+    return cached
+
+
+def metrics_for(qfont, device=None):
+    global hits, misses
+    dpr = device.devicePixelRatioF() if device is not None else 1.0
+    key = (
+        qfont.toString(),
+        qfont.letterSpacingType(),
+        qfont.letterSpacing(),
+        qfont.wordSpacing(),
+        qfont.capitalization(),
+        qfont.styleStrategy(),
+        dpr,
+    )
+    cached = _metrics.get(key)
+    if cached is None:
+        misses += 1
+        f = QFont(qfont)  # o chamador pode alterar a sua depois
+        cached = QFontMetrics(f, device) if device is not None else QFontMetrics(f)
+        _metrics[key] = cached
+    else:
+        hits += 1
+    return cached
+
+
+def clear():
+    global hits, misses
+    _fonts.clear()
+    _metrics.clear()
+    hits = misses = 0
@@ -0,0 +1,70 @@
+# freetime.py
+# Busca vetorizada de horários livres em comum para turmas inteiras.
+#
+# As ocupações em bits (occupancy.WeekOccupancy) de cada cronograma são
+# empilhadas numa matriz booleana (cronogramas x dias x minutos) com NumPy;
+# somar ao longo do eixo dos cronogramas dá quantos estão ocupados em cada
+# minuto, e os trechos em que isso cabe no quórum viram as janelas livres.
+import numpy as np
+
+from model import DAY_END, DAY_START  # faixa da grade do CronogramaWindow
+from occupancy import DAYS_PER_WEEK, MINUTES_PER_DAY
+
+_DAY_BYTES = MINUTES_PER_DAY // 8
+
+
+def _occupancy(item):
+    # Aceita Schedule (usa .occupancy) ou WeekOccupancy
+    return getattr(item, "occupancy", item)
+
+
+def occupancy_matrix(schedules, start=DAY_START, end=DAY_END):
+    weeks = [_occupancy(s) for s in schedules]
+    raw = b"".join(
+        bits.to_bytes(_DAY_BYTES, "little") for week in weeks for bits in week.days
+    )
+    packed = np.frombuffer(raw, dtype=np.uint8).reshape(
+        len(weeks), DAYS_PER_WEEK, _DAY_BYTES
+    )
+    # bit 0 = 00:00; desempacota só os bytes que cobrem [start, end)
+    first, last = start // 8, -(-end // 8)
+    bits = np.unpackbits(packed[:, :, first:last], axis=-1, bitorder="little")
+    offset = start - first * 8
+    return bits[:, :, offset : offset + end - start].view(bool)
+
+
+def busy_counts(schedules, start=DAY_START, end=DAY_END):
+    matrix = occupancy_matrix(schedules, start, end)
+    return matrix.sum(axis=0, dtype=np.int32)  # (dias, minutos)
+
+
+def common_free_windows(
+    schedules, min_minutes, quorum=None, start=DAY_START, end=DAY_END
+):
+    # quorum: quantos membros precisam estar livres (int) ou fração (0–1];
+    # None exige todos. Retorna [(dia, início, fim)] em minutos desde 00:00.
+    schedules = list(schedules)
+    total = len(schedules)
+    if not total:
+        return []
+    if quorum is None:
+        needed = total
+    elif isinstance(quorum, float):
+        needed = int(np.ceil(quorum * total))
+    else:
+        needed = quorum
+
+    busy = busy_counts(schedules, start, end)
+    free = total - busy >= needed  # (dias, minutos)
+
+    # Uma coluna falsa em cada ponta separa os dias ao achatar
+    padded = np.zeros((DAYS_PER_WEEK, free.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = free
+    edges = np.diff(padded, axis=1)
+    days, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    keep = ends - starts >= min_minutes
+    return [
+        (int(d), int(s) + start, int(e) + start)
+        for d, s, e in zip(days[keep], starts[keep], ends[keep])
+    ]
@@ -0,0 +1,322 @@
+# graphicsview.py
+# Visão com zoom para vários cronogramas (salas) ou várias semanas lado a lado.
+#
+# Cada atividade é um QGraphicsRectItem, pintado pelo próprio Qt em C++, num
+# QGraphicsScene indexado por árvore BSP: pintura e clique só consultam os
+# itens da área visível. O texto do cartão fica num item filho que só é
+# mostrado com zoom suficiente (nível de detalhe); de longe sobram os blocos
+# coloridos. O zoom é pela roda do mouse, no lugar do cell_height fixo.
+import math
+
+from PyQt5.QtCore import QLineF, QRect, QRectF, QSize, QSizeF, Qt, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor, QPainter, QPen
+from PyQt5.QtWidgets import (
+    QGraphicsItem,
+    QGraphicsRectItem,
+    QGraphicsScene,
+    QGraphicsView,
+    QStyleOptionGraphicsItem,
+)
+
+import cardcache
+import fontcache
+from cardcache import CONFLICT_COLOR, paint_card
+from model import DAY_END, DAY_START, DAYS, WEEK, ruler_marks
+
+COLUMN_WIDTH = 140.0
+MINUTE_HEIGHT = 1.0  # 60 px por hora no zoom 1
+BAND_GAP = 40.0  # espaço entre salas/semanas
+BAND_STRIDE = len(DAYS) * COLUMN_WIDTH + BAND_GAP
+HEADER_HEIGHT = 44.0
+RULER_WIDTH = 96.0
+DETAIL_SCALE = 0.6  # a partir desse zoom os textos aparecem
+CARD_POINT_SIZE = 9
+ACTIVITY_ID = 0  # chave de QGraphicsItem.data com o id da atividade
+ZOOM_STEPS = 4  # tamanhos de cartão em cache por dobra de zoom
+
+
+def _zoom_step(lod):
+    # Arredonda o zoom para cima num degrau fixo (2 ** (k / ZOOM_STEPS)): o
+    # cache guarda um cartão por degrau, e não um por quadro da roda do mouse
+    return 2 ** (math.ceil(math.log2(lod) * ZOOM_STEPS - 1e-9) / ZOOM_STEPS)
+
+
+class _CardText(QGraphicsItem):
+    # Cartão completo (degradê e textos) por cima do bloco do pai
+    def __init__(self, parent, activity, fonts):
+        super().__init__(parent)
+        self.activity = activity
+        self.fonts = fonts
+        self.base = QColor(activity.color_hex)
+        self.grad = QColor(activity.gradient_color)
+        self.time = activity.time_str()
+
+    def boundingRect(self):
+        return self.parentItem().rect()
+
+    def paint(self, painter, option, widget=None):
+        rect = self.boundingRect()
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+            painter.worldTransform()
+        )
+        if rect.height() * lod < 18:
+            return  # pequeno demais na tela: o bloco do pai basta
+        # Desenha em pixels de tela para o texto não escalar com o zoom. O
+        # cartão vem do cache no tamanho do degrau de zoom e é reduzido até o
+        # zoom real (no máximo 2 ** (1 / ZOOM_STEPS) vezes)
+        top_left = painter.worldTransform().map(rect.topLeft())
+        step = _zoom_step(lod)
+        size = QSize(round(rect.width() * step), round(rect.height() * step))
+        conflict = self.parentItem().pen().style() != Qt.NoPen
+        text_color = option.palette.text().color()
+        dpr = painter.device().devicePixelRatioF()
+        a = self.activity
+        key = (
+            a.code,
+            a.title,
+            self.time,
+            self.base.rgba(),
+            self.grad.rgba(),
+            conflict,
+            size.width(),
+            size.height(),
+            dpr,
+            CARD_POINT_SIZE,
+            text_color.rgba(),
+        )
+        family = self.fonts["Poppins-Medium.ttf"]
+        line_h = fontcache.metrics(family, CARD_POINT_SIZE).lineSpacing()
+        local = QRect(0, 0, size.width(), size.height()).adjusted(2, 2, -2, -2)
+        pixmap = cardcache.cache.card(
+            key,
+            size,
+            dpr,
+            lambda p: paint_card(
+                p,
+                local,
+                a.code,
+                a.title,
+                self.time,
+                self.base,
+                self.grad,
+                self.fonts,
+                CARD_POINT_SIZE,
+                line_h,
+                text_color,
+                conflict,
+            ),
+        )
+        painter.save()
+        painter.resetTransform()
+        if size == QSize(round(rect.width() * lod), round(rect.height() * lod)):
+            painter.drawPixmap(top_left, pixmap)
+        else:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            target = QRectF(top_left, QSizeF(rect.width(), rect.height()) * lod)
+            source = QRectF(0, 0, pixmap.width(), pixmap.height())
+            painter.drawPixmap(target, pixmap, source)
+        painter.restore()
+
+
+class _Band:
+    def __init__(self, title, left, schedule, week):
+        self.title = title
+        self.left = left  # x da primeira coluna
+        self.schedule = schedule
+        self.week = week  # segunda-feira filtrada; None = todas as semanas
+        self.items = {}  # id da atividade: QGraphicsRectItem
+        self.callback = None  # observador inscrito no Schedule
+
+
+class ScheduleScene(QGraphicsScene):
+    def __init__(
+        self, fonts, day_start=DAY_START, day_end=DAY_END, slot_minutes=60, parent=None
+    ):
+        super().__init__(parent)
+        self.fonts = fonts
+        self.day_start = day_start
+        self.day_end = day_end
+        self.slot_minutes = slot_minutes  # marcas da régua
+        self.detail = True
+        self.bands = []
+        self.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+        self._update_rect()
+
+    def _update_rect(self):
+        width = len(self.bands) * BAND_STRIDE
+        height = (self.day_end - self.day_start) * MINUTE_HEIGHT
+        self.setSceneRect(-RULER_WIDTH, -HEADER_HEIGHT, width + RULER_WIDTH, height)
+
+    def add_band(self, title, schedule, week=None):
+        # Um bloco de 7 colunas; cada sala (Schedule) ou semana é uma faixa
+        band = _Band(title, len(self.bands) * BAND_STRIDE, schedule, week)
+        self.bands.append(band)
+        self._update_rect()
+        for activity_id, activity in schedule.snapshot():
+            self._place(band, activity_id, activity)
+        band.callback = lambda *event: self._changed(band, *event)
+        schedule.subscribe(band.callback)
+        return band
+
+    def remove_band(self, band):
+        # Cancela a inscrição no Schedule (senão ele manteria a cena viva e
+        # continuaria avisando uma faixa que não existe mais) e puxa para a
+        # esquerda as faixas seguintes
+        band.schedule.unsubscribe(band.callback)
+        band.callback = None
+        for activity_id in list(band.items):
+            self._unplace(band, activity_id)
+        self.bands.remove(band)
+        for n, other in enumerate(self.bands):
+            if other.left != n * BAND_STRIDE:
+                other.left = n * BAND_STRIDE
+                for item in other.items.values():
+                    item.setX(other.left)
+        self._update_rect()
+        self.update()
+
+    def clear_bands(self):
+        for band in reversed(self.bands):
+            self.remove_band(band)
+
+    def add_weeks(self, schedule, first_monday, count):
+        # Semanas consecutivas do mesmo cronograma lado a lado
+        for n in range(count):
+            monday = first_monday + n * WEEK
+            self.add_band(f"{monday:%d/%m}", schedule, monday)
+
+    def _place(self, band, activity_id, activity):
+        if band.week is not None and not activity.occurs_in_week(band.week):
+            return
+        start = max(activity.start, self.day_start)
+        end = min(activity.end, self.day_end)
+        if end <= start:
+            return
+        item = QGraphicsRectItem(
+            activity.day * COLUMN_WIDTH + 2,
+            (start - self.day_start) * MINUTE_HEIGHT,
+            COLUMN_WIDTH - 4,
+            (end - start) * MINUTE_HEIGHT,
+        )
+        item.setX(band.left)  # a faixa move os itens sem recriá-los
+        item.setBrush(QBrush(QColor(activity.color_hex)))
+        item.setPen(self._pen(band, activity_id))
+        item.setData(ACTIVITY_ID, activity_id)
+        text = _CardText(item, activity, self.fonts)
+        text.setVisible(self.detail)
+        self.addItem(item)
+        band.items[activity_id] = item
+
+    def _pen(self, band, activity_id):
+        if band.schedule.conflicts_of(activity_id):
+            pen = QPen(CONFLICT_COLOR, 3)
+            pen.setCosmetic(True)  # espessura em pixels, qualquer que seja o zoom
+            return pen
+        return QPen(Qt.NoPen)
+
+    def _unplace(self, band, activity_id):
+        item = band.items.pop(activity_id, None)
+        if item is not None:
+            self.removeItem(item)
+
+    def _changed(self, band, event, activity_id, activity):
+        if event == "add":
+            self._place(band, activity_id, activity)
+        elif event == "add_many":
+            for i, a in activity:
+                self._place(band, i, a)
+        elif event == "remove":
+            self._unplace(band, activity_id)
+        elif event == "move":
+            self._unplace(band, activity_id)
+            self._place(band, activity_id, activity)
+        elif event == "conflicts":
+            for i in activity:
+                if i in band.items:
+                    band.items[i].setPen(self._pen(band, i))
+
+    def set_detail(self, detail):
+        # Liga/desliga os textos de todos os cartões (troca de nível de zoom)
+        if detail == self.detail:
+            return
+        self.detail = detail
+        for band in self.bands:
+            for item in band.items.values():
+                for child in item.childItems():
+                    child.setVisible(detail)
+
+    def drawBackground(self, painter, rect):
+        # Linhas de hora, régua e cabeçalhos só na área exposta
+        painter.fillRect(rect, self.palette().window())
+        first = self.day_start + rect.top() / MINUTE_HEIGHT
+        last = self.day_start + rect.bottom() / MINUTE_HEIGHT
+        marks = list(
+            ruler_marks(self.day_start, self.day_end, self.slot_minutes, first, last)
+        )
+        painter.setPen(QColor(0, 0, 0, 30))
+        lines = [minute for minute, _, _ in marks]
+        if last >= self.day_end:
+            lines.append(self.day_end)
+        for minute in lines:
+            y = (minute - self.day_start) * MINUTE_HEIGHT
+            painter.drawLine(QLineF(rect.left(), y, rect.right(), y))
+
+        painter.setPen(self.palette().text().color())
+        for minute, end, text in marks:
+            y = (minute - self.day_start) * MINUTE_HEIGHT
+            height = (end - minute) * MINUTE_HEIGHT
+            painter.drawText(
+                QRectF(-RULER_WIDTH, y, RULER_WIDTH - 6, height),
+                Qt.AlignRight | Qt.AlignTop,
+                text,
+            )
+        if rect.top() < 0:
+            first_band = max(0, int(rect.left() // BAND_STRIDE))
+            last_band = max(0, int(rect.right() // BAND_STRIDE) + 1)
+            for band in self.bands[first_band:last_band]:
+                painter.drawText(
+                    QRectF(band.left, -HEADER_HEIGHT, len(DAYS) * COLUMN_WIDTH, 20),
+                    Qt.AlignCenter,
+                    band.title,
+                )
+                for day, name in enumerate(DAYS):
+                    painter.drawText(
+                        QRectF(band.left + day * COLUMN_WIDTH, -22, COLUMN_WIDTH, 20),
+                        Qt.AlignCenter,
+                        name,
+                    )
+
+
+class ScheduleView(QGraphicsView):
+    activityClicked = pyqtSignal(int)
+
+    def __init__(self, scene, parent=None):
+        super().__init__(scene, parent)
+        self.setRenderHint(QPainter.Antialiasing, False)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.min_scale = 0.05
+        self.max_scale = 6.0
+
+    @property
+    def zoom(self):
+        return self.transform().m11()
+
+    def set_zoom(self, scale):
+        scale = min(self.max_scale, max(self.min_scale, scale))
+        self.scale(scale / self.zoom, scale / self.zoom)
+        self.scene().set_detail(scale >= DETAIL_SCALE)
+
+    def wheelEvent(self, e):
+        steps = e.angleDelta().y() / 120
+        self.set_zoom(self.zoom * 1.15**steps)
+
+    def mousePressEvent(self, e):
+        item = self.itemAt(e.pos())
+        if item is not None and item.parentItem() is not None:
+            item = item.parentItem()
+        if item is not None and item.data(ACTIVITY_ID) is not None:
+            self.activityClicked.emit(item.data(ACTIVITY_ID))
+        super().mousePressEvent(e)
@@ -0,0 +1,83 @@
+# history.py
+# Desfazer/refazer por deltas.
+#
+# Cada edição do Schedule vira um delta que referencia os próprios registros
+# de Activity (nunca copiados): o estado de qualquer ponto do histórico é o
+# estado atual mais os deltas no caminho, então a memória cresce com o número
+# de mudanças e desfazer/refazer custa só o tamanho da mudança.
+from collections import deque
+
+
+class History:
+    def __init__(self, schedule, limit=None):
+        self.schedule = schedule
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+        self._moving = {}  # id: registro anterior ao "move" em andamento
+        self._replaying = False
+        schedule.subscribe(self._record)
+
+    def __len__(self):
+        return len(self._undo)
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    def _record(self, event, activity_id, activity):
+        if event == "before_move":
+            self._moving[activity_id] = activity
+            return
+        if self._replaying:
+            self._moving.pop(activity_id, None)
+            return
+        if event == "move":
+            activity = (self._moving.pop(activity_id), activity)
+        elif event not in ("add", "add_many", "remove"):
+            return
+        self._undo.append((event, activity_id, activity))
+        self._redo.clear()
+
+    def _apply(self, delta, inverse):
+        event, activity_id, activity = delta
+        schedule = self.schedule
+        self._replaying = True
+        try:
+            if event == "add_many":
+                for item_id, item in reversed(activity) if inverse else activity:
+                    if inverse:
+                        schedule.remove(item_id)
+                    else:
+                        schedule.add(item, activity_id=item_id)
+            elif event == "move":
+                old, new = activity
+                target = old if inverse else new
+                schedule.move(activity_id, target.day, target.start, target.end)
+            elif (event == "add") != inverse:
+                schedule.add(activity, activity_id=activity_id)
+            else:
+                schedule.remove(activity_id)
+        finally:
+            self._replaying = False
+
+    def undo(self):
+        if not self._undo:
+            return False
+        delta = self._undo.pop()
+        self._apply(delta, inverse=True)
+        self._redo.append(delta)
+        return True
+
+    def redo(self):
+        if not self._redo:
+            return False
+        delta = self._redo.pop()
+        self._apply(delta, inverse=False)
+        self._undo.append(delta)
+        return True
@@ -0,0 +1,432 @@
+# ical.py
+# Leitura e escrita de iCalendar (.ics) em fluxo, sem montar o arquivo na
+# memória.
+#
+# As linhas são lidas e "desdobradas" uma a uma, cada VEVENT é entregue por um
+# gerador assim que termina e vira Activity na hora: a memória depende do
+# número de atividades, não do tamanho do arquivo. A importação junta os
+# lotes lidos e confere os conflitos uma vez só, num único Schedule.add_many
+# (um add_many por lote varreria de novo o dia inteiro a cada lote, custo
+# quadrático no arquivo). Na exportação cada atividade vira um VEVENT com
+# RRULE semanal (as ocorrências não são expandidas).
+import argparse
+import datetime
+import functools
+import os
+import sys
+
+from model import Activity
+from recurrence import Recurrence, date_of, monday_of
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def iter_lines(fp):
+    # fp em modo binário; devolve (linha desdobrada, bytes lidos até aqui)
+    pending = None
+    consumed = 0
+    for raw in fp:
+        consumed += len(raw)
+        line = raw.decode("utf-8", "replace").rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending, consumed - len(raw)
+        pending = line
+    if pending is not None:
+        yield pending, consumed
+
+
+def parse_property(line):
+    # "DTSTART;TZID=America/Sao_Paulo:20260216T080000" ->
+    # ("DTSTART", {"TZID": "America/Sao_Paulo"}, "20260216T080000")
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return (
+        name.upper(),
+        dict(p.split("=", 1) for p in params if "=" in p),
+        value,
+    )
+
+
+def iter_events(fp):
+    # Gera (propriedades, bytes lidos) para cada VEVENT; propriedades que se
+    # repetem (EXDATE) acumulam numa lista
+    event = None
+    depth = 0
+    for line, consumed in iter_lines(fp):
+        if line == "BEGIN:VEVENT":
+            event, depth = {}, 0
+        elif event is None:
+            continue
+        elif line.startswith("BEGIN:"):
+            depth += 1  # VALARM etc. dentro do evento
+        elif line.startswith("END:") and depth:
+            depth -= 1
+        elif line == "END:VEVENT":
+            yield event, consumed
+            event = None
+        elif not depth:
+            name, params, value = parse_property(line)
+            event.setdefault(name, []).append((params, value))
+
+
+def unescape(text):
+    return (
+        text.replace("\\n", " ")
+        .replace("\\N", " ")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+    )
+
+
+def parse_datetime(value):
+    # Data/hora local de parede; fuso (TZID ou Z) é ignorado como na grade
+    # (fatiamento direto: strptime dominava o tempo de leitura)
+    date = datetime.datetime(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    if value[8:9] != "T":
+        return date
+    return date.replace(
+        hour=int(value[9:11]), minute=int(value[11:13]), second=int(value[13:15])
+    )
+
+
+def parse_duration(value):
+    # "PT1H30M", "P1D"... (sem semanas/meses)
+    sign = -1 if value.startswith("-") else 1
+    value = value.lstrip("+-").lstrip("P")
+    total = datetime.timedelta()
+    number = ""
+    in_time = False
+    units = {"D": "days", "H": "hours", "M": "minutes", "S": "seconds", "W": "weeks"}
+    for ch in value:
+        if ch == "T":
+            in_time = True
+        elif ch.isdigit():
+            number += ch
+        else:
+            if ch == "M" and not in_time:
+                raise ValueError("duração em meses não suportada")
+            total += datetime.timedelta(**{units[ch]: int(number)})
+            number = ""
+    return sign * total
+
+
+def parse_rrule(value):
+    return dict(part.split("=", 1) for part in value.split(";") if "=" in part)
+
+
+def split_summary(summary):
+    # "MAT101 - Cálculo I" -> ("MAT101", "Cálculo I")
+    for sep in (" - ", " – ", ": "):
+        code, found, title = summary.partition(sep)
+        if found and code.strip() and title.strip():
+            return code.strip(), title.strip()
+    return summary.strip(), summary.strip()
+
+
+def count_until(first, days, interval, count):
+    # Data da última ocorrência de um RRULE com COUNT: as ocorrências de todos
+    # os dias do BYDAY contam juntas, em ordem, a partir de DTSTART
+    monday = monday_of(first)
+    while True:
+        for day in days:
+            date = monday + datetime.timedelta(days=day)
+            if date < first:
+                continue
+            count -= 1
+            if count <= 0:
+                return date
+        monday += datetime.timedelta(weeks=interval)
+
+
+def event_activities(event, color=0xDBDBDB, color_name=None):
+    # Um VEVENT -> Activities na grade (uma por dia da semana do RRULE).
+    # Levanta ValueError para eventos que não cabem na grade (dia inteiro,
+    # atravessando a meia-noite, recorrência não semanal...)
+    if "DTSTART" not in event:
+        raise ValueError("evento sem DTSTART")
+    params, value = event["DTSTART"][0]
+    if params.get("VALUE") == "DATE" or "T" not in value:
+        raise ValueError("evento de dia inteiro")
+    start = parse_datetime(value)
+    if "DTEND" in event:
+        end = parse_datetime(event["DTEND"][0][1])
+    elif "DURATION" in event:
+        end = start + parse_duration(event["DURATION"][0][1])
+    else:
+        raise ValueError("evento sem DTEND/DURATION")
+    if end.date() != start.date() and end.time() != datetime.time(0):
+        raise ValueError("evento atravessa a meia-noite")
+    start_min = start.hour * 60 + start.minute
+    end_min = start_min + int((end - start).total_seconds()) // 60
+
+    summary = unescape(event.get("SUMMARY", [({}, "")])[0][1])
+    code, title = split_summary(summary or "(sem título)")
+    exceptions = [
+        parse_datetime(d).date()
+        for _, value in event.get("EXDATE", [])
+        for d in value.split(",")
+    ]
+
+    first = start.date()
+    days = [first.weekday()]
+    rule = None
+    if "RRULE" in event:
+        rule = parse_rrule(event["RRULE"][0][1])
+        if rule.get("FREQ") != "WEEKLY":
+            raise ValueError(f"recorrência {rule.get('FREQ')} não suportada")
+        if "BYDAY" in rule:
+            byday = rule["BYDAY"].split(",")
+            days = sorted({WEEKDAYS.index(d[-2:]) for d in byday})
+
+    if "X-SCHEDULER-COLOR" in event:
+        params, value = event["X-SCHEDULER-COLOR"][0]
+        color, color_name = int(value.lstrip("#"), 16), params.get("X-NAME")
+
+    activities = []
+    for day in days:
+        # Primeira data com esse dia da semana a partir de DTSTART
+        first_date = first + datetime.timedelta(days=(day - first.weekday()) % 7)
+        if rule is None:
+            recurrence = Recurrence(first_date, first_date, exceptions=exceptions)
+        else:
+            interval = int(rule.get("INTERVAL", 1))
+            until = None
+            if "UNTIL" in rule:
+                until = parse_datetime(rule["UNTIL"]).date()
+            elif "COUNT" in rule:
+                until = count_until(first, days, interval, int(rule["COUNT"]))
+            if until is not None and until < first_date:
+                continue
+            recurrence = Recurrence(first_date, until, interval, exceptions)
+        activities.append(
+            Activity(
+                day,
+                start_min,
+                end_min,
+                code,
+                title,
+                color,
+                color_name,
+                recurrence,
+            )
+        )
+    return activities
+
+
+def iter_activity_chunks(path, chunk_size=500, skipped=None):
+    # Gera (lote de Activities, fração lida 0–1); eventos que não cabem na
+    # grade vão para `skipped` como (UID/resumo, motivo)
+    total = os.path.getsize(path) or 1
+    chunk = []
+    with open(path, "rb") as fp:
+        for event, consumed in iter_events(fp):
+            try:
+                chunk.extend(event_activities(event))
+            except (ValueError, KeyError) as e:
+                if skipped is not None:
+                    uid = event.get("UID") or event.get("SUMMARY") or [({}, "?")]
+                    skipped.append((uid[0][1], str(e)))
+            if len(chunk) >= chunk_size:
+                yield chunk, consumed / total
+                chunk = []
+    yield chunk, 1.0
+
+
+class ImportSummary:
+    def __init__(self):
+        self.added = 0
+        self.conflicts = []  # (Activity, [conflitos]) rejeitadas
+        self.errors = []  # (Activity, mensagem)
+        self.skipped = []  # (UID, motivo) de eventos fora da grade
+
+    def add_result(self, activities, result):
+        self.added += len(result.accepted)
+        for row, clashes in result.conflicts.items():
+            self.conflicts.append((activities[row], clashes))
+        for row, message in result.errors.items():
+            self.errors.append((activities[row], message))
+
+
+def import_ics(path, schedule, chunk_size=500, progress=None, cancelled=None):
+    # Lê em lotes e insere tudo num só add_many no fim; progress(fração)
+    # acompanha a leitura e cancelled() -> bool a interrompe sem inserir nada
+    summary = ImportSummary()
+    activities = []
+    for chunk, fraction in iter_activity_chunks(path, chunk_size, summary.skipped):
+        if cancelled is not None and cancelled():
+            return summary
+        activities.extend(chunk)
+        if progress is not None:
+            progress(fraction)
+    if activities:
+        summary.add_result(activities, schedule.add_many(activities))
+    return summary
+
+
+# Exportação
+
+CRLF = "\r\n"
+
+
+def escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    # Linhas de no máximo 75 octetos, sem partir caracteres UTF-8
+    if len(line) <= 75 and line.isascii():
+        return line
+    parts = []
+    width = 75
+    current = ""
+    size = 0
+    for ch in line:
+        n = len(ch.encode())
+        if size + n > width:
+            parts.append(current)
+            current, size, width = "", 0, 74  # o espaço inicial conta
+        current += ch
+        size += n
+    parts.append(current)
+    return (CRLF + " ").join(parts)
+
+
+@functools.lru_cache(maxsize=4096)  # poucas datas distintas num catálogo
+def format_date(date):
+    return f"{date.year:04d}{date.month:02d}{date.day:02d}"
+
+
+def format_datetime(date, minutes):
+    return f"{format_date(date)}T{minutes // 60:02d}{minutes % 60:02d}00"
+
+
+@functools.lru_cache(maxsize=4096)
+def rule_lines(rule, start):
+    # RRULE/EXDATE de uma regra; turmas do mesmo período compartilham a regra
+    lines = []
+    if rule.end_date != rule.start_date:
+        rrule = "RRULE:FREQ=WEEKLY"
+        if rule.interval != 1:
+            rrule += f";INTERVAL={rule.interval}"
+        if rule.end_date is not None:
+            rrule += f";UNTIL={format_datetime(rule.end_date, 24 * 60 - 1)}"
+        lines.append(rrule)
+    if rule.exceptions:
+        dates = ",".join(format_datetime(d, start) for d in sorted(rule.exceptions))
+        lines.append(f"EXDATE:{dates}")
+    return tuple(lines)
+
+
+def activity_event(uid, activity, stamp, reference):
+    # Um VEVENT como texto, ou None se a regra não tem nenhuma data;
+    # atividades sem regra repetem toda semana a partir da semana de referência
+    rule = activity.recurrence
+    if rule is None:
+        first = reference + datetime.timedelta(days=activity.day)
+    else:
+        # DTSTART no dia da semana da atividade (start_date pode cair noutro
+        # dia): a primeira data da sequência de semanas da regra
+        first = date_of(rule.first_week, activity.day)
+        if first < rule.start_date:
+            first += datetime.timedelta(weeks=rule.interval)
+        if rule.end_date is not None and first > rule.end_date:
+            return None
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{format_datetime(first, activity.start)}",
+    ]
+    if activity.end >= 24 * 60:
+        last = first + datetime.timedelta(days=1)
+        lines.append(f"DTEND:{format_datetime(last, activity.end - 24 * 60)}")
+    else:
+        lines.append(f"DTEND:{format_datetime(first, activity.end)}")
+    if rule is None:
+        lines.append("RRULE:FREQ=WEEKLY")
+    else:
+        lines.extend(rule_lines(rule, activity.start))
+    lines.append(fold(f"SUMMARY:{escape(activity.code)} - {escape(activity.title)}"))
+    if activity.color_name:
+        color = f"X-SCHEDULER-COLOR;X-NAME={activity.color_name}"
+    else:
+        color = "X-SCHEDULER-COLOR"
+    lines.append(f"{color}:{activity.color_hex}")
+    lines.append("END:VEVENT")
+    return CRLF.join(lines) + CRLF
+
+
+def iter_ics(items, name=None, reference=None):
+    # Gera o calendário em pedaços de texto; items: (uid, Activity)
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    reference = monday_of(reference or datetime.date.today())
+    header = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//SchedulerPY//Cronograma//PT"]
+    if name:
+        header.append(fold(f"X-WR-CALNAME:{escape(name)}"))
+    yield CRLF.join(header) + CRLF
+    for uid, activity in items:
+        event = activity_event(uid, activity, stamp, reference)
+        if event is not None:
+            yield event
+    yield "END:VCALENDAR" + CRLF
+
+
+def write_ics(items, fp, name=None, reference=None, batch=512):
+    # Escreve em fp (modo texto, newline=""); os eventos são agrupados para
+    # reduzir as chamadas de write
+    chunks = iter_ics(items, name, reference)
+    pending = []
+    for chunk in chunks:
+        pending.append(chunk)
+        if len(pending) >= batch:
+            fp.write("".join(pending))
+            pending.clear()
+    fp.write("".join(pending))
+
+
+def schedule_items(schedule):
+    return ((f"{i}@schedulerpy", a) for i, a in schedule.snapshot())
+
+
+def store_items(store, schedule_id=None):
+    # Catálogo inteiro (ou um cronograma) direto do cursor do SQLite
+    return (
+        (f"{s}-{i}@schedulerpy", a) for s, i, a in store.iter_activities(schedule_id)
+    )
+
+
+def main(argv=None):
+    from storage import SqliteStore
+
+    parser = argparse.ArgumentParser(description="Exporta cronogramas para .ics")
+    parser.add_argument("database", help="arquivo SQLite (cronograma.db)")
+    parser.add_argument("-s", "--schedule", help="nome do cronograma (padrão: todos)")
+    parser.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    store = SqliteStore(args.database)
+    schedule_id = None
+    if args.schedule:
+        ids = {name: i for i, name in store.schedules()}
+        if args.schedule not in ids:
+            parser.error(f"cronograma inexistente: {args.schedule}")
+        schedule_id = ids[args.schedule]
+    items = store_items(store, schedule_id)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as fp:
+            write_ics(items, fp, args.schedule)
+    else:
+        write_ics(items, sys.stdout, args.schedule)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# importer.py
+# Importação em segundo plano com barra de progresso cancelável.
+#
+# A leitura/conversão do arquivo roda numa QThread e entrega lotes de
+# Activities à thread principal, que os acumula; no fim quem chamou faz um
+# só Schedule.add_many (o Schedule e a grade só são mexidos pela thread da
+# interface). Um semáforo limita os lotes em trânsito na fila de sinais.
+from PyQt5.QtCore import QSemaphore, Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import QProgressDialog
+
+IN_FLIGHT = 2  # lotes lidos e ainda não inseridos
+
+
+class ImportWorker(QThread):
+    chunk = pyqtSignal(object, float)  # lote de Activities, fração lida 0–1
+    failed = pyqtSignal(str)
+    done = pyqtSignal(bool)  # ao terminar: True se foi cancelado
+
+    def __init__(self, chunks, parent=None):
+        super().__init__(parent)
+        self.chunks = chunks  # gerador de (lote, fração)
+        self.slots = QSemaphore(IN_FLIGHT)
+
+    def run(self):
+        try:
+            for chunk, fraction in self.chunks:
+                self.slots.acquire()
+                if self.isInterruptionRequested():
+                    return
+                self.chunk.emit(chunk, fraction)
+        except (OSError, ValueError) as e:
+            self.failed.emit(str(e))
+        finally:
+            # Sem cancelamento, espera a thread principal tratar os lotes em
+            # trânsito: um lote só é descartado se o cancelamento já foi
+            # pedido quando o resultado é decidido aqui
+            if not self.isInterruptionRequested():
+                self.slots.acquire(IN_FLIGHT)
+            self.done.emit(self.isInterruptionRequested())
+
+    def chunk_done(self):
+        self.slots.release()
+
+    def cancel(self):
+        self.requestInterruption()
+        self.slots.release(IN_FLIGHT)  # destrava um acquire pendente
+
+
+def run_import(parent, chunks, add_chunk, label="Importando…"):
+    # Mostra o progresso e chama add_chunk(lote) na thread principal; devolve
+    # False se o usuário cancelou (os lotes já entregues devem ser descartados)
+    dialog = QProgressDialog(label, "Cancelar", 0, 1000, parent)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(300)
+    dialog.setAutoReset(False)  # fecha só quando o worker terminar
+    worker = ImportWorker(chunks, parent)
+    errors = []
+    outcome = []  # payload de done; chega direto da thread do worker
+
+    def on_chunk(chunk, fraction):
+        if not worker.isInterruptionRequested():
+            if chunk:
+                add_chunk(chunk)
+            dialog.setValue(int(fraction * 1000))
+        worker.chunk_done()
+
+    worker.chunk.connect(on_chunk)
+    worker.failed.connect(errors.append)
+    worker.done.connect(outcome.append, Qt.DirectConnection)
+    worker.finished.connect(dialog.reset)
+    dialog.canceled.connect(worker.cancel)
+    worker.start()
+    dialog.exec()
+    if worker.isRunning():
+        worker.cancel()  # diálogo fechado antes do fim: cancelado
+    worker.wait()
+    cancelled = outcome[0]
+    if errors:
+        raise ValueError(errors[0])
+    return not cancelled
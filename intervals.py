@@ -0,0 +1,93 @@
+# intervals.py
+# Índice de intervalos [start, end) de um dia, em minutos.
+#
+# As entradas ficam agrupadas por classe de duração (potências de dois) e, em
+# cada classe, ordenadas pelo início. Como nenhuma entrada da classe c dura
+# mais que 2**c, só as que começam em (start - 2**c, end) podem sobrepor a
+# consulta: duas buscas binárias por classe delimitam essa faixa, e uma
+# entrada longa (um laboratório de dia inteiro) só alarga a busca da sua
+# classe. Custo: O(C log n + k + d), com C <= 11 classes num dia de 1440
+# minutos e d o número de entradas da mesma classe que cobrem o ponto
+# start - 2**(c-1) sem chegar a start (os falsos candidatos; sem
+# sobreposições, no máximo um por classe).
+import heapq
+from bisect import bisect_left, bisect_right
+
+
+def _length_class(length):
+    return max(0, length - 1).bit_length()  # menor c com 2**c >= length
+
+
+class IntervalIndex:
+    def __init__(self):
+        self._classes = {}  # classe: ([(start, end, key)] ordenadas, [start])
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return heapq.merge(*(entries for entries, _ in self._classes.values()))
+
+    def add(self, start, end, key):
+        entry = (start, end, key)
+        entries, starts = self._classes.setdefault(
+            _length_class(end - start), ([], [])
+        )
+        pos = bisect_right(entries, entry)
+        entries.insert(pos, entry)
+        starts.insert(pos, start)
+        self._size += 1
+
+    def update(self, entries):
+        # Inserção em lote: uma única ordenação por classe em vez de um insort
+        # por entrada
+        grouped = {}
+        for entry in entries:
+            grouped.setdefault(_length_class(entry[1] - entry[0]), []).append(entry)
+        for length_class, new in grouped.items():
+            current, _ = self._classes.get(length_class, ([], []))
+            current.extend(new)
+            current.sort()
+            self._classes[length_class] = (current, [s for s, _, _ in current])
+            self._size += len(new)
+
+    def remove(self, start, end, key):
+        entry = (start, end, key)
+        length_class = _length_class(end - start)
+        entries, starts = self._classes.get(length_class, ((), ()))
+        pos = bisect_left(entries, entry)
+        if pos == len(entries) or entries[pos] != entry:
+            raise KeyError(key)
+        del entries[pos]
+        del starts[pos]
+        if not entries:
+            del self._classes[length_class]
+        self._size -= 1
+
+    def overlapping(self, start, end):
+        return [k for _, _, k in self.overlapping_entries(start, end)]
+
+    def overlapping_entries(self, start, end):
+        found = []
+        for length_class, (entries, starts) in self._classes.items():
+            lo = bisect_right(starts, start - (1 << length_class))
+            hi = bisect_left(starts, end)
+            found.extend(entry for entry in entries[lo:hi] if entry[1] > start)
+        found.sort()
+        return found
+
+    def covers(self, start, end):
+        # Alguma entrada cobre [start, end) inteiro? Percorre de trás para a
+        # frente (inícios mais próximos, maiores fins) e para na primeira
+        for length_class, (entries, starts) in self._classes.items():
+            lo = bisect_right(starts, start - (1 << length_class))
+            hi = bisect_right(starts, start)
+            for pos in range(hi - 1, lo - 1, -1):
+                if entries[pos][1] >= end:
+                    return True
+        return False
+
+    def clear(self):
+        self._classes.clear()
+        self._size = 0
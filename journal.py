@@ -0,0 +1,280 @@
+# journal.py
+# Salvamento automático à prova de quedas por diário de edições.
+#
+# Cada edição do Schedule vira uma linha JSON acrescentada ao diário por uma
+# thread escritora; a thread da interface só enfileira o evento. O fsync é
+# feito em lotes e, quando o diário passa do limite, o estado é compactado
+# num snapshot e os diários antigos são apagados.
+# Na recuperação: snapshot + diários posteriores, reaplicados em ordem.
+#
+# Arquivos, para base="cronograma":
+#   cronograma.snapshot      arquivo binário (snapshot.py), tag = geração g
+#   cronograma.journal.<n>   edições da geração n (n >= g são reaplicadas)
+import glob
+import json
+import os
+import threading
+
+from model import Activity, Schedule
+from recurrence import decode, encode
+from snapshot import Archive, write_archive
+
+
+def activity_to_list(a):
+    return [
+        a.day,
+        a.start,
+        a.end,
+        a.code,
+        a.title,
+        a.color,
+        a.color_name,
+        encode(a.recurrence),
+    ]
+
+
+def activity_from_list(values):
+    *fields, recurrence = values
+    return Activity(*fields, recurrence=decode(recurrence))
+
+
+class Journal:
+    def __init__(self, base, fsync_every=32, compact_bytes=1 << 20):
+        self.base = base
+        self.fsync_every = fsync_every  # edições por fsync
+        self.compact_bytes = compact_bytes  # tamanho que dispara a compactação
+        self.schedule = None
+        self.generation = 0
+        self._file = None
+        self._state = {}  # id: Activity, espelho do que já foi gravado
+        self._queue = []  # (evento, id, atividade) ainda não gravados
+        self._cond = threading.Condition()
+        self._queued = 0  # registros enfileirados desde attach()
+        self._synced = 0  # registros já gravados com fsync
+        self._sync_wanted = False
+        self._compact_wanted = False
+        self._closing = False
+        self._error = None  # exceção que parou o escritor
+        self._writer = None
+        self._compactor = None
+
+    @property
+    def snapshot_path(self):
+        return self.base + ".snapshot"
+
+    def journal_path(self, generation):
+        return f"{self.base}.journal.{generation}"
+
+    def _journals(self):
+        found = []
+        for path in glob.glob(glob.escape(self.base) + ".journal.*"):
+            suffix = path.rsplit(".", 1)[1]
+            if suffix.isdigit():
+                found.append((int(suffix), path))
+        return sorted(found)
+
+    # Recuperação
+
+    def exists(self):
+        # Há snapshot ou diário gravado (senão não há o que recuperar)
+        return os.path.exists(self.snapshot_path) or bool(self._journals())
+
+    def recover(self, allow_overlaps=False):
+        schedule = Schedule(allow_overlaps=allow_overlaps)
+        generation = 0
+        if os.path.exists(self.snapshot_path):
+            with Archive(self.snapshot_path) as archive:
+                archive.verify()
+                generation = archive.tag
+                for activity_id, activity in archive.items(0):
+                    schedule.add(activity, activity_id=activity_id)
+
+        for journal_generation, path in self._journals():
+            if journal_generation < generation:
+                continue
+            offset = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # linha incompleta: queda durante a escrita
+                    self._replay(schedule, json.loads(line))
+                    offset += len(line)
+            if offset < os.path.getsize(path):
+                os.truncate(path, offset)
+            generation = journal_generation
+        self.generation = generation
+        return schedule
+
+    @staticmethod
+    def _replay(schedule, op):
+        kind = op["op"]
+        if kind == "add":
+            schedule.add(activity_from_list(op["a"]), activity_id=op["id"])
+        elif kind == "add_many":
+            for activity_id, *values in op["items"]:
+                schedule.add(activity_from_list(values), activity_id=activity_id)
+        elif kind == "remove":
+            schedule.remove(op["id"])
+        elif kind == "move":
+            schedule.move(op["id"], *op["to"])
+
+    # Gravação
+    #
+    # A thread principal só enfileira o evento (O(1), sem JSON nem disco); uma
+    # thread escritora serializa, grava, faz o fsync em lotes e dispara a
+    # compactação. O escritor mantém um espelho id: Activity do que já gravou,
+    # então o snapshot corresponde exatamente ao fim do diário que ele fecha.
+
+    def attach(self, schedule):
+        # Passa a registrar as edições de `schedule` (normalmente o recuperado)
+        self.schedule = schedule
+        self._state = dict(schedule.activities)
+        self._file = open(self.journal_path(self.generation), "a", encoding="utf-8")
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+        schedule.subscribe(self._record)
+
+    def _record(self, event, activity_id, activity):
+        if event in ("add", "add_many", "remove", "move"):
+            with self._cond:
+                self._queue.append((event, activity_id, activity))
+                self._queued += 1
+                self._cond.notify_all()
+
+    def _apply(self, event, activity_id, activity):
+        # Atualiza o espelho e devolve a linha do diário
+        if event == "add":
+            self._state[activity_id] = activity
+            return {"op": "add", "id": activity_id, "a": activity_to_list(activity)}
+        if event == "add_many":
+            self._state.update(activity)
+            items = [[i, *activity_to_list(a)] for i, a in activity]
+            return {"op": "add_many", "items": items}
+        if event == "remove":
+            del self._state[activity_id]
+            return {"op": "remove", "id": activity_id}
+        self._state[activity_id] = activity
+        to = [activity.day, activity.start, activity.end]
+        return {"op": "move", "id": activity_id, "to": to}
+
+    def _run(self):
+        pending = 0  # registros gravados sem fsync
+        written = 0
+        try:
+            while True:
+                with self._cond:
+                    while not (
+                        self._queue
+                        or self._sync_wanted
+                        or self._compact_wanted
+                        or self._closing
+                    ):
+                        self._cond.wait()
+                    records, self._queue = self._queue, []
+                    sync, self._sync_wanted = self._sync_wanted, False
+                    compact, self._compact_wanted = self._compact_wanted, False
+                    closing = self._closing and not records
+
+                lines = [
+                    json.dumps(self._apply(*record), ensure_ascii=False) + "\n"
+                    for record in records
+                ]
+                self._file.write("".join(lines))
+                written += len(records)
+                pending += len(records)
+                if pending and (pending >= self.fsync_every or sync or closing):
+                    self._sync()
+                    pending = 0
+                with self._cond:
+                    self._synced = written - pending
+                    self._cond.notify_all()
+
+                if compact or self._file.tell() >= self.compact_bytes:
+                    self._compact()
+                    pending = 0
+                if closing:
+                    return
+        except Exception as e:  # reportado por flush() e compact()
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _wait(self, done):
+        # Espera o escritor (com self._cond adquirido) até done() ou um erro
+        while not done() and self._error is None and self._writer.is_alive():
+            self._cond.wait()
+        if self._error is not None:
+            raise self._error
+
+    def flush(self):
+        # Espera tudo o que já foi enfileirado estar gravado e com fsync. Não
+        # deve ser chamado na thread da interface durante o uso (AutoSaver)
+        if self._writer is None:
+            return
+        with self._cond:
+            target = self._queued
+            self._sync_wanted = True
+            self._cond.notify_all()
+            self._wait(lambda: self._synced >= target)
+
+    def compact(self, wait=False):
+        # Pede ao escritor para trocar de diário e gravar o snapshot
+        with self._cond:
+            generation = self.generation
+            self._compact_wanted = True
+            self._cond.notify_all()
+            if not wait:
+                return
+            self._wait(lambda: self.generation > generation)
+            compactor = self._compactor
+        compactor.join()
+
+    def _compact(self):
+        # Na thread escritora: fecha o diário atual e grava o espelho numa
+        # thread à parte, enquanto as próximas edições vão para o novo diário.
+        # Os registros de Activity são imutáveis, basta copiar o dicionário.
+        if self._compactor is not None and self._compactor.is_alive():
+            self._compactor.join()
+        self._sync()
+        self._file.close()
+        self._file = open(
+            self.journal_path(self.generation + 1), "a", encoding="utf-8"
+        )
+        compactor = threading.Thread(
+            target=self._write_snapshot,
+            args=(self.generation + 1, dict(self._state)),
+            daemon=True,
+        )
+        compactor.start()
+        with self._cond:
+            self.generation += 1
+            self._compactor = compactor
+            self._cond.notify_all()
+
+    def _write_snapshot(self, generation, state):
+        write_archive(self.snapshot_path, [("", state.items())], tag=generation)
+        for journal_generation, path in self._journals():
+            if journal_generation < generation:
+                os.remove(path)
+
+    def close(self):
+        if self.schedule is not None:
+            self.schedule.unsubscribe(self._record)
+            self.schedule = None
+        if self._writer is not None:
+            with self._cond:
+                self._closing = True
+                self._cond.notify_all()
+            self._writer.join()
+            self._writer = None
+        if self._compactor is not None:
+            self._compactor.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._error is not None:
+            raise self._error
@@ -2,7 +2,14 @@
 from PyQt5.QtGui import QFontDatabase
 from PyQt5.QtWidgets import QApplication
 import sys, os
+from autosave import AutoSaver
+from graphicsview import ScheduleScene, ScheduleView
+from journal import Journal
 from scheduler import CronogramaWindow  # importar a janela
+from storage import SqliteStore
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "cronograma.db")
+JOURNAL_BASE = os.path.join(os.path.dirname(__file__), "cronograma")
 
 
 def load_fonts():
@@ -18,9 +25,90 @@ def load_fonts():
     return loaded
 
 
+def int_option(name, default):
+    # --nome=N na linha de comando; default se ausente
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return int(arg[len(prefix) :])
+    return default
+
+
+def open_schedule(store, schedule_id, base=JOURNAL_BASE):
+    # O diário é a gravação principal: cada edição vira uma linha acrescentada
+    # e, ao abrir, snapshot + diários são reaplicados. Sem diário ainda, o
+    # estado inicial vem do SQLite (dados de versões anteriores). O modo de
+    # sobreposições fica no SQLite: o diário é reaplicado no mesmo modo em
+    # que foi gravado.
+    journal = Journal(base)
+    if journal.exists():
+        schedule = journal.recover(store.allow_overlaps(schedule_id))
+        journal.attach(schedule)
+    else:
+        schedule = store.load_schedule(schedule_id)
+        journal.attach(schedule)
+        journal.compact(wait=True)  # primeiro snapshot
+    return schedule, journal
+
+
+def open_rooms(fonts, store, schedule_id, schedule):
+    # Uma faixa por cronograma salvo (sala), lado a lado e com zoom; a faixa do
+    # principal acompanha as edições da janela
+    scene = ScheduleScene(fonts)
+    for other_id, name in store.schedules():
+        if other_id == schedule_id:
+            scene.add_band(name, schedule)
+        else:
+            scene.add_band(name, store.load_schedule(other_id))
+    view = ScheduleView(scene)
+    view.setWindowTitle("Salas")
+    view.resize(1200, 800)
+    return view
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     fonts = load_fonts()
-    win = CronogramaWindow(fonts)  # passando fonts adiante
+
+    # Recupera o cronograma do diário; cada edição é acrescentada a ele e o
+    # fsync fica em segundo plano, agrupado pelo AutoSaver. O diário já tem
+    # o estado: o AutoSaver não copia o cronograma (snapshot=False)
+    store = SqliteStore(DB_PATH)
+    schedule_id = store.schedule_id("principal")
+    # --sobreposicoes: passa a aceitar atividades sobrepostas (grafo de
+    # conflitos); o modo fica gravado com o cronograma
+    if "--sobreposicoes" in sys.argv:
+        store.set_allow_overlaps(schedule_id, True)
+    schedule, journal = open_schedule(store, schedule_id)
+    saver = AutoSaver(schedule, journal.flush, snapshot=False)
+
+    # --canvas: grade pintada num só widget (canvas.py); é o padrão quando o
+    # cronograma aceita sobreposições
+    # --table: QTableView sobre um modelo do cronograma (tablemodel.py)
+    # --inicio=H, --fim=H: faixa de horas da grade (padrão 7 e 21)
+    # --linha=MIN: minutos por linha da grade (padrão 60)
+    win = CronogramaWindow(
+        fonts,
+        schedule,
+        start_hour=int_option("inicio", 7),
+        end_hour=int_option("fim", 21),
+        slot_minutes=int_option("linha", 60),
+        canvas="--canvas" in sys.argv,
+        table="--table" in sys.argv,
+    )
+    win.attach_autosaver(saver)
     win.show()
-    sys.exit(app.exec_())
+    # --salas: abre também a visão com zoom de todos os cronogramas
+    rooms = None
+    if "--salas" in sys.argv:
+        rooms = open_rooms(fonts, store, schedule_id, schedule)
+        rooms.show()
+    status = app.exec_()
+    if rooms is not None:
+        rooms.scene().clear_bands()
+
+    # O catálogo SQLite (exportação, consultas) é atualizado uma vez, ao sair
+    journal.close()
+    store.save_schedule(schedule_id, schedule)
+    store.close()
+    sys.exit(status)
@@ -0,0 +1,682 @@
+# model.py
+# Modelo do cronograma sem dependência do Qt: pode ser consultado, validado e
+# processado em lote num servidor, sem QApplication nem widgets.
+import datetime
+import heapq
+import sys
+
+from intervals import IntervalIndex
+from occupancy import MINUTES_PER_DAY, WeekOccupancy
+from recurrence import monday_of, rules_overlap
+
+DAYS = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+PASTEL_COLORS = [
+    ("Azul", "#66c5cc"),
+    ("Verde", "#87c55f"),
+    ("Amarelo", "#f6cf71"),
+    ("Laranja", "#f89c74"),
+    ("Rosa", "#fe88b1"),
+    ("Lilás", "#dcb0f2"),
+    ("Cinza", "#dbdbdb"),
+]
+
+GRADIENT_COLORS = [
+    ("Azul", "#448388"),
+    ("Verde", "#4e743b"),
+    ("Amarelo", "#a59357"),
+    ("Laranja", "#9a6850"),
+    ("Rosa", "#a7627d"),
+    ("Lilás", "#88739b"),
+    ("Cinza", "#818585"),
+]
+
+DAY_START = 7 * 60  # faixa padrão da grade: 07:00–21:00
+DAY_END = 21 * 60
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def format_slot(day, start, end):
+    return f"{DAYS[day]} {format_minutes(start)} – {format_minutes(end)}"
+
+
+def slot_label(start, end, slot_minutes):
+    # Rótulo de uma linha da grade: a faixa para linhas de 1 h ou mais, senão
+    # só o início
+    if slot_minutes >= 60:
+        return f"{format_minutes(start)} - {format_minutes(end)}"
+    return format_minutes(start)
+
+
+def row_span(activity, day_start, slot_minutes, rows):
+    # (primeira linha, linhas) cobertas pela atividade numa grade de rows
+    # linhas de slot_minutes a partir de day_start, recortadas à grade
+    row = max(0, (activity.start - day_start) // slot_minutes)
+    end = -(-(activity.end - day_start) // slot_minutes)
+    return row, min(end, rows) - row
+
+
+def ruler_marks(day_start, day_end, slot_minutes, first=None, last=None):
+    # (início, fim, rótulo) das marcas da régua de horários que cruzam
+    # [first, last] em minutos: uma por linha quando a linha tem 1 h ou mais,
+    # senão uma por hora. Usado por todas as grades (widgets, canvas, cena e
+    # tabela), que só diferem em como convertem minutos em pixels.
+    step = max(slot_minutes, 60)
+    minute = day_start if first is None else max(day_start, int(first))
+    minute -= (minute - day_start) % step
+    stop = day_end if last is None else min(day_end, last)
+    while minute < day_end and minute <= stop:
+        end = min(minute + step, day_end)
+        yield minute, end, slot_label(minute, end, slot_minutes)
+        minute += step
+
+
+def parse_minutes(text):
+    hours, _, minutes = text.strip().partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+
+DAY = datetime.timedelta(days=1)
+WEEK = datetime.timedelta(weeks=1)
+MAX_INDEXED_WEEKS = 53  # regras datadas até esse tamanho são indexadas por semana
+
+
+def _every_week(date):
+    while True:
+        yield date
+        date += WEEK
+
+
+def _rule_weeks(rule):
+    # Semanas em que uma regra datada pode acontecer; None para regras
+    # abertas (toda semana, sem fim ou longas demais), comparadas com todas
+    if rule is None or rule.last_week is None:
+        return None
+    if (rule.last_week - rule.first_week) // rule.interval >= MAX_INDEXED_WEEKS:
+        return None
+    return range(rule.first_week, rule.last_week + 1, rule.interval)
+
+
+class ConflictError(ValueError):
+    def __init__(self, conflicts):
+        super().__init__(f"conflito com {len(conflicts)} atividade(s)")
+        self.conflicts = conflicts  # ids das atividades em conflito
+
+
+class BatchResult:
+    def __init__(self, size):
+        self.ids = [None] * size  # id atribuído a cada linha aceita
+        self.conflicts = {}  # linha: [("activity", id) | ("batch", linha)]
+        self.errors = {}  # linha: mensagem de validação
+
+    @property
+    def accepted(self):
+        return [i for i in self.ids if i is not None]
+
+    @property
+    def rejected(self):
+        return sorted(set(self.conflicts) | set(self.errors))
+
+
+def pack_color(color):
+    # "#rrggbb" ou inteiro 0xRRGGBB -> inteiro 0xRRGGBB
+    if isinstance(color, str):
+        return int(color.lstrip("#"), 16)
+    return color
+
+
+class Activity:
+    # Registro imutável e compacto: minutos inteiros, cor RGB num inteiro e
+    # textos internados, compartilhado por modelo, persistência e desenho.
+    __slots__ = (
+        "day",
+        "start",
+        "end",
+        "code",
+        "title",
+        "color",
+        "color_name",
+        "recurrence",
+    )
+
+    def __init__(
+        self,
+        day,
+        start,
+        end,
+        code,
+        title,
+        color=0xDBDBDB,
+        color_name=None,
+        recurrence=None,
+    ):
+        init = object.__setattr__
+        init(self, "day", day)  # 0 = Seg ... 6 = Dom
+        init(self, "start", start)  # minutos desde 00:00
+        init(self, "end", end)
+        init(self, "code", sys.intern(code))
+        init(self, "title", sys.intern(title))
+        init(self, "color", pack_color(color))  # 0xRRGGBB
+        init(self, "color_name", color_name and sys.intern(color_name))
+        init(self, "recurrence", recurrence)  # Recurrence; None = toda semana
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Activity é imutável; use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("Activity é imutável")
+
+    def _key(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, Activity) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __reduce__(self):
+        return Activity, self._key()
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return Activity(**values)
+
+    @property
+    def color_hex(self):
+        return f"#{self.color:06x}"
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def gradient_color(self):
+        return dict(GRADIENT_COLORS).get(self.color_name, "#000000")
+
+    def time_str(self):
+        return f"{format_minutes(self.start)} – {format_minutes(self.end)}"
+
+    def moved(self, day, start, end):
+        return self.replace(day=day, start=start, end=end)
+
+    def occurrences(self, since=None, until=None):
+        if self.recurrence is None:
+            raise ValueError("atividade semanal sem datas")
+        return self.recurrence.occurrences(self.day, since, until)
+
+    def occurs_in_week(self, date):
+        if self.recurrence is None:
+            return True
+        monday = monday_of(date)
+        return next(self.occurrences(monday, monday + WEEK - DAY), None) is not None
+
+    def overlaps(self, other):
+        return (
+            self.day == other.day
+            and self.start < other.end
+            and other.start < self.end
+        )
+
+    def __repr__(self):
+        return (
+            f"Activity({DAYS[self.day]} {self.time_str()} "
+            f"{self.code!r} {self.title!r})"
+        )
+
+
+class Schedule:
+    def __init__(self, allow_overlaps=False):
+        self.activities = {}  # id: Activity
+        self._by_day = [IntervalIndex() for _ in DAYS]  # (start, end, id)
+        # Para conflitos: regras abertas num índice do dia e regras datadas
+        # num índice por semana, para só comparar regras que podem se encontrar
+        self._open = [IntervalIndex() for _ in DAYS]
+        self._by_week = [{} for _ in DAYS]  # semana: IntervalIndex
+        self.occupancy = WeekOccupancy()  # um bit por minuto
+        self._next_id = 1
+        self._listeners = []
+
+        # Com allow_overlaps, sobreposições são aceitas e registradas num grafo
+        # de conflitos (id: ids que se sobrepõem), mantido a cada edição só na
+        # vizinhança afetada. Só ids com algum conflito aparecem no grafo.
+        # Na janela, sobreposições só aparecem lado a lado no canvas (--canvas,
+        # o padrão nesse modo); a tabela deixa de fora a que não couber.
+        self.allow_overlaps = allow_overlaps
+        self.conflict_graph = {}
+
+    def subscribe(self, callback):
+        # callback(event, activity_id, activity), event em {"add", "remove", "move"};
+        # "add_many" chega com activity_id None e a lista [(id, activity)], e
+        # "before_move" traz o registro antigo logo antes de um "move";
+        # "conflicts" traz o conjunto de ids cujo conjunto de conflitos mudou
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self._listeners.remove(callback)
+
+    def _notify(self, event, activity_id, activity):
+        for callback in list(self._listeners):
+            callback(event, activity_id, activity)
+
+    def __len__(self):
+        return len(self.activities)
+
+    def __contains__(self, activity_id):
+        return activity_id in self.activities
+
+    def __iter__(self):
+        return iter(self.activities.items())
+
+    def snapshot(self):
+        # Estado congelado: os registros de Activity são imutáveis, então
+        # basta copiar os pares (id, atividade)
+        return tuple(self.activities.items())
+
+    def get(self, activity_id):
+        return self.activities.get(activity_id)
+
+    def on_day(self, day):
+        return [(i, self.activities[i]) for _, _, i in self._by_day[day]]
+
+    @staticmethod
+    def validate(activity):
+        if not activity.code.strip() or not activity.title.strip():
+            raise ValueError("código e título são obrigatórios")
+        if not 0 <= activity.day < len(DAYS):
+            raise ValueError(f"dia inválido: {activity.day}")
+        if not 0 <= activity.start < activity.end <= MINUTES_PER_DAY:
+            raise ValueError("horário final deve ser após o início")
+
+    def is_free(self, day, start, end):
+        return self.occupancy.is_free(day, start, end)
+
+    def conflicts(self, day, start, end, ignore=None):
+        if ignore is None and self.occupancy.is_free(day, start, end):
+            return []
+        return [
+            i for i in self._by_day[day].overlapping(start, end) if i != ignore
+        ]
+
+    def clashes(self, activity, ignore=None):
+        # Conflitos de horário cujas regras de recorrência também coincidem
+        # em alguma data; as datas só são expandidas para esses pares. Uma
+        # regra datada só olha as regras abertas e as das suas semanas.
+        day, start, end = activity.day, activity.start, activity.end
+        weeks = _rule_weeks(activity.recurrence)
+        if weeks is None:
+            candidates = self.conflicts(day, start, end, ignore)
+        elif ignore is None and self.occupancy.is_free(day, start, end):
+            return []
+        else:
+            candidates = dict.fromkeys(self._open[day].overlapping(start, end))
+            by_week = self._by_week[day]
+            for week in weeks:
+                index = by_week.get(week)
+                if index is not None:
+                    candidates.update(dict.fromkeys(index.overlapping(start, end)))
+            candidates.pop(ignore, None)
+        return [
+            i
+            for i in candidates
+            if rules_overlap(day, activity.recurrence, self.activities[i].recurrence)
+        ]
+
+    def suggest_slots(
+        self,
+        day,
+        start,
+        duration,
+        limit=5,
+        day_start=DAY_START,
+        day_end=DAY_END,
+        recurrence=None,
+    ):
+        # Horários livres com a mesma duração, do mais próximo ao pedido:
+        # primeiro pela distância no horário, depois pela distância em dias.
+        # recurrence é a regra da atividade a encaixar (None = toda semana).
+        candidates = []
+        for d in range(len(DAYS)):
+            for free_start, free_end in self.free_intervals(
+                d, day_start, day_end, recurrence
+            ):
+                if free_end - free_start < duration:
+                    continue
+                best = min(max(start, free_start), free_end - duration)
+                candidates.append((abs(best - start), abs(d - day), d, best))
+        candidates.sort()
+        return [(d, s, s + duration) for _, _, d, s in candidates[:limit]]
+
+    def free_intervals(self, day, start, end, recurrence=None):
+        # Uma regra aberta encontra qualquer outra, então basta o bitset
+        # semanal. Para uma regra datada, o bitset marcaria também o que só
+        # acontece em outras semanas: contam só as regras com datas em comum.
+        if recurrence is None:
+            return list(self.occupancy.free_intervals(day, start, end))
+        busy = WeekOccupancy()
+        for s, e, i in self._by_day[day].overlapping_entries(start, end):
+            if rules_overlap(day, recurrence, self.activities[i].recurrence):
+                busy.occupy(day, s, e)
+        return list(busy.free_intervals(day, start, end))
+
+    def add(self, activity, activity_id=None):
+        # activity_id só é passado para restaurar uma atividade (desfazer etc.)
+        self.validate(activity)
+        if activity_id in self.activities:
+            raise ValueError(f"id já existe: {activity_id}")
+        clashes = self.clashes(activity)
+        if clashes and not self.allow_overlaps:
+            raise ConflictError(clashes)
+
+        if activity_id is None:
+            activity_id = self._next_id
+        self._next_id = max(self._next_id, activity_id + 1)
+        self.activities[activity_id] = activity
+        self._index(activity_id, activity)
+        self._notify("add", activity_id, activity)
+        if clashes:
+            self._link(activity_id, clashes)
+            self._notify("conflicts", None, {activity_id, *clashes})
+        return activity_id
+
+    def _index(self, activity_id, activity):
+        day, start, end = activity.day, activity.start, activity.end
+        self._by_day[day].add(start, end, activity_id)
+        weeks = _rule_weeks(activity.recurrence)
+        if weeks is None:
+            self._open[day].add(start, end, activity_id)
+        else:
+            by_week = self._by_week[day]
+            for week in weeks:
+                if week not in by_week:
+                    by_week[week] = IntervalIndex()
+                by_week[week].add(start, end, activity_id)
+        self.occupancy.occupy(day, start, end)
+
+    def _index_many(self, items):
+        # Como _index, mas com uma inserção em lote por índice de dia
+        per_day = [[] for _ in DAYS]
+        open_per_day = [[] for _ in DAYS]
+        for activity_id, a in items:
+            entry = (a.start, a.end, activity_id)
+            per_day[a.day].append(entry)
+            weeks = _rule_weeks(a.recurrence)
+            if weeks is None:
+                open_per_day[a.day].append(entry)
+            else:
+                by_week = self._by_week[a.day]
+                for week in weeks:
+                    if week not in by_week:
+                        by_week[week] = IntervalIndex()
+                    by_week[week].add(*entry)
+            self.occupancy.occupy(a.day, a.start, a.end)
+        for day in range(len(DAYS)):
+            if per_day[day]:
+                self._by_day[day].update(per_day[day])
+            if open_per_day[day]:
+                self._open[day].update(open_per_day[day])
+
+    def _unindex(self, activity_id, activity):
+        day, start, end = activity.day, activity.start, activity.end
+        self._by_day[day].remove(start, end, activity_id)
+        weeks = _rule_weeks(activity.recurrence)
+        if weeks is None:
+            self._open[day].remove(start, end, activity_id)
+        else:
+            by_week = self._by_week[day]
+            for week in weeks:
+                by_week[week].remove(start, end, activity_id)
+                if not by_week[week]:
+                    del by_week[week]
+        self._release(day, start, end)
+
+    def conflicts_of(self, activity_id):
+        return self.conflict_graph.get(activity_id, set())
+
+    def _link(self, activity_id, others):
+        graph = self.conflict_graph
+        graph.setdefault(activity_id, set()).update(others)
+        for other in others:
+            graph.setdefault(other, set()).add(activity_id)
+
+    def _unlink(self, activity_id):
+        graph = self.conflict_graph
+        others = graph.pop(activity_id, set())
+        for other in others:
+            graph[other].discard(activity_id)
+            if not graph[other]:
+                del graph[other]
+        return others
+
+    def add_many(self, activities):
+        activities = list(activities)
+        result = BatchResult(len(activities))
+        per_day = [[] for _ in DAYS]
+        for row, activity in enumerate(activities):
+            try:
+                self.validate(activity)
+            except ValueError as e:
+                result.errors[row] = str(e)
+                continue
+            per_day[activity.day].append((activity.start, activity.end, row))
+
+        accepted = []
+        overlaps = {}
+        for day, batch in enumerate(per_day):
+            if batch:
+                accepted.extend(
+                    self._sweep(day, batch, activities, result, overlaps)
+                )
+
+        # Só grava depois de conhecer todos os conflitos: o lote é atômico
+        added = []
+        for row in sorted(accepted):
+            activity_id = self._next_id
+            self._next_id += 1
+            self.activities[activity_id] = activities[row]
+            result.ids[row] = activity_id
+            added.append((activity_id, activities[row]))
+        self._index_many(added)
+        if added:
+            self._notify("add_many", None, added)
+
+        if self.allow_overlaps and overlaps:
+            changed = set()
+            for row, clashes in overlaps.items():
+                others = [result.ids[ref] if kind else ref for kind, ref in clashes]
+                self._link(result.ids[row], others)
+                changed.add(result.ids[row])
+                changed.update(others)
+            self._notify("conflicts", None, changed)
+        return result
+
+    def _sweep(self, day, batch, activities, result, overlaps):
+        # Conflitos dos itens do lote no dia, sempre com ao menos um item do
+        # lote no par: pares de atividades já existentes nunca são comparados.
+        # Uma varredura cobre os pares com alguma regra aberta; pares de
+        # regras datadas são varridos só dentro das semanas em comum.
+        def rule(kind, ref):
+            source = activities if kind else self.activities
+            return source[ref].recurrence
+
+        def found(kind, ref, other_kind, other):
+            if kind == 1:
+                overlaps.setdefault(ref, []).append((other_kind, other))
+            if other_kind == 1:
+                overlaps.setdefault(other, []).append((kind, ref))
+
+        lo = min(s for s, _, _ in batch)
+        hi = max(e for _, e, _ in batch)
+        events = []
+        buckets = {}  # semana: [(início, fim, 1, linha)] das regras datadas
+        any_open = False
+        for s, e, row in batch:
+            weeks = _rule_weeks(activities[row].recurrence)
+            events.append((s, e, 1, row, weeks is not None))
+            if weeks is None:
+                any_open = True
+            else:
+                for week in weeks:
+                    buckets.setdefault(week, []).append((s, e, 1, row))
+        # Existentes datadas só interessam à varredura se o lote tem abertas
+        existing = self._by_day[day] if any_open else self._open[day]
+        for s, e, i in existing.overlapping_entries(lo, hi):
+            dated = _rule_weeks(self.activities[i].recurrence) is not None
+            events.append((s, e, 0, i, dated))
+        events.sort()
+
+        # Um heap (fim, tipo, ref) por (tipo, datada); cada evento olha só os
+        # heaps com que pode formar um par útil
+        active = {(k, d): [] for k in (0, 1) for d in (False, True)}
+        for start, end, kind, ref, dated in events:
+            for (other_kind, other_dated), heap in active.items():
+                while heap and heap[0][0] <= start:
+                    heapq.heappop(heap)
+                if not (kind or other_kind) or (dated and other_dated):
+                    continue
+                for _, _, other in heap:
+                    if rules_overlap(day, rule(kind, ref), rule(other_kind, other)):
+                        found(kind, ref, other_kind, other)
+            heapq.heappush(active[kind, dated], (end, kind, ref))
+
+        seen = set()
+        by_week = self._by_week[day]
+        for week, week_events in buckets.items():
+            index = by_week.get(week)
+            if index is not None:
+                week_events.extend(
+                    (s, e, 0, i) for s, e, i in index.overlapping_entries(lo, hi)
+                )
+            week_events.sort()
+            active = ([], [])  # existentes, do lote
+            for start, end, kind, ref in week_events:
+                for other_kind, heap in enumerate(active):
+                    while heap and heap[0][0] <= start:
+                        heapq.heappop(heap)
+                    if not (kind or other_kind):
+                        continue
+                    for _, other in heap:
+                        pair = (kind, ref, other_kind, other)
+                        if pair in seen:
+                            continue  # já comparados noutra semana
+                        seen.add(pair)
+                        if rules_overlap(day, rule(kind, ref), rule(other_kind, other)):
+                            found(kind, ref, other_kind, other)
+                heapq.heappush(active[kind], (end, ref))
+
+        if self.allow_overlaps:
+            return [row for _, _, row in batch]
+
+        accepted = []
+        taken = set()
+        for start, end, row in sorted(batch):
+            clashes = overlaps.get(row, [])
+            if any(kind == 0 or ref in taken for kind, ref in clashes):
+                result.conflicts[row] = [
+                    ("batch", ref) if kind else ("activity", ref)
+                    for kind, ref in clashes
+                ]
+            else:
+                taken.add(row)
+                accepted.append(row)
+        return accepted
+
+    def _release(self, day, start, end):
+        # Atividades com datas diferentes podem dividir o mesmo horário:
+        # devolve ao bitset os minutos de quem ainda ocupa o trecho.
+        index = self._by_day[day]
+        if index.covers(start, end):
+            return  # outra atividade ainda ocupa o trecho inteiro
+        self.occupancy.release(day, start, end)
+        for s, e, _ in index.overlapping_entries(start, end):
+            self.occupancy.occupy(day, max(s, start), min(e, end))
+
+    def occurrences(self, since, until):
+        # (data, id, atividade) entre since e until, em ordem de data; só as
+        # semanas pedidas são expandidas
+        def expand(activity_id, activity):
+            if activity.recurrence is not None:
+                dates = activity.occurrences(since, until)
+            else:
+                first = since + (activity.day - since.weekday()) % 7 * DAY
+                dates = _every_week(first)
+            for date in dates:
+                if date > until:
+                    return
+                yield date, activity.start, activity_id, activity
+
+        streams = [expand(i, a) for i, a in self.activities.items()]
+        for date, _, activity_id, activity in heapq.merge(*streams):
+            yield date, activity_id, activity
+
+    def remove(self, activity_id):
+        activity = self.activities.pop(activity_id)
+        self._unindex(activity_id, activity)
+        self._notify("remove", activity_id, activity)
+        others = self._unlink(activity_id)
+        if others:
+            self._notify("conflicts", None, others)
+        return activity
+
+    def move(self, activity_id, day, start, end):
+        old = self.activities[activity_id]
+        activity = old.moved(day, start, end)
+        self.validate(activity)
+        clashes = self.clashes(activity, ignore=activity_id)
+        if clashes and not self.allow_overlaps:
+            raise ConflictError(clashes)
+
+        self._notify("before_move", activity_id, old)
+        self._unindex(activity_id, old)
+        self.activities[activity_id] = activity
+        self._index(activity_id, activity)
+        self._notify("move", activity_id, activity)
+        changed = self._unlink(activity_id)
+        if clashes:
+            self._link(activity_id, clashes)
+            changed.update(clashes)
+        if changed:
+            self._notify("conflicts", None, changed | {activity_id})
+        return activity
+
+    def resize(self, activity_id, end):
+        activity = self.activities[activity_id]
+        return self.move(activity_id, activity.day, activity.start, end)
+
+    def clear(self):
+        for activity_id in list(self.activities):
+            self.remove(activity_id)
+
+
+class SlotIndex:
+    # Ocupação da grade: célula -> id da atividade e id -> células ocupadas,
+    # para que apagar ou mover custe só o tamanho da própria atividade.
+    def __init__(self):
+        self.cells = {}  # célula: id
+        self.slots = {}  # id: [células]
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, activity_id):
+        return activity_id in self.slots
+
+    def at(self, cell):
+        return self.cells.get(cell)
+
+    def occupy(self, activity_id, cells):
+        cells = list(cells)
+        self.slots[activity_id] = cells
+        for cell in cells:
+            self.cells[cell] = activity_id
+
+    def release(self, activity_id):
+        cells = self.slots.pop(activity_id)
+        for cell in cells:
+            if self.cells.get(cell) == activity_id:
+                del self.cells[cell]
+        return cells
@@ -0,0 +1,97 @@
+# occupancy.py
+# Ocupação semanal em bits: um inteiro por dia, um bit por minuto (bit 0 = 00:00).
+# "Está livre?", "tempo livre em comum" e "minutos ocupados" viram poucas
+# operações bit a bit.
+MINUTES_PER_DAY = 24 * 60
+DAYS_PER_WEEK = 7
+FULL_DAY = (1 << MINUTES_PER_DAY) - 1
+
+
+def minute_mask(start, end):
+    return ((1 << (end - start)) - 1) << start
+
+
+class WeekOccupancy:
+    __slots__ = ("days",)
+
+    def __init__(self, days=None):
+        self.days = list(days) if days is not None else [0] * DAYS_PER_WEEK
+
+    @classmethod
+    def from_activities(cls, activities):
+        week = cls()
+        for activity in activities:
+            week.occupy(activity.day, activity.start, activity.end)
+        return week
+
+    def copy(self):
+        return WeekOccupancy(self.days)
+
+    def __eq__(self, other):
+        return isinstance(other, WeekOccupancy) and self.days == other.days
+
+    def __repr__(self):
+        return f"WeekOccupancy({self.occupied_minutes()} min ocupados)"
+
+    def occupy(self, day, start, end):
+        self.days[day] |= minute_mask(start, end)
+
+    def release(self, day, start, end):
+        self.days[day] &= ~minute_mask(start, end)
+
+    def clear(self):
+        self.days = [0] * DAYS_PER_WEEK
+
+    def is_free(self, day, start, end):
+        return not self.days[day] & minute_mask(start, end)
+
+    def is_occupied(self, day, minute):
+        return bool(self.days[day] >> minute & 1)
+
+    def occupied_minutes(self, day=None):
+        if day is not None:
+            return self.days[day].bit_count()
+        return sum(bits.bit_count() for bits in self.days)
+
+    def free_minutes(self, day=None):
+        total = MINUTES_PER_DAY * (1 if day is not None else DAYS_PER_WEEK)
+        return total - self.occupied_minutes(day)
+
+    def __or__(self, other):
+        return WeekOccupancy(a | b for a, b in zip(self.days, other.days))
+
+    def __and__(self, other):
+        return WeekOccupancy(a & b for a, b in zip(self.days, other.days))
+
+    def __invert__(self):
+        return WeekOccupancy(~bits & FULL_DAY for bits in self.days)
+
+    def overlaps(self, other):
+        return any(a & b for a, b in zip(self.days, other.days))
+
+    def common_free(self, *others):
+        # Minutos livres para todos: complemento da união das ocupações
+        busy = list(self.days)
+        for other in others:
+            busy = [a | b for a, b in zip(busy, other.days)]
+        return WeekOccupancy(~bits & FULL_DAY for bits in busy)
+
+    def intervals(self, day, start=0, end=MINUTES_PER_DAY):
+        return _runs(self.days[day], start, end)
+
+    def free_intervals(self, day, start=0, end=MINUTES_PER_DAY):
+        return _runs(~self.days[day] & FULL_DAY, start, end)
+
+
+def _runs(bits, start, end):
+    # Trechos contínuos de bits ligados em [start, end), como (início, fim)
+    bits = (bits & minute_mask(start, end)) >> start
+    offset = start
+    while bits:
+        skip = (bits & -bits).bit_length() - 1
+        bits >>= skip
+        offset += skip
+        run = (~bits & (bits + 1)).bit_length() - 1
+        yield offset, offset + run
+        bits >>= run
+        offset += run
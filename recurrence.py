@@ -0,0 +1,157 @@
+# recurrence.py
+# Regras de recorrência semanais avaliadas sob demanda.
+#
+# Uma regra diz em quais semanas a atividade acontece (a cada `interval`
+# semanas, entre start_date e end_date, menos as datas de exceção). As datas
+# são geradas preguiçosamente: só as semanas consultadas são materializadas.
+# Semanas são contadas a partir de 0001-01-01 (uma segunda-feira), de modo que
+# a semana de uma data é (toordinal() - 1) // 7 e o dia é date.weekday().
+import datetime
+from itertools import count
+from math import gcd
+
+
+def week_of(date):
+    return (date.toordinal() - 1) // 7
+
+
+def date_of(week, day):
+    return datetime.date.fromordinal(week * 7 + day + 1)
+
+
+def monday_of(date):
+    return date - datetime.timedelta(days=date.weekday())
+
+
+class Recurrence:
+    __slots__ = ("start_date", "end_date", "interval", "exceptions")
+
+    def __init__(self, start_date, end_date=None, interval=1, exceptions=()):
+        if interval < 1:
+            raise ValueError("intervalo deve ser de pelo menos uma semana")
+        if end_date is not None and end_date < start_date:
+            raise ValueError("data final antes da inicial")
+        self.start_date = start_date
+        self.end_date = end_date  # None = sem fim
+        self.interval = interval  # 1 = semanal, 2 = quinzenal...
+        self.exceptions = frozenset(exceptions)  # feriados etc.
+
+    def __repr__(self):
+        return (
+            f"Recurrence({self.start_date}, {self.end_date}, "
+            f"interval={self.interval}, exceptions={len(self.exceptions)})"
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, Recurrence) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    @property
+    def first_week(self):
+        return week_of(self.start_date)
+
+    @property
+    def last_week(self):
+        return None if self.end_date is None else week_of(self.end_date)
+
+    def occurs_on(self, date):
+        return (
+            self.start_date <= date
+            and (self.end_date is None or date <= self.end_date)
+            and (week_of(date) - self.first_week) % self.interval == 0
+            and date not in self.exceptions
+        )
+
+    def _weeks(self, since_week=None, until_week=None):
+        # Semanas da regra em [since_week, until_week], em ordem
+        first = self.first_week
+        if since_week is not None and since_week > first:
+            first += -(-(since_week - first) // self.interval) * self.interval
+        last = self.last_week
+        if until_week is not None and (last is None or until_week < last):
+            last = until_week
+        weeks = count(first, self.interval)
+        for week in weeks:
+            if last is not None and week > last:
+                return
+            yield week
+
+    def occurrences(self, day, since=None, until=None):
+        # Datas (datetime.date) em que a atividade do dia `day` acontece
+        weeks = self._weeks(
+            None if since is None else week_of(since),
+            None if until is None else week_of(until),
+        )
+        for week in weeks:
+            date = date_of(week, day)
+            if since is not None and date < since:
+                continue
+            if until is not None and date > until:
+                return
+            if self.occurs_on(date):
+                yield date
+
+
+def encode(rule):
+    # Texto compacto para persistência: "início/fim/intervalo/exceções"
+    if rule is None:
+        return None
+    end = rule.end_date.isoformat() if rule.end_date else ""
+    exceptions = ",".join(sorted(d.isoformat() for d in rule.exceptions))
+    return f"{rule.start_date.isoformat()}/{end}/{rule.interval}/{exceptions}"
+
+
+def decode(text):
+    if not text:
+        return None
+    start, end, interval, exceptions = text.split("/")
+    parse = datetime.date.fromisoformat
+    return Recurrence(
+        parse(start),
+        parse(end) if end else None,
+        int(interval),
+        [parse(d) for d in exceptions.split(",") if d],
+    )
+
+
+def common_dates(day, a, b):
+    # Datas em que as duas regras acontecem no mesmo dia da semana; None
+    # representa "toda semana, sem datas". Só expande as semanas em que as
+    # duas regras podem coincidir.
+    if a is None and b is None:
+        raise ValueError("regras sem datas coincidem em toda semana")
+    if a is None or b is None:
+        yield from (a or b).occurrences(day)
+        return
+
+    first = max(a.first_week, b.first_week)
+    lasts = [w for w in (a.last_week, b.last_week) if w is not None]
+    last = min(lasts) if lasts else None
+    if last is not None and first > last:
+        return
+
+    # Semanas w com w ≡ a.first (mod a.interval) e w ≡ b.first (mod b.interval):
+    # há solução só se as fases forem compatíveis módulo o mdc (teorema chinês).
+    g = gcd(a.interval, b.interval)
+    if (a.first_week - b.first_week) % g:
+        return
+    step = a.interval * b.interval // g
+    week = first
+    while (week - a.first_week) % a.interval or (week - b.first_week) % b.interval:
+        week += 1
+    while last is None or week <= last:
+        date = date_of(week, day)
+        if a.occurs_on(date) and b.occurs_on(date):
+            yield date
+        week += step
+
+
+def rules_overlap(day, a, b):
+    # As regras têm pelo menos uma data em comum?
+    if a is None and b is None:
+        return True
+    return next(common_dates(day, a, b), None) is not None
@@ -1,4 +1,5 @@
 from PyQt5.QtWidgets import (
+    QApplication,
     QMainWindow,
     QPushButton,
     QVBoxLayout,
@@ -9,47 +10,195 @@ from PyQt5.QtWidgets import (
     QGridLayout,
     QLabel,
     QScrollArea,
+    QShortcut,
+    QFileDialog,
 )
-from PyQt5.QtCore import Qt
-from activity import ActivityDialog
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QColor, QKeySequence, QPainter
+import datetime
+import os
+import csvimport
+import ical
+from activity import ActivityDialog, create_activity_widget
+from canvas import TimetableCanvas
+from history import History
+from importer import run_import
+from model import (
+    ConflictError,
+    DAYS,
+    WEEK,
+    Schedule,
+    SlotIndex,
+    format_minutes,
+    format_slot,
+    row_span,
+    ruler_marks,
+)
+from recurrence import monday_of
+from tablemodel import TimetableModel, TimetableView
+
+
+class TimeRuler(QWidget):
+    # Coluna de horários desenhada sob demanda: só os rótulos da área exposta
+    # são pintados, em vez de um QLabel por linha da grade.
+    def __init__(self, day_start, day_end, slot_minutes, parent=None):
+        super().__init__(parent)
+        self.day_start = day_start
+        self.day_end = day_end
+        self.slot_minutes = slot_minutes
+        self.setMinimumWidth(self.fontMetrics().width("00:00 - 00:00") + 12)
+
+    def minute_y(self, minute):
+        total = self.day_end - self.day_start
+        return round((minute - self.day_start) * self.height() / total)
+
+    def y_minute(self, y):
+        total = self.day_end - self.day_start
+        return self.day_start + y * total / max(1, self.height())
+
+    def label_minutes(self, top, bottom):
+        # Marcas (início, fim, rótulo) entre as alturas top e bottom
+        return ruler_marks(
+            self.day_start,
+            self.day_end,
+            self.slot_minutes,
+            self.y_minute(max(0, top)),
+            self.y_minute(bottom),
+        )
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        painter.setPen(self.palette().text().color())
+        exposed = e.rect()
+        for start, end, text in self.label_minutes(exposed.top(), exposed.bottom()):
+            top, bottom = self.minute_y(start), self.minute_y(end)
+            if self.slot_minutes >= 60:
+                rect = QRect(0, top, self.width() - 6, bottom - top)
+                painter.drawText(rect, Qt.AlignRight | Qt.AlignVCenter, text)
+            else:
+                height = painter.fontMetrics().height()
+                rect = QRect(0, top, self.width() - 6, height)
+                painter.drawText(rect, Qt.AlignRight | Qt.AlignTop, text)
+
+
+class GridBackground(QWidget):
+    # Container da grade: desenha as linhas de hora só na área exposta
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ruler = None
+
+    def paintEvent(self, e):
+        if self.ruler is None:
+            return
+        painter = QPainter(self)
+        painter.setPen(QColor(0, 0, 0, 30))
+        ruler = self.ruler
+        left = ruler.geometry().right()
+        right = self.width() - self.layout().contentsMargins().right()
+        exposed = e.rect()
+        top = exposed.top() - ruler.y()
+        bottom = exposed.bottom() - ruler.y()
+        for minute, _, _ in ruler.label_minutes(top, bottom):
+            y = ruler.y() + ruler.minute_y(minute)
+            painter.drawLine(left, y, right, y)
 
 
 class CronogramaWindow(QMainWindow):
-    def __init__(self, fonts, parent=None):
+    def __init__(
+        self,
+        fonts,
+        schedule=None,
+        parent=None,
+        start_hour=7,
+        end_hour=21,
+        slot_minutes=60,
+        canvas=False,
+        table=False,
+    ):
         super().__init__(parent)
         self.fonts = fonts
+        self.schedule = schedule if schedule is not None else Schedule()
+        self.history = History(self.schedule)
+        self.autosaver = None
         self.setWindowTitle("Cronograma com Grid")
         self.resize(1000, 950)
 
-        self.rows = 14  # 7h às 21h
-        self.cols = 7  # dias da semana: seg a sáb
-        self.cell_height = 60
-        self.activities = {}  # (row, col): widget
+        if (end_hour - start_hour) * 60 % slot_minutes:
+            raise ValueError("a faixa de horários deve ser múltipla da linha")
+        self.day_start = start_hour * 60  # padrão: 7h às 21h
+        self.day_end = end_hour * 60
+        self.slot_minutes = slot_minutes  # minutos por linha da grade
+        self.rows = (self.day_end - self.day_start) // slot_minutes
+        self.cols = 7  # dias da semana: seg a dom
+        self.cell_height = 60  # pixels por hora
+        self.row_height = max(1, self.cell_height * slot_minutes // 60)
+        self.slots = SlotIndex()  # (row, col) <-> id da atividade
+        self.widgets = {}  # id da atividade: widget
+        self.week = None  # segunda-feira da semana exibida; None = todas
 
         self.grid = QGridLayout()
-        self.grid.setSpacing(4)
+        self.grid.setHorizontalSpacing(4)
+        self.grid.setVerticalSpacing(0)
         self.grid.setContentsMargins(20, 20, 20, 20)
 
-        grid_container = QWidget()
-        grid_container.setLayout(self.grid)
+        self.grid_container = GridBackground()
+        self.grid_container.setLayout(self.grid)
 
         self.scroll = QScrollArea()
         self.scroll.setWidgetResizable(True)
-        self.scroll.setWidget(grid_container)
+        self.scroll.setWidget(self.grid_container)
 
-        # Preencher grade com horários e dias
+        # Preencher grade com horários e dias: uma régua só para a coluna 0
+        self.ruler = TimeRuler(self.day_start, self.day_end, slot_minutes)
+        self.ruler.setFixedHeight(self.rows * self.row_height)
+        self.grid.addWidget(self.ruler, 1, 0, self.rows, 1)  # coluna 0
+        self.grid_container.ruler = self.ruler
         for row in range(self.rows):
-            label = QLabel(f"{7 + row}:00 - {8 + row}:00")
-            label.setFixedHeight(self.cell_height)
-            label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.grid.addWidget(label, row + 1, 0)  # coluna 0: horários
+            self.grid.setRowMinimumHeight(row + 1, self.row_height)
+        self.grid.setRowStretch(self.rows + 1, 1)
 
-        days = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
-        for col, day in enumerate(days):
+        for col, day in enumerate(DAYS):
             label = QLabel(day)
             label.setAlignment(Qt.AlignCenter)
             self.grid.addWidget(label, 0, col + 1)  # linha 0: cabeçalho
 
+        # canvas=True: grade inteira pintada num só widget (canvas.py) em vez
+        # de um widget por atividade. Com allow_overlaps o canvas é o padrão: a
+        # grade de widgets empilharia atividades sobrepostas na mesma célula,
+        # e o canvas divide a coluna em faixas
+        self.canvas = None
+        if canvas or (self.schedule.allow_overlaps and not table):
+            self.canvas = TimetableCanvas(
+                fonts,
+                day_start=self.day_start,
+                day_end=self.day_end,
+                slot_minutes=slot_minutes,
+                row_height=self.row_height,
+            )
+            self.canvas.set_schedule(self.schedule)
+            self.canvas.activityClicked.connect(
+                lambda i: self.delete_activity(i) if self.delete_mode else None
+            )
+            self.scroll.takeWidget()  # a grade fica fora da tela, sem uso
+            self.scroll.setWidget(self.canvas)
+
+        # table=True: QTableView sobre um modelo do Schedule (tablemodel.py)
+        self.table = None
+        if table:
+            self.table = TimetableView(fonts, row_height=self.row_height)
+            self.table.setModel(
+                TimetableModel(
+                    self.schedule,
+                    self.day_start,
+                    self.day_end,
+                    slot_minutes,
+                    parent=self.table,
+                )
+            )
+            self.table.activityClicked.connect(
+                lambda i: self.delete_activity(i) if self.delete_mode else None
+            )
+
         # Botões
         self.add_button = QPushButton("Adicionar")
         self.add_button.clicked.connect(self.add_activity)
@@ -61,70 +210,284 @@ class CronogramaWindow(QMainWindow):
             lambda chk: setattr(self, "delete_mode", chk)
         )
 
+        self.import_button = QPushButton("Importar…")
+        self.import_button.clicked.connect(self.import_file)
+        self.export_button = QPushButton("Exportar .ics")
+        self.export_button.clicked.connect(self.export_ics)
+
+        self.undo_button = QPushButton("Desfazer")
+        self.undo_button.clicked.connect(self.undo)
+        self.redo_button = QPushButton("Refazer")
+        self.redo_button.clicked.connect(self.redo)
+        QShortcut(QKeySequence.Undo, self, activated=self.undo)
+        QShortcut(QKeySequence.Redo, self, activated=self.redo)
+        self.update_history_buttons()
+
+        # Navegação por semana: só as ocorrências da semana exibida são criadas
+        self.prev_week_button = QPushButton("◀")
+        self.prev_week_button.clicked.connect(lambda: self.shift_week(-1))
+        self.week_label = QLabel("Todas as semanas")
+        self.next_week_button = QPushButton("▶")
+        self.next_week_button.clicked.connect(lambda: self.shift_week(1))
+
         btn_layout = QHBoxLayout()
+        btn_layout.addWidget(self.prev_week_button)
+        btn_layout.addWidget(self.week_label)
+        btn_layout.addWidget(self.next_week_button)
         btn_layout.addStretch()
         btn_layout.addWidget(self.add_button)
         btn_layout.addWidget(self.delete_button)
+        btn_layout.addWidget(self.import_button)
+        btn_layout.addWidget(self.export_button)
+        btn_layout.addWidget(self.undo_button)
+        btn_layout.addWidget(self.redo_button)
         btn_layout.addStretch()
 
         main_layout = QVBoxLayout()
         main_layout.addLayout(btn_layout)
-        main_layout.addWidget(self.scroll)
+        main_layout.addWidget(self.table if self.table is not None else self.scroll)
 
         container = QWidget()
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
+        self.schedule.subscribe(self.on_schedule_changed)
+        self.render_many(list(self.schedule))
+
     def add_activity(self):
-        dlg = ActivityDialog(self)
+        dlg = ActivityDialog(
+            self, schedule=self.schedule, day_range=(self.day_start, self.day_end)
+        )
         if dlg.exec() != QDialog.Accepted:
             return
 
-        data = dlg.get_data()
-        if not data["code"].strip() or not data["title"].strip() or data["day"] == 0:
+        activity = dlg.get_activity()
+        if not activity.code.strip() or not activity.title.strip() or activity.day < 0:
             QMessageBox.warning(self, "Erro", "Preencha todos os campos obrigatórios.")
             return
 
-        start = data["start"].hour()
-        end = data["end"].hour()
-        row = start - 7
-        span = end - start
-        col = data["day"] - 1
-
-        if span <= 0:
+        if activity.end <= activity.start:
             QMessageBox.warning(self, "Erro", "Horário final deve ser após o início.")
             return
 
-        # Verificar sobreposição
-        for r in range(row, row + span):
-            if (r, col) in self.activities:
-                QMessageBox.warning(
-                    self, "Conflito", "Já existe atividade nesse horário."
+        if activity.start < self.day_start or activity.end > self.day_end:
+            QMessageBox.warning(
+                self,
+                "Erro",
+                f"Horário fora da grade ({format_minutes(self.day_start)}"
+                f" – {format_minutes(self.day_end)}).",
+            )
+            return
+
+        try:
+            self.schedule.add(activity)
+        except ConflictError as e:
+            codes = ", ".join(
+                f"{self.schedule.get(i).code} ({self.schedule.get(i).time_str()})"
+                for i in e.conflicts
+            )
+            message = f"Já existe atividade nesse horário: {codes}"
+            slots = self.schedule.suggest_slots(
+                activity.day,
+                activity.start,
+                activity.duration,
+                day_start=self.day_start,
+                day_end=self.day_end,
+                recurrence=activity.recurrence,
+            )
+            if slots:
+                message += "\n\nHorários livres mais próximos:\n" + "\n".join(
+                    format_slot(*slot) for slot in slots
                 )
+            QMessageBox.warning(self, "Conflito", message)
+
+    def import_file(self, path=None):
+        # .ics (calendários) ou .csv (planilhas da secretaria)
+        if not path:
+            path, _ = QFileDialog.getOpenFileName(
+                self,
+                "Importar atividades",
+                "",
+                "Calendário ou planilha (*.ics *.csv);;iCalendar (*.ics);;CSV (*.csv)",
+            )
+            if not path:
                 return
+        summary = ical.ImportSummary()
+        report = None
+        if path.lower().endswith(".csv"):
+            report = os.path.splitext(path)[0] + "-conflitos.csv"
+            chunks = csvimport.iter_activity_chunks(
+                path, skipped=summary.skipped, report=report
+            )
+        else:
+            chunks = ical.iter_activity_chunks(path, skipped=summary.skipped)
+        activities = []
+        try:
+            finished = run_import(self, chunks, activities.extend)
+        except ValueError as e:
+            QMessageBox.warning(self, "Erro", f"Falha ao ler o arquivo: {e}")
+            return
+        if not finished:
+            QMessageBox.information(self, "Importação", "Importação cancelada.")
+            return summary
+        # Uma só verificação de conflitos para o arquivo inteiro
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            summary.add_result(activities, self.add_many(activities))
+        finally:
+            QApplication.restoreOverrideCursor()
+        message = f"{summary.added} atividades importadas."
+        if summary.conflicts:
+            message += f"\n{len(summary.conflicts)} recusadas por conflito."
+        if summary.errors:
+            message += f"\n{len(summary.errors)} inválidas."
+        if summary.skipped:
+            message += f"\n{len(summary.skipped)} ignoradas (fora da grade, erros)."
+        if report is not None and summary.skipped:
+            message += f"\nRelatório de conflitos: {report}"
+        QMessageBox.information(self, "Importação", message)
+        return summary
 
-        # Passa height_px apenas para cálculos internos de texto, mas NÃO fixa altura
-        height_px = self.cell_height * span
-        widget = dlg.create_widget(self.fonts, parent=self, height_px=height_px)
+    def export_ics(self, path=None):
+        if not path:
+            path, _ = QFileDialog.getSaveFileName(
+                self, "Exportar calendário", "cronograma.ics", "iCalendar (*.ics)"
+            )
+            if not path:
+                return
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as fp:
+                items = ical.schedule_items(self.schedule)
+                ical.write_ics(items, fp, reference=self.week)
+        except OSError as e:
+            QMessageBox.warning(self, "Erro", f"Falha ao exportar: {e}")
 
-        # REMOVIDO: widget.setFixedHeight(height_px)
+    def attach_autosaver(self, autosaver):
+        # Indicador "Salvando…" na barra de status
+        self.autosaver = autosaver
+        status = self.statusBar()
+        autosaver.saving.connect(lambda: status.showMessage("Salvando…"))
+        autosaver.saved.connect(lambda _: status.showMessage("Salvo", 2000))
+        autosaver.failed.connect(
+            lambda error: status.showMessage(f"Falha ao salvar: {error}; tentando")
+        )
+        autosaver.abandoned.connect(self.autosave_abandoned)
 
-        widget.mousePressEvent = lambda e, r=row, c=col: (
-            self.delete_activity(r, c) if self.delete_mode else None
+    def autosave_abandoned(self, error):
+        self.statusBar().showMessage(f"Falha ao salvar: {error}")
+        QMessageBox.warning(
+            self,
+            "Erro",
+            f"Não foi possível salvar as alterações: {error}\n"
+            "Uma nova tentativa será feita na próxima edição.",
         )
 
+    def closeEvent(self, e):
+        if self.autosaver is not None:
+            self.autosaver.flush()
+        super().closeEvent(e)
+
+    def undo(self):
+        self.history.undo()
+        self.update_history_buttons()
+
+    def redo(self):
+        self.history.redo()
+        self.update_history_buttons()
+
+    def update_history_buttons(self):
+        self.undo_button.setEnabled(self.history.can_undo())
+        self.redo_button.setEnabled(self.history.can_redo())
+
+    def shift_week(self, step):
+        if self.week is None:
+            self.set_week(datetime.date.today())
+        else:
+            self.set_week(self.week + step * WEEK)
+
+    def set_week(self, date):
+        self.week = None if date is None else monday_of(date)
+        if self.week is None:
+            self.week_label.setText("Todas as semanas")
+        else:
+            self.week_label.setText(f"Semana de {self.week:%d/%m/%Y}")
+        if self.canvas is not None:
+            self.canvas.set_week(self.week)
+        if self.table is not None:
+            self.table.model().set_week(self.week)
+        for activity_id in list(self.widgets):
+            self.remove_widget(activity_id)
+        self.render_many(list(self.schedule))
+
+    def is_visible(self, activity):
+        return self.week is None or activity.occurs_in_week(self.week)
+
+    def on_schedule_changed(self, event, activity_id, activity):
+        if event == "add":
+            if self.is_visible(activity):
+                self.render_activity(activity_id, activity)
+        elif event == "add_many":
+            self.render_many(activity)
+        elif event == "remove":
+            if activity_id in self.widgets:
+                self.remove_widget(activity_id)
+        elif event == "move":
+            if activity_id in self.widgets:
+                self.remove_widget(activity_id)
+            if self.is_visible(activity):
+                self.render_activity(activity_id, activity)
+        elif event == "conflicts":
+            for i in activity:
+                if i in self.widgets:
+                    conflict = bool(self.schedule.conflicts_of(i))
+                    self.widgets[i].set_conflict(conflict)
+        self.update_history_buttons()
+
+    def render_activity(self, activity_id, activity):
+        if self.canvas is not None or self.table is not None:
+            return  # canvas e tabela acompanham o Schedule sozinhos
+        row, span = row_span(
+            activity, self.day_start, self.slot_minutes, self.rows
+        )
+        col = activity.day
+        if span <= 0:
+            return  # fora da faixa exibida
+
+        # Passa height_px apenas para cálculos internos de texto, mas NÃO fixa altura
+        height_px = self.row_height * span
+        widget = create_activity_widget(
+            activity, self.fonts, parent=self, height_px=height_px
+        )
+        widget.mousePressEvent = lambda e, i=activity_id: (
+            self.delete_activity(i) if self.delete_mode else None
+        )
+
+        widget.set_conflict(bool(self.schedule.conflicts_of(activity_id)))
+
         self.grid.addWidget(widget, row + 1, col + 1, span, 1)
-        for r in range(row, row + span):
-            self.activities[(r, col)] = widget
+        self.widgets[activity_id] = widget
+        self.slots.occupy(activity_id, ((r, col) for r in range(row, row + span)))
 
-    def delete_activity(self, row, col):
-        widget = self.activities.get((row, col))
-        if not widget:
-            return
+    def render_many(self, items):
+        # Adia a repintura e faz uma única passada de layout no final
+        self.grid_container.setUpdatesEnabled(False)
+        try:
+            for activity_id, activity in items:
+                if self.is_visible(activity):
+                    self.render_activity(activity_id, activity)
+        finally:
+            self.grid.activate()
+            self.grid_container.setUpdatesEnabled(True)
+
+    def add_many(self, activities):
+        return self.schedule.add_many(activities)
+
+    def remove_widget(self, activity_id):
+        widget = self.widgets.pop(activity_id)
         self.grid.removeWidget(widget)
         widget.setParent(None)
+        self.slots.release(activity_id)
 
-        # Limpar todas as referências a esse widget
-        to_delete = [(r, c) for (r, c), w in self.activities.items() if w == widget]
-        for key in to_delete:
-            del self.activities[key]
+    def delete_activity(self, activity_id):
+        if activity_id in self.schedule:
+            self.schedule.remove(activity_id)
@@ -0,0 +1,287 @@
+# snapshot.py
+# Formato binário compacto para arquivos com muitos cronogramas.
+#
+# Registros de largura fixa (id, dia, início, fim, índice de cor e posições
+# na tabela de textos) seguidos de um índice de cronogramas, uma tabela de
+# cores e uma tabela de textos compartilhada. O arquivo é aberto com mmap:
+# abrir só lê o cabeçalho, e cada cronograma é decodificado quando é pedido.
+# O CRC32 cobre tudo depois do cabeçalho e, em seguida, o próprio cabeçalho
+# com o campo do CRC zerado; é conferido por verify().
+#
+# Layout (little-endian):
+#   cabeçalho   HEADER
+#   registros   RECORD * record_count (agrupados por cronograma)
+#   índice      SCHEDULE * schedule_count
+#   cores       COLOR * color_count
+#   textos      offsets uint64 * (string_count + 1), depois os bytes UTF-8
+import mmap
+import os
+import struct
+import zlib
+
+from model import Activity, Schedule
+from recurrence import decode, encode
+
+MAGIC = b"SCHD"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIQQQQQI")
+RECORD = struct.Struct("<IHHHBxIII")  # id, início, fim, cor, dia, código...
+SCHEDULE = struct.Struct("<IQI")  # nome, primeiro registro, quantidade
+COLOR = struct.Struct("<II")  # 0xRRGGBB, nome (NO_STRING = sem nome)
+OFFSET = struct.Struct("<Q")
+NO_STRING = 0xFFFFFFFF
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class _Strings:
+    # Tabela de textos internados durante a escrita
+    def __init__(self):
+        self.ids = {}
+
+    def __call__(self, text):
+        if text is None:
+            return NO_STRING
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.ids)
+        return string_id
+
+
+class _Writer:
+    # Escreve em sequência acumulando o CRC32 de tudo após o cabeçalho
+    def __init__(self, fp):
+        self.fp = fp
+        self.crc = 0
+        self.size = 0
+
+    def write(self, data):
+        self.fp.write(data)
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+
+
+def write_archive(path, schedules, tag=0):
+    # schedules: (nome, [(activity_id, Activity)]) — Schedule.snapshot() serve.
+    # Os registros são gravados em fluxo; a memória cresce só com os textos
+    # distintos. tag é um inteiro livre (p. ex. a geração do diário).
+    strings = _Strings()
+    colors = {}
+    index = []
+    count = 0
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(bytes(HEADER.size))
+        out = _Writer(f)
+        pack = RECORD.pack
+        for name, items in schedules:
+            first = count
+            batch = []
+            for activity_id, a in items:
+                color = colors.setdefault((a.color, a.color_name), len(colors))
+                batch.append(
+                    pack(
+                        activity_id,
+                        a.start,
+                        a.end,
+                        color,
+                        a.day,
+                        strings(a.code),
+                        strings(a.title),
+                        strings(encode(a.recurrence)),
+                    )
+                )
+                if len(batch) >= 4096:
+                    out.write(b"".join(batch))
+                    count += len(batch)
+                    batch.clear()
+            out.write(b"".join(batch))
+            count += len(batch)
+            index.append((strings(name), first, count - first))
+
+        out.write(b"".join(SCHEDULE.pack(*entry) for entry in index))
+        out.write(
+            b"".join(
+                COLOR.pack(rgb, strings(color_name)) for rgb, color_name in colors
+            )
+        )
+        encoded = [text.encode() for text in strings.ids]
+        offsets = [0]
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        out.write(b"".join(OFFSET.pack(o) for o in offsets))
+        out.write(b"".join(encoded))
+
+        records_offset = HEADER.size
+        index_offset = records_offset + count * RECORD.size
+        colors_offset = index_offset + len(index) * SCHEDULE.size
+        strings_offset = colors_offset + len(colors) * COLOR.size
+        fields = [
+            MAGIC,
+            VERSION,
+            0,
+            len(index),
+            len(colors),
+            len(strings.ids),
+            0,
+            count,
+            index_offset,
+            colors_offset,
+            strings_offset,
+            tag,
+            0,
+        ]
+        fields[-1] = zlib.crc32(HEADER.pack(*fields), out.crc)
+        f.seek(0)
+        f.write(HEADER.pack(*fields))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def is_archive(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class Archive:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if len(self._view) < HEADER.size:
+            self.close()
+            raise SnapshotError("arquivo truncado")
+        (
+            magic,
+            version,
+            _flags,
+            self.schedule_count,
+            color_count,
+            self.string_count,
+            _reserved,
+            self.record_count,
+            index_offset,
+            colors_offset,
+            strings_offset,
+            self.tag,
+            self.crc,
+        ) = HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            self.close()
+            raise SnapshotError("não é um arquivo de cronogramas")
+        if version != VERSION:
+            self.close()
+            raise SnapshotError(f"versão {version} não suportada")
+        self._index_offset = index_offset
+        self._strings_offset = strings_offset
+        self._blob_offset = strings_offset + (self.string_count + 1) * OFFSET.size
+        if self._blob_offset > len(self._view):
+            self.close()
+            raise SnapshotError("arquivo truncado")
+        self._string_cache = {NO_STRING: None}
+        self._rule_cache = {NO_STRING: None}
+        self._positions = None
+        self.colors = [
+            (rgb, self.string(name))
+            for rgb, name in COLOR.iter_unpack(
+                self._view[colors_offset : colors_offset + color_count * COLOR.size]
+            )
+        ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._mmap.close()
+            self._view = None
+
+    def __len__(self):
+        return self.schedule_count
+
+    def verify(self):
+        # Confere o CRC32 lendo o arquivo em blocos (não é feito ao abrir)
+        crc = 0
+        step = 1 << 24
+        for pos in range(HEADER.size, len(self._view), step):
+            crc = zlib.crc32(self._view[pos : pos + step], crc)
+        header = bytes(self._view[: HEADER.size - 4]) + bytes(4)
+        crc = zlib.crc32(header, crc)
+        if crc != self.crc:
+            raise SnapshotError("checksum não confere")
+
+    def string(self, string_id):
+        text = self._string_cache.get(string_id)
+        if text is None and string_id != NO_STRING:
+            if self._view is None:
+                raise SnapshotError("arquivo fechado")
+            if string_id >= self.string_count:
+                raise SnapshotError(f"texto inexistente: {string_id}")
+            pos = self._strings_offset + string_id * OFFSET.size
+            start, end = struct.unpack_from("<QQ", self._view, pos)
+            data = self._view[self._blob_offset + start : self._blob_offset + end]
+            text = self._string_cache[string_id] = str(data, "utf-8")
+        return text
+
+    def _rule(self, string_id):
+        if string_id not in self._rule_cache:
+            self._rule_cache[string_id] = decode(self.string(string_id))
+        return self._rule_cache[string_id]
+
+    def _entry(self, i):
+        if not 0 <= i < self.schedule_count:
+            raise IndexError(i)
+        pos = self._index_offset + i * SCHEDULE.size
+        return SCHEDULE.unpack_from(self._view, pos)
+
+    def names(self):
+        return [self.string(self._entry(i)[0]) for i in range(self.schedule_count)]
+
+    def find(self, name):
+        if self._positions is None:  # montado na primeira busca por nome
+            self._positions = {text: i for i, text in enumerate(self.names())}
+        return self._positions[name]
+
+    def items(self, i, batch=4096):
+        # Gera (activity_id, Activity) do cronograma i, decodificando sob
+        # demanda. Os registros são copiados em blocos: nenhuma fatia do mmap
+        # fica presa entre um yield e outro, então close() funciona mesmo com
+        # o gerador ainda vivo (que depois disso levanta SnapshotError)
+        _, first, count = self._entry(i)
+        start = HEADER.size + first * RECORD.size
+        stop = start + count * RECORD.size
+        step = batch * RECORD.size
+        string, rule, colors = self.string, self._rule, self.colors
+        for pos in range(start, stop, step):
+            if self._view is None:
+                raise SnapshotError("arquivo fechado")
+            records = bytes(self._view[pos : min(pos + step, stop)])
+            for fields in RECORD.iter_unpack(records):
+                activity_id, begin, end, color, day, code, title, rec = fields
+                rgb, color_name = colors[color]
+                yield activity_id, Activity(
+                    day,
+                    begin,
+                    end,
+                    string(code),
+                    string(title),
+                    rgb,
+                    color_name,
+                    rule(rec),
+                )
+
+    def load(self, i, allow_overlaps=False):
+        if isinstance(i, str):
+            i = self.find(i)
+        schedule = Schedule(allow_overlaps=allow_overlaps)
+        for activity_id, activity in self.items(i):
+            schedule.add(activity, activity_id=activity_id)
+        return schedule
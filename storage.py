@@ -0,0 +1,223 @@
+# storage.py
+# Persistência em SQLite: vários cronogramas num arquivo, com índice em
+# (schedule_id, day, start, end) para consultas de conflito e de horários
+# livres. WAL permite ler enquanto se grava, e as gravações vão em lote numa
+# transação. As consultas usam SQL fixo com parâmetros, então o sqlite3
+# reaproveita as instruções preparadas do cache da conexão. A conexão pode ser
+# usada por threads de salvamento: um lock serializa o acesso.
+import sqlite3
+import threading
+
+from model import DAY_END, DAY_START, Activity, Schedule
+from recurrence import decode, encode
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    allow_overlaps INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS activities (
+    schedule_id INTEGER NOT NULL REFERENCES schedules (id) ON DELETE CASCADE,
+    activity_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    start_min INTEGER NOT NULL,
+    end_min INTEGER NOT NULL,
+    code TEXT NOT NULL,
+    title TEXT NOT NULL,
+    color INTEGER NOT NULL,
+    color_name TEXT,
+    recurrence TEXT,
+    PRIMARY KEY (schedule_id, activity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS activities_interval
+    ON activities (schedule_id, day, start_min, end_min);
+"""
+
+FIELDS = (
+    "day, start_min, end_min, code, title, color, color_name, recurrence"
+)
+INSERT = (
+    f"INSERT OR REPLACE INTO activities (schedule_id, activity_id, {FIELDS}) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+DELETE = "DELETE FROM activities WHERE schedule_id = ? AND activity_id = ?"
+SELECT = (
+    f"SELECT activity_id, {FIELDS} FROM activities "
+    "WHERE schedule_id = ? AND activity_id > ? ORDER BY activity_id LIMIT ?"
+)
+SELECT_ALL = (
+    f"SELECT schedule_id, activity_id, {FIELDS} FROM activities "
+    "WHERE (schedule_id, activity_id) > (?, ?) "
+    "ORDER BY schedule_id, activity_id LIMIT ?"
+)
+CONFLICTS = (
+    "SELECT activity_id FROM activities "
+    "WHERE schedule_id = ? AND day = ? AND start_min < ? AND end_min > ?"
+)
+DAY_INTERVALS = (
+    "SELECT start_min, end_min FROM activities "
+    "WHERE schedule_id = ? AND day = ? AND start_min < ? AND end_min > ? "
+    "ORDER BY start_min"
+)
+
+
+def activity_row(schedule_id, activity_id, a):
+    return (
+        schedule_id,
+        activity_id,
+        a.day,
+        a.start,
+        a.end,
+        a.code,
+        a.title,
+        a.color,
+        a.color_name,
+        encode(a.recurrence),
+    )
+
+
+def row_activity(row):
+    day, start, end, code, title, color, color_name, recurrence = row
+    return Activity(
+        day, start, end, code, title, color, color_name, decode(recurrence)
+    )
+
+
+class SqliteStore:
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.db = sqlite3.connect(
+            path, cached_statements=64, check_same_thread=False
+        )
+        self.lock = threading.RLock()
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def schedule_id(self, name):
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO schedules (name) VALUES (?)", (name,)
+            )
+            return self.db.execute(
+                "SELECT id FROM schedules WHERE name = ?", (name,)
+            ).fetchone()[0]
+
+    def schedules(self):
+        with self.lock:
+            query = "SELECT id, name FROM schedules ORDER BY id"
+            return self.db.execute(query).fetchall()
+
+    def allow_overlaps(self, schedule_id):
+        # Modo de sobreposições gravado com o cronograma: o diário e o banco
+        # só podem ser recarregados no mesmo modo em que foram gravados
+        with self.lock:
+            query = "SELECT allow_overlaps FROM schedules WHERE id = ?"
+            return bool(self.db.execute(query, (schedule_id,)).fetchone()[0])
+
+    def set_allow_overlaps(self, schedule_id, allow):
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE schedules SET allow_overlaps = ? WHERE id = ?",
+                (int(allow), schedule_id),
+            )
+
+    def delete_schedule(self, schedule_id):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+
+    # Gravação
+
+    def insert_many(self, schedule_id, items):
+        # items: [(activity_id, Activity)], tudo numa transação
+        with self.lock, self.db:
+            self.db.executemany(
+                INSERT, (activity_row(schedule_id, i, a) for i, a in items)
+            )
+
+    def delete_many(self, schedule_id, activity_ids):
+        with self.lock, self.db:
+            self.db.executemany(DELETE, ((schedule_id, i) for i in activity_ids))
+
+    def save_schedule(self, schedule_id, schedule):
+        # schedule: Schedule (grava também o modo de sobreposições) ou
+        # qualquer iterável de (id, Activity)
+        if isinstance(schedule, Schedule):
+            self.set_allow_overlaps(schedule_id, schedule.allow_overlaps)
+        with self.lock, self.db:
+            self.db.execute(
+                "DELETE FROM activities WHERE schedule_id = ?", (schedule_id,)
+            )
+            self.db.executemany(
+                INSERT, (activity_row(schedule_id, i, a) for i, a in schedule)
+            )
+
+    # Leitura
+
+    def iter_activities(self, schedule_id=None, batch=1000):
+        # Lê em blocos pela chave (keyset): só um bloco fica na memória, e o
+        # lock é liberado antes de cada yield, de modo que um gerador
+        # abandonado no meio não trava as gravações de outras threads
+        last = (-1, -1)
+        while True:
+            with self.lock:
+                if schedule_id is None:
+                    rows = self.db.execute(SELECT_ALL, (*last, batch)).fetchall()
+                else:
+                    params = (schedule_id, last[1], batch)
+                    rows = self.db.execute(SELECT, params).fetchall()
+                    rows = [(schedule_id, *row) for row in rows]
+            for row in rows:
+                yield row[0], row[1], row_activity(row[2:])
+            if len(rows) < batch:
+                return
+            last = rows[-1][:2]
+
+    def load_schedule(self, schedule_id, allow_overlaps=None):
+        # allow_overlaps=None usa o modo gravado do cronograma
+        if allow_overlaps is None:
+            allow_overlaps = self.allow_overlaps(schedule_id)
+        schedule = Schedule(allow_overlaps=allow_overlaps)
+        for _, activity_id, activity in self.iter_activities(schedule_id):
+            schedule.add(activity, activity_id=activity_id)
+        return schedule
+
+    def conflicts(self, schedule_id, day, start, end):
+        with self.lock:
+            rows = self.db.execute(CONFLICTS, (schedule_id, day, end, start))
+            return [activity_id for (activity_id,) in rows]
+
+    def free_slots(
+        self, schedule_id, day, min_minutes, day_start=DAY_START, day_end=DAY_END
+    ):
+        # Lacunas de pelo menos min_minutes entre as atividades do dia
+        slots = []
+        cursor = day_start
+        with self.lock:
+            params = (schedule_id, day, day_end, day_start)
+            rows = self.db.execute(DAY_INTERVALS, params).fetchall()
+        for start, end in rows:
+            if start - cursor >= min_minutes:
+                slots.append((cursor, start))
+            cursor = max(cursor, end)
+        if day_end - cursor >= min_minutes:
+            slots.append((cursor, day_end))
+        return slots
+
+    def sync(self, schedule_id, schedule):
+        # Mantém o banco em dia com as edições do Schedule
+        def on_change(event, activity_id, activity):
+            if event in ("add", "move"):
+                self.insert_many(schedule_id, [(activity_id, activity)])
+            elif event == "add_many":
+                self.insert_many(schedule_id, activity)
+            elif event == "remove":
+                self.delete_many(schedule_id, [activity_id])
+
+        schedule.subscribe(on_change)
+        return on_change
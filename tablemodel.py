@@ -0,0 +1,314 @@
+# tablemodel.py
+# Grade do cronograma sobre o model/view do Qt.
+#
+# TimetableModel expõe as atividades como uma tabela (linhas = faixas de
+# horário, colunas = dias); cada atividade fica na célula do seu início e
+# ocupa as linhas seguintes com um span. CardDelegate desenha o mesmo cartão
+# com degradê dos AdaptiveLabel, vindo do cache de pixmaps. O QTableView só
+# pinta as células visíveis, e cada edição do Schedule vira um dataChanged
+# restrito às células da atividade afetada.
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QRect, QSize, Qt
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QColor, QPen
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QHeaderView,
+    QStyle,
+    QStyledItemDelegate,
+    QTableView,
+)
+
+import cardcache
+import fontcache
+from cardcache import paint_card
+from model import DAY_END, DAY_START, DAYS, SlotIndex, row_span, slot_label
+
+ACTIVITY_ROLE = Qt.UserRole  # Activity da célula
+ID_ROLE = Qt.UserRole + 1  # id da atividade
+CONFLICT_ROLE = Qt.UserRole + 2  # True se a atividade tem conflitos
+RESET_THRESHOLD = 1000  # lotes maiores recriam o modelo inteiro
+CARD_MARGIN = 2
+
+
+class TimetableModel(QAbstractTableModel):
+    # (linha, coluna, linhas) de uma atividade posta ou retirada; o QTableView
+    # não consulta span() do modelo, então a visão ajusta os spans por aqui
+    spanAdded = pyqtSignal(int, int, int)
+    spanRemoved = pyqtSignal(int, int)
+
+    def __init__(
+        self,
+        schedule=None,
+        day_start=DAY_START,
+        day_end=DAY_END,
+        slot_minutes=60,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.day_start = day_start
+        self.day_end = day_end
+        self.slot_minutes = slot_minutes
+        self.rows = -(-(day_end - day_start) // slot_minutes)
+        self.week = None  # segunda-feira exibida; None = todas as semanas
+        self.schedule = None
+        self.slots = SlotIndex()  # (linha, coluna) <-> id da atividade
+        self._anchors = {}  # (linha, coluna) do início: id
+        self._hidden = {}  # id: Activity sem espaço livre (sobreposições)
+        if schedule is not None:
+            self.set_schedule(schedule)
+
+    # Dados
+
+    def set_schedule(self, schedule):
+        if self.schedule is not None:
+            self.schedule.unsubscribe(self._changed)
+        self.schedule = schedule
+        schedule.subscribe(self._changed)
+        self._reset()
+
+    def set_week(self, monday):
+        self.week = monday
+        self._reset()
+
+    def _reset(self):
+        self.beginResetModel()
+        self.slots = SlotIndex()
+        self._anchors.clear()
+        self._hidden.clear()
+        if self.schedule is not None:
+            for activity_id, activity in self.schedule:
+                self._place(activity_id, activity)
+        self.endResetModel()
+
+    def _place(self, activity_id, activity, signal=False):
+        # Ocupa as células da atividade; devolve (linha, linhas) ou None
+        if self.week is not None and not activity.occurs_in_week(self.week):
+            return None
+        row, span = row_span(
+            activity, self.day_start, self.slot_minutes, self.rows
+        )
+        if span <= 0:
+            return None
+        col = activity.day
+        cells = [(r, col) for r in range(row, row + span)]
+        if any(self.slots.at(cell) is not None for cell in cells):
+            # Célula já ocupada por outra atividade: fica de fora até liberar
+            self._hidden[activity_id] = activity
+            return None
+        self.slots.occupy(activity_id, cells)
+        self._anchors[row, col] = activity_id
+        if signal:
+            self.spanAdded.emit(row, col, span)
+            self._cells_changed(row, row + span - 1, col)
+        return row, span
+
+    def _release(self, activity_id):
+        # Libera as células e tenta pôr as atividades que estavam de fora
+        if self._hidden.pop(activity_id, None) is not None:
+            return
+        if activity_id not in self.slots:
+            return
+        cells = self.slots.release(activity_id)
+        row, col = cells[0]
+        del self._anchors[row, col]
+        self.spanRemoved.emit(row, col)
+        self._cells_changed(row, cells[-1][0], col)
+        waiting = sorted(
+            (a.start, i) for i, a in self._hidden.items() if a.day == col
+        )
+        for _, i in waiting:
+            self._place(i, self._hidden.pop(i), signal=True)
+
+    def _cells_changed(self, top, bottom, col, roles=()):
+        self.dataChanged.emit(self.index(top, col), self.index(bottom, col), roles)
+
+    def _changed(self, event, activity_id, activity):
+        if event == "add":
+            self._place(activity_id, activity, signal=True)
+        elif event == "add_many":
+            if len(activity) > RESET_THRESHOLD:
+                self._reset()
+                return
+            for i, a in activity:
+                self._place(i, a, signal=True)
+        elif event == "remove":
+            self._release(activity_id)
+        elif event == "move":
+            self._release(activity_id)
+            self._place(activity_id, activity, signal=True)
+        elif event == "conflicts":
+            for i in activity:
+                if i in self.slots:
+                    row, col = self.slots.slots[i][0]
+                    self._cells_changed(row, row, col, [CONFLICT_ROLE])
+
+    def activity_id(self, index):
+        # id da atividade que ocupa a célula (início ou continuação)
+        return self.slots.at((index.row(), index.column()))
+
+    def anchors(self):
+        # (linha, coluna, linhas) de cada atividade na grade
+        for (row, col), activity_id in self._anchors.items():
+            yield row, col, len(self.slots.slots[activity_id])
+
+    # QAbstractTableModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(DAYS)
+
+    def span(self, index):
+        activity_id = self._anchors.get((index.row(), index.column()))
+        if activity_id is None:
+            return QSize(1, 1)
+        return QSize(1, len(self.slots.slots[activity_id]))
+
+    def data(self, index, role=Qt.DisplayRole):
+        activity_id = self._anchors.get((index.row(), index.column()))
+        if activity_id is None:
+            return None
+        if role == ID_ROLE:
+            return activity_id
+        activity = self.schedule.get(activity_id)
+        if role == ACTIVITY_ROLE:
+            return activity
+        if role == CONFLICT_ROLE:
+            return bool(self.schedule.conflicts_of(activity_id))
+        if role == Qt.DisplayRole:
+            return f"{activity.code}\n{activity.title}"
+        if role == Qt.ToolTipRole:
+            return f"{activity.code} – {activity.title}\n{activity.time_str()}"
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return DAYS[section]
+        start = self.day_start + section * self.slot_minutes
+        end = min(start + self.slot_minutes, self.day_end)
+        return slot_label(start, end, self.slot_minutes)
+
+    def flags(self, index):
+        if (index.row(), index.column()) in self._anchors:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled
+
+
+class CardDelegate(QStyledItemDelegate):
+    # Pinta o cartão da atividade; células vazias ficam só com a grade
+    def __init__(self, fonts, parent=None):
+        super().__init__(parent)
+        self.fonts = fonts
+
+    def paint(self, painter, option, index):
+        activity = index.data(ACTIVITY_ROLE)
+        if activity is None:
+            return
+        m = CARD_MARGIN
+        rect = option.rect.adjusted(m, m, -m, -m)
+        if rect.width() <= 0 or rect.height() <= 0:
+            return
+        conflict = bool(index.data(CONFLICT_ROLE))
+        font = option.font
+        size = font.pointSize()
+        line_h = fontcache.metrics_for(font, option.widget).lineSpacing()
+        text_color = option.palette.text().color()
+        dpr = painter.device().devicePixelRatioF()
+        base = QColor(activity.color_hex)
+        grad = QColor(activity.gradient_color)
+        time = activity.time_str()
+        key = (
+            activity.code,
+            activity.title,
+            time,
+            base.rgba(),
+            grad.rgba(),
+            conflict,
+            rect.width(),
+            rect.height(),
+            dpr,
+            size,
+            text_color.rgba(),
+        )
+        local = QRect(0, 0, rect.width(), rect.height())
+        pixmap = cardcache.cache.card(
+            key,
+            rect.size(),
+            dpr,
+            lambda p: paint_card(
+                p,
+                local.adjusted(1, 1, -1, -1),
+                activity.code,
+                activity.title,
+                time,
+                base,
+                grad,
+                self.fonts,
+                size,
+                line_h,
+                text_color,
+                conflict,
+            ),
+        )
+        painter.drawPixmap(rect.topLeft(), pixmap)
+        if option.state & QStyle.State_Selected:
+            painter.save()
+            painter.setPen(QPen(option.palette.highlight().color(), 2))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 10, 10)
+            painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(120, 60)
+
+
+class TimetableView(QTableView):
+    activityClicked = pyqtSignal(int)
+
+    def __init__(self, fonts, parent=None, row_height=60):
+        super().__init__(parent)
+        self.setItemDelegate(CardDelegate(fonts, self))
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setGridStyle(Qt.SolidLine)
+        self.setWordWrap(False)
+        # Tamanhos fixos: o cabeçalho não mede conteúdo ao rolar nem ao editar
+        rows = self.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(row_height)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.clicked.connect(self._clicked)
+
+    def setModel(self, model):
+        old = self.model()
+        if isinstance(old, TimetableModel):
+            old.spanAdded.disconnect(self._span_added)
+            old.spanRemoved.disconnect(self._span_removed)
+            old.modelReset.disconnect(self._sync_spans)
+        super().setModel(model)
+        model.spanAdded.connect(self._span_added)
+        model.spanRemoved.connect(self._span_removed)
+        model.modelReset.connect(self._sync_spans)
+        self._sync_spans()
+
+    def _sync_spans(self):
+        self.clearSpans()
+        for row, col, span in self.model().anchors():
+            if span > 1:
+                self.setSpan(row, col, span, 1)
+
+    def _span_added(self, row, col, span):
+        if span > 1:
+            self.setSpan(row, col, span, 1)
+
+    def _span_removed(self, row, col):
+        if self.rowSpan(row, col) > 1:
+            self.setSpan(row, col, 1, 1)
+
+    def _clicked(self, index):
+        activity_id = index.data(ID_ROLE)
+        if activity_id is not None:
+            self.activityClicked.emit(activity_id)
@@ -0,0 +1,5 @@
+# Os módulos do projeto ficam na raiz do repositório
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,59 @@
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+from PyQt5.QtTest import QTest
+
+from autosave import AutoSaver
+from model import Activity, Schedule
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait_for(condition, timeout=2000):
+    for _ in range(timeout // 10):
+        if condition():
+            return True
+        QTest.qWait(10)
+    return condition()
+
+
+def test_without_snapshot_save_gets_no_state():
+    schedule = Schedule()
+    calls = []
+    saver = AutoSaver(
+        schedule, lambda *args: calls.append(args), delay_ms=10, snapshot=False
+    )
+    schedule.add(Activity(0, 480, 600, "A", "Turma"))
+    schedule.add(Activity(1, 480, 600, "B", "Turma"))
+    assert wait_for(lambda: not saver.dirty)
+    assert calls == [()]
+
+
+def test_snapshot_is_passed_to_save():
+    schedule = Schedule()
+    calls = []
+    saver = AutoSaver(schedule, calls.append, delay_ms=10, pool=QThreadPool())
+    activity_id = schedule.add(Activity(0, 480, 600, "A", "Turma"))
+    assert wait_for(lambda: not saver.dirty)
+    assert calls == [((activity_id, schedule.get(activity_id)),)]
+
+
+def test_failures_are_retried_a_limited_number_of_times():
+    schedule = Schedule()
+    attempts = []
+    abandoned = []
+
+    def save():
+        attempts.append(1)
+        raise OSError("disco cheio")
+
+    saver = AutoSaver(schedule, save, delay_ms=5, snapshot=False, max_retries=2)
+    saver.abandoned.connect(abandoned.append)
+    schedule.add(Activity(0, 480, 600, "A", "Turma"))
+    assert wait_for(lambda: abandoned, timeout=3000)
+    QTest.qWait(100)
+    assert len(attempts) == 3 and abandoned == ["disco cheio"]
+    assert saver.dirty
+
+    # Uma nova edição dá outra chance
+    schedule.add(Activity(1, 480, 600, "B", "Turma"))
+    assert wait_for(lambda: len(attempts) == 4)
+    assert not saver.flush()
@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+import pytest
+
+from columnar import ActivityTable
+from model import PASTEL_COLORS, Activity, pack_color
+
+
+def random_activities(rng, n):
+    activities = []
+    for i in range(n):
+        name, color = rng.choice(PASTEL_COLORS)
+        start = rng.randrange(0, 1380, 10)
+        activities.append(
+            Activity(
+                rng.randrange(7),
+                start,
+                start + rng.randrange(10, 60, 10),
+                f"{rng.choice(('MAT', 'FIS', 'QUI'))}{i % 40}",
+                f"Turma {i % 25}",
+                pack_color(color),
+                name,
+            )
+        )
+    return activities
+
+
+def test_round_trip_and_indexing():
+    activities = random_activities(random.Random(11), 3000)  # passa da capacidade
+    table = ActivityTable.from_activities(activities[:1000])
+    table.extend(activities[1000:])
+    assert len(table) == 3000
+    assert list(table) == activities
+    assert table[5] == activities[5] and table[-1] == activities[-1]
+    assert list(table[10:20]) == activities[10:20]
+    assert list(table[[3, 1, 2]]) == [activities[3], activities[1], activities[2]]
+    with pytest.raises(IndexError):
+        table[3000]
+    assert len(table.strings) < 2 * 3000  # textos internados
+
+
+def test_filters_match_brute_force():
+    activities = random_activities(random.Random(12), 2000)
+    table = ActivityTable.from_activities(activities)
+
+    def rows(mask):
+        return np.flatnonzero(mask).tolist()
+
+    def expected(predicate):
+        return [i for i, a in enumerate(activities) if predicate(a)]
+
+    assert rows(table.on_day(3)) == expected(lambda a: a.day == 3)
+    assert rows(table.overlapping(600, 660)) == expected(
+        lambda a: a.start < 660 and a.end > 600
+    )
+    assert rows(table.within(480, 720)) == expected(
+        lambda a: a.start >= 480 and a.end <= 720
+    )
+    assert rows(table.with_color("Azul")) == expected(lambda a: a.color_name == "Azul")
+    assert rows(table.with_color("#87c55f")) == expected(
+        lambda a: a.color == 0x87C55F
+    )
+    assert rows(table.code_prefix("MAT1")) == expected(
+        lambda a: a.code.startswith("MAT1")
+    )
+    mask = table.on_day(1) & table.overlapping(480, 600)
+    assert list(table.where(mask)) == [
+        a for a in activities if a.day == 1 and a.start < 600 and a.end > 480
+    ]
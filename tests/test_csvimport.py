@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from csvimport import find_conflicts, normalize, parse_day, parse_time, read_csv
+
+
+@pytest.mark.parametrize(
+    "text, day",
+    [
+        ("Seg", 0),
+        ("segunda-feira", 0),
+        ("TER", 1),
+        ("Sábado", 5),
+        ("SAB", 5),
+        ("dom", 6),
+        ("Mon", 0),
+        ("sunday", 6),
+        ("3", 3),
+        ("7", -1),
+        ("feriado", -1),
+        ("", -1),
+    ],
+)
+def test_parse_day(text, day):
+    assert parse_day(text) == day
+
+
+@pytest.mark.parametrize(
+    "text, minutes",
+    [
+        ("8:00", 480),
+        ("08:30", 510),
+        ("0800", 480),
+        ("8h", 480),
+        ("8h30", 510),
+        (" 13H15 ", 795),
+        ("24:00", 1440),
+        ("24:30", -1),
+        ("8:75", -1),
+        ("oito", -1),
+    ],
+)
+def test_parse_time(text, minutes):
+    assert parse_time(text) == minutes
+
+
+def test_normalize():
+    values = ["8:00", "9h", "8:00", "x"]
+    assert normalize(values, parse_time).tolist() == [480, 540, 480, -1]
+
+
+def write_rows(path, rows, header=("codigo", "titulo", "dia", "inicio", "fim")):
+    lines = [";".join(header)] + [";".join(map(str, row)) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_read_csv_reports_bad_rows(tmp_path):
+    path = write_rows(
+        tmp_path / "turmas.csv",
+        [
+            ("MAT1", "Cálculo", "Seg", "8:00", "10:00"),
+            ("FIS1", "Física", "Qua", "10h", "12h"),
+            ("QUI1", "Química", "Feriado", "8:00", "9:00"),
+            ("BIO1", "Biologia", "Ter", "10:00", "9:00"),
+        ],
+    )
+    result = read_csv(path)
+    table = result.table
+    assert len(table) == 2
+    assert table.day.tolist() == [0, 2]
+    assert table.start.tolist() == [480, 600]
+    assert [line for line, _ in result.errors] == [4, 5]
+
+
+def greedy(day, start, end):
+    # Referência: na ordem (início, fim), recusa quem começa antes do maior fim
+    # entre as mantidas do mesmo dia
+    rejected = set()
+    kept_end = {}
+    for row in sorted(range(len(day)), key=lambda r: (day[r], start[r], end[r])):
+        if start[row] < kept_end.get(day[row], -1):
+            rejected.add(row)
+        else:
+            kept_end[day[row]] = max(kept_end.get(day[row], -1), end[row])
+    return rejected
+
+
+def test_find_conflicts_matches_greedy(tmp_path):
+    rng = random.Random(19)
+    rows = []
+    for i in range(400):
+        start = rng.randrange(420, 1200, 15)
+        end = start + rng.choice((30, 60, 90, 120))
+        begin = f"{start // 60}{start % 60:02d}"  # formato 0800
+        finish = f"{end // 60}h{end % 60:02d}"  # formato 8h30
+        rows.append((f"C{i}", "Turma", rng.randrange(3), begin, finish))
+    table = read_csv(write_rows(tmp_path / "turmas.csv", rows)).table
+    day, start, end = (c.tolist() for c in (table.day, table.start, table.end))
+
+    rejected, partners = find_conflicts(table)
+    assert set(rejected.tolist()) == greedy(day, start, end)
+    for row, partner in zip(rejected.tolist(), partners.tolist()):
+        assert day[row] == day[partner]
+        assert start[partner] <= start[row] < end[partner]
@@ -0,0 +1,63 @@
+import random
+
+from freetime import busy_counts, common_free_windows, occupancy_matrix
+from model import Activity
+from occupancy import WeekOccupancy
+
+
+def random_member(rng):
+    activities = []
+    for _ in range(rng.randrange(12)):
+        start = rng.randrange(0, 1380, 5)
+        end = start + rng.randrange(5, 60, 5)
+        activities.append(Activity(rng.randrange(7), start, end, "C", "T"))
+    return activities
+
+
+def brute_windows(members, min_minutes, needed, start, end):
+    windows = []
+    for day in range(7):
+        run = None
+        for minute in range(start, end + 1):
+            free = minute < end and needed <= sum(
+                not any(
+                    a.day == day and a.start <= minute < a.end for a in activities
+                )
+                for activities in members
+            )
+            if free and run is None:
+                run = minute
+            elif not free and run is not None:
+                if minute - run >= min_minutes:
+                    windows.append((day, run, minute))
+                run = None
+    return windows
+
+
+def test_matrix_matches_occupancy():
+    rng = random.Random(6)
+    members = [random_member(rng) for _ in range(5)]
+    weeks = [WeekOccupancy.from_activities(m) for m in members]
+    matrix = occupancy_matrix(weeks, 427, 1013)  # limites fora de um byte
+    assert matrix.shape == (5, 7, 1013 - 427)
+    for k, week in enumerate(weeks):
+        for day in range(7):
+            expected = [week.is_occupied(day, m) for m in range(427, 1013)]
+            assert matrix[k, day].tolist() == expected
+    counts = busy_counts(weeks, 427, 1013)
+    assert (counts == matrix.sum(axis=0)).all()
+
+
+def test_windows_match_brute_force():
+    rng = random.Random(7)
+    for _ in range(10):
+        members = [random_member(rng) for _ in range(rng.randint(1, 6))]
+        weeks = [WeekOccupancy.from_activities(m) for m in members]
+        total = len(members)
+        for quorum, needed in ((None, total), (1, 1), (0.5, -(-total // 2))):
+            got = common_free_windows(weeks, 30, quorum, 420, 1260)
+            assert got == brute_windows(members, 30, needed, 420, 1260)
+
+
+def test_no_members():
+    assert common_free_windows([], 30) == []
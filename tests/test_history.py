@@ -0,0 +1,96 @@
+import random
+
+from history import History
+from model import Activity, Schedule
+
+
+def activity(day, start, end, code="C"):
+    return Activity(day, start, end, code, "Turma")
+
+
+def state(schedule):
+    return dict(schedule.activities)
+
+
+def test_undo_and_redo_each_kind_of_edit():
+    schedule = Schedule()
+    history = History(schedule)
+    states = [state(schedule)]
+    a = schedule.add(activity(0, 480, 600, "A"))
+    states.append(state(schedule))
+    schedule.add_many([activity(1, 480, 600, "B"), activity(2, 480, 600, "C")])
+    states.append(state(schedule))
+    schedule.move(a, 3, 420, 540)
+    states.append(state(schedule))
+    schedule.remove(a + 1)
+    states.append(state(schedule))
+    assert len(history) == 4
+
+    for expected in reversed(states[:-1]):
+        assert history.undo()
+        assert state(schedule) == expected
+    assert not history.undo() and not history.can_undo()
+    for expected in states[1:]:
+        assert history.redo()
+        assert state(schedule) == expected
+    assert not history.redo()
+
+
+def test_new_edit_clears_redo():
+    schedule = Schedule()
+    history = History(schedule)
+    schedule.add(activity(0, 480, 600, "A"))
+    schedule.add(activity(1, 480, 600, "B"))
+    history.undo()
+    assert history.can_redo()
+    schedule.add(activity(2, 480, 600, "C"))
+    assert not history.can_redo() and not history.redo()
+    assert sorted(a.code for a in schedule.activities.values()) == ["A", "C"]
+    history.undo()
+    history.undo()
+    assert state(schedule) == {}
+
+
+def test_undo_keeps_ids_and_limit_drops_oldest():
+    schedule = Schedule()
+    history = History(schedule, limit=2)
+    ids = [schedule.add(activity(d, 480, 600)) for d in range(3)]
+    schedule.remove(ids[1])
+    history.undo()
+    assert schedule.get(ids[1]) == activity(1, 480, 600)
+    assert len(history) == 1
+    history.undo()
+    assert not history.undo()
+    assert sorted(schedule.activities) == ids[:2]
+
+
+def test_random_edits_round_trip():
+    rng = random.Random(9)
+    schedule = Schedule()
+    history = History(schedule)
+    states = [state(schedule)]
+    for n in range(300):
+        ids = list(schedule.activities)
+        op = rng.random()
+        day, start = rng.randrange(7), rng.randrange(0, 1380, 60)
+        if op < 0.4 or not ids:
+            if schedule.is_free(day, start, start + 60):
+                schedule.add(activity(day, start, start + 60, f"C{n}"))
+        elif op < 0.6:
+            items = [activity(rng.randrange(7), s, s + 30) for s in (0, 30, 60)]
+            schedule.add_many(items)
+        elif op < 0.8:
+            activity_id = rng.choice(ids)
+            if schedule.is_free(day, start, start + 60):
+                schedule.move(activity_id, day, start, start + 60)
+        else:
+            schedule.remove(rng.choice(ids))
+        if len(history) == len(states):  # a edição entrou no histórico
+            states.append(state(schedule))
+
+    for expected in reversed(states[:-1]):
+        history.undo()
+        assert state(schedule) == expected
+    for expected in states[1:]:
+        history.redo()
+        assert state(schedule) == expected
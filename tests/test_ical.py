@@ -0,0 +1,98 @@
+import datetime
+import io
+
+from ical import event_activities, import_ics, iter_events, write_ics
+from model import Activity, Schedule
+from recurrence import Recurrence
+
+MONDAY = datetime.date(2026, 1, 5)
+WEEK = datetime.timedelta(weeks=1)
+UNTIL = MONDAY + 30 * WEEK
+
+
+def dates(activity):
+    rule = activity.recurrence or Recurrence(MONDAY)
+    return list(rule.occurrences(activity.day, MONDAY, UNTIL))
+
+
+def events(text):
+    return [event for event, _ in iter_events(io.BytesIO(text.encode()))]
+
+
+def test_export_import_round_trip(tmp_path):
+    schedule = Schedule()
+    originals = [
+        Activity(0, 480, 600, "MAT1", "Cálculo, turma A", 0x66C5CC, "Azul"),
+        Activity(
+            2, 600, 690, "FIS1", "Física; lab", 0xF6CF71, None, Recurrence(MONDAY)
+        ),
+        Activity(
+            3,
+            420,
+            480,
+            "QUI1",
+            "Química",
+            0x87C55F,
+            "Verde",
+            Recurrence(MONDAY, MONDAY + 12 * WEEK, 2, [MONDAY + 5 * WEEK]),
+        ),
+        # start_date numa segunda, atividade na sexta
+        Activity(4, 780, 900, "BIO1", "Biologia", 0xDBDBDB, None, Recurrence(MONDAY)),
+        Activity(1, 1320, 1440, "NOT1", "Noturno", 0xDBDBDB, None, None),
+    ]
+    for a in originals:
+        schedule.add(a)
+    path = tmp_path / "cronograma.ics"
+    with open(path, "w", encoding="utf-8", newline="") as fp:
+        write_ics(schedule.snapshot(), fp, reference=MONDAY)
+
+    imported = Schedule()
+    summary = import_ics(str(path), imported)
+    assert summary.added == len(originals) and not summary.skipped
+    got = sorted(imported.activities.values(), key=lambda a: a.code)
+    for original, copy in zip(sorted(originals, key=lambda a: a.code), got):
+        fields = ("day", "start", "end", "code", "title", "color", "color_name")
+        for name in fields:
+            assert getattr(copy, name) == getattr(original, name)
+        assert dates(copy) == dates(original)
+
+
+def test_count_spans_all_byday_days():
+    # COUNT=5 com BYDAY=MO,WE: seg 5, qua 7, seg 12, qua 14, seg 19
+    (event,) = events(
+        "BEGIN:VEVENT\r\n"
+        "DTSTART:20260105T080000\r\n"
+        "DTEND:20260105T100000\r\n"
+        "RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=5\r\n"
+        "SUMMARY:MAT1 - Cálculo\r\n"
+        "END:VEVENT\r\n"
+    )
+    monday, wednesday = event_activities(event)
+    assert monday.day == 0 and wednesday.day == 2
+    assert [d.day for d in monday.occurrences()] == [5, 12, 19]
+    assert [d.day for d in wednesday.occurrences()] == [7, 14]
+
+
+def test_all_day_events_are_skipped(tmp_path):
+    path = tmp_path / "feriados.ics"
+    path.write_text(
+        "BEGIN:VCALENDAR\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:feriado\r\n"
+        "DTSTART;VALUE=DATE:20260216\r\n"
+        "SUMMARY:Carnaval\r\n"
+        "END:VEVENT\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:aula\r\n"
+        "DTSTART:20260217T080000\r\n"
+        "DURATION:PT1H30M\r\n"
+        "SUMMARY:MAT1 - Cálculo\r\n"
+        "END:VEVENT\r\n"
+        "END:VCALENDAR\r\n",
+        encoding="utf-8",
+    )
+    schedule = Schedule()
+    summary = import_ics(str(path), schedule)
+    assert summary.skipped == [("feriado", "evento de dia inteiro")]
+    (activity,) = schedule.activities.values()
+    assert (activity.day, activity.start, activity.end) == (1, 480, 570)
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from intervals import IntervalIndex
+
+
+def test_overlapping_is_half_open():
+    index = IntervalIndex()
+    index.add(480, 600, "a")
+    index.add(600, 660, "b")
+    assert index.overlapping(540, 600) == ["a"]
+    assert index.overlapping(600, 601) == ["b"]
+    assert index.overlapping(660, 700) == []
+
+
+def test_remove_missing_raises():
+    index = IntervalIndex()
+    index.add(0, 10, 1)
+    with pytest.raises(KeyError):
+        index.remove(0, 10, 2)
+
+
+def test_matches_brute_force():
+    # Durações de todas as classes, de 1 minuto ao dia inteiro
+    rng = random.Random(2)
+    index = IntervalIndex()
+    entries = set()
+    for key in range(600):
+        start = rng.randrange(1440)
+        end = min(1440, start + rng.choice((1, 5, 30, 90, 300, 1440)))
+        entries.add((start, end, key))
+        if key % 2:
+            index.add(start, end, key)
+    index.update([e for e in entries if e[2] % 2 == 0])
+    for entry in rng.sample(sorted(entries), 200):
+        index.remove(*entry)
+        entries.discard(entry)
+
+    assert len(index) == len(entries)
+    assert list(index) == sorted(entries)
+    for _ in range(300):
+        start = rng.randrange(1440)
+        end = start + rng.randrange(1, 120)
+        expected = sorted(e for e in entries if e[0] < end and start < e[1])
+        assert index.overlapping_entries(start, end) == expected
+        assert index.covers(start, end) == any(
+            s <= start and end <= e for s, e, _ in entries
+        )
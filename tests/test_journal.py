@@ -0,0 +1,136 @@
+import datetime
+import os
+
+import pytest
+
+from journal import Journal
+from model import Activity, Schedule
+from recurrence import Recurrence
+
+MONDAY = datetime.date(2026, 1, 5)
+
+
+def activity(day, start, end, code="C", recurrence=None):
+    return Activity(day, start, end, code, "Turma", 0x66C5CC, "Azul", recurrence)
+
+
+def state(schedule):
+    return dict(schedule.activities)
+
+
+def edit(schedule):
+    a = schedule.add(activity(0, 480, 600, "A"))
+    schedule.add_many(
+        [
+            activity(1, 480, 600, "B", Recurrence(MONDAY, MONDAY, 1)),
+            activity(2, 600, 660, "Sáb"),
+        ]
+    )
+    schedule.move(a, 3, 420, 480)
+    schedule.remove(a + 1)
+
+
+def test_recover_replays_journal(tmp_path):
+    base = str(tmp_path / "cronograma")
+    schedule = Schedule()
+    journal = Journal(base)
+    journal.attach(schedule)
+    edit(schedule)
+    journal.close()
+
+    assert Journal(base).exists()
+    assert state(Journal(base).recover()) == state(schedule)
+
+
+def test_recover_after_compaction(tmp_path):
+    base = str(tmp_path / "cronograma")
+    schedule = Schedule()
+    journal = Journal(base)
+    journal.attach(schedule)
+    edit(schedule)
+    journal.compact(wait=True)
+    schedule.add(activity(5, 480, 540, "D"))
+    journal.close()
+
+    recovered = Journal(base)
+    assert state(recovered.recover()) == state(schedule)
+    assert recovered.generation == 1
+    assert [g for g, _ in recovered._journals()] == [1]
+
+
+def test_torn_line_is_dropped_and_truncated(tmp_path):
+    base = str(tmp_path / "cronograma")
+    schedule = Schedule()
+    journal = Journal(base)
+    journal.attach(schedule)
+    schedule.add(activity(0, 480, 600, "A"))
+    expected = state(schedule)
+    journal.close()
+
+    path = journal.journal_path(0)
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'{"op": "add", "id": 7, "a": [1, 48')  # queda no meio da linha
+
+    recovered = Journal(base)
+    schedule = recovered.recover()
+    assert state(schedule) == expected
+    assert os.path.getsize(path) == size
+
+    # O diário continua utilizável depois do corte
+    recovered.attach(schedule)
+    schedule.add(activity(1, 480, 600, "B"))
+    recovered.close()
+    assert state(Journal(base).recover()) == state(schedule)
+
+
+def test_no_journal_yet(tmp_path):
+    assert not Journal(str(tmp_path / "cronograma")).exists()
+
+
+def test_compaction_by_size_while_editing(tmp_path):
+    base = str(tmp_path / "cronograma")
+    schedule = Schedule()
+    journal = Journal(base, fsync_every=4, compact_bytes=2000)
+    journal.attach(schedule)
+    ids = []
+    for i in range(700):
+        start = i // 7 * 10
+        ids.append(schedule.add(activity(i % 7, start, start + 10)))
+        if i % 50 == 0:
+            journal.flush()  # dá tempo ao escritor de compactar no meio
+    for activity_id in ids[::3]:
+        schedule.remove(activity_id)
+    journal.flush()
+    assert journal.generation > 1
+    journal.close()
+
+    assert state(Journal(base).recover()) == state(schedule)
+
+
+def test_flush_reports_writer_errors(tmp_path):
+    base = str(tmp_path / "cronograma")
+    schedule = Schedule()
+    journal = Journal(base)
+    journal.attach(schedule)
+    journal._file.close()  # gravação seguinte falha no escritor
+    schedule.add(activity(0, 480, 600, "A"))
+    with pytest.raises(ValueError):
+        journal.flush()
+
+
+def test_recover_in_overlap_mode(tmp_path):
+    base = str(tmp_path / "cronograma")
+    schedule = Schedule(allow_overlaps=True)
+    journal = Journal(base)
+    journal.attach(schedule)
+    a = schedule.add(activity(0, 480, 600, "A"))
+    b = schedule.add(activity(1, 480, 600, "B"))
+    schedule.move(b, 0, 540, 660)
+    schedule.add_many([activity(0, 500, 520, "C")])
+    journal.close()
+
+    recovered = Journal(base).recover(allow_overlaps=True)
+    assert state(recovered) == state(schedule)
+    assert recovered.conflict_graph == schedule.conflict_graph
+    assert recovered.conflicts_of(a) == {b, b + 1}
@@ -0,0 +1,202 @@
+import datetime
+import random
+
+import pytest
+
+from model import (
+    Activity,
+    ConflictError,
+    Schedule,
+    row_span,
+    ruler_marks,
+    slot_label,
+)
+from recurrence import Recurrence, rules_overlap
+
+MONDAY = datetime.date(2026, 1, 5)
+WEEK = datetime.timedelta(weeks=1)
+
+
+def activity(day, start, end, recurrence=None, code="C"):
+    return Activity(day, start, end, code, "Turma", recurrence=recurrence)
+
+
+def once(weeks, day=0):
+    date = MONDAY + weeks * WEEK + datetime.timedelta(days=day)
+    return Recurrence(date, date)
+
+
+def clash(a, b):
+    if not a.overlaps(b):
+        return False
+    return rules_overlap(a.day, a.recurrence, b.recurrence)
+
+
+def test_add_rejects_overlap_but_not_adjacent():
+    schedule = Schedule()
+    first = schedule.add(activity(0, 480, 600))
+    schedule.add(activity(0, 600, 660))
+    with pytest.raises(ConflictError) as error:
+        schedule.add(activity(0, 540, 620))
+    assert set(error.value.conflicts) == {first, first + 1}
+
+
+def test_dated_rules_clash_only_on_common_dates():
+    schedule = Schedule()
+    schedule.add(activity(0, 480, 600, once(1)))
+    schedule.add(activity(0, 480, 600, once(2)))
+    with pytest.raises(ConflictError):
+        schedule.add(activity(0, 500, 560, once(2)))
+    with pytest.raises(ConflictError):
+        schedule.add(activity(0, 500, 560))  # toda semana
+
+
+def test_remove_frees_slot_shared_by_dated_rules():
+    schedule = Schedule()
+    a = schedule.add(activity(0, 480, 600, once(1)))
+    schedule.add(activity(0, 480, 600, once(2)))
+    schedule.remove(a)
+    assert not schedule.is_free(0, 480, 600)
+    schedule.add(activity(0, 480, 600, once(1)))
+
+
+def test_suggest_slots_ignores_rules_of_other_weeks():
+    schedule = Schedule()
+    schedule.add(activity(0, 480, 600, once(1)))
+    schedule.add(activity(0, 600, 660))
+    dated = activity(0, 480, 600, once(2))
+    assert schedule.clashes(dated) == []
+    slots = schedule.suggest_slots(0, 480, 120, limit=2, recurrence=once(2))
+    assert slots == [(0, 480, 600), (1, 480, 600)]
+    # uma regra semanal encontra a da semana 1
+    assert schedule.suggest_slots(0, 480, 120, limit=1) == [(1, 480, 600)]
+
+
+def test_add_many_rejects_batch_and_existing_clashes():
+    schedule = Schedule()
+    existing = schedule.add(activity(1, 480, 600))
+    result = schedule.add_many(
+        [
+            activity(0, 480, 600),  # 0: aceita
+            activity(0, 540, 660),  # 1: choca com a linha 0
+            activity(1, 500, 520),  # 2: choca com a existente
+            activity(0, 600, 700),  # 3: encosta na 0; a 1 já foi recusada
+            activity(9, 0, 10),  # 4: dia inválido
+        ]
+    )
+    assert result.conflicts == {
+        1: [("batch", 0), ("batch", 3)],
+        2: [("activity", existing)],
+    }
+    assert set(result.errors) == {4}
+    assert result.rejected == [1, 2, 4]
+    assert len(result.accepted) == 2 and len(schedule) == 3
+
+
+def test_add_many_with_overlaps_links_conflicts():
+    schedule = Schedule(allow_overlaps=True)
+    existing = schedule.add(activity(0, 480, 600))
+    result = schedule.add_many([activity(0, 500, 520), activity(0, 510, 530)])
+    a, b = result.ids
+    assert schedule.conflicts_of(existing) == {a, b}
+    assert schedule.conflicts_of(a) == {existing, b}
+
+
+def test_conflict_graph_follows_move_and_remove():
+    schedule = Schedule(allow_overlaps=True)
+    a = schedule.add(activity(0, 480, 600))
+    b = schedule.add(activity(0, 540, 660))
+    c = schedule.add(activity(1, 480, 600))
+    assert schedule.conflict_graph == {a: {b}, b: {a}}
+
+    changes = []
+    schedule.subscribe(
+        lambda event, _, ids: changes.append(ids) if event == "conflicts" else None
+    )
+    schedule.move(c, 0, 550, 570)  # passa a chocar com a e b
+    assert schedule.conflict_graph == {a: {b, c}, b: {a, c}, c: {a, b}}
+    assert changes[-1] == {a, b, c}
+    schedule.move(b, 2, 540, 660)  # sai de perto
+    assert schedule.conflict_graph == {a: {c}, c: {a}}
+    assert changes[-1] == {a, b, c}
+    schedule.remove(a)
+    assert schedule.conflict_graph == {}
+    assert changes[-1] == {c}
+    assert schedule.conflicts_of(c) == set()
+
+
+def test_add_many_matches_greedy_brute_force():
+    # Linha a linha, em ordem de início: recusada se choca com uma existente
+    # ou com uma linha do lote já aceita
+    rng = random.Random(8)
+
+    def random_rule():
+        kind = rng.randrange(4)
+        if kind == 0:
+            return None
+        start = MONDAY + rng.randrange(70) * WEEK
+        if kind == 1:
+            return Recurrence(start, start)
+        if kind == 2:
+            end = start + rng.randrange(20) * WEEK
+            return Recurrence(start, end, rng.randint(1, 3))
+        # Mais longa que MAX_INDEXED_WEEKS: tratada como regra aberta
+        return Recurrence(start, start + rng.randrange(60, 120) * WEEK)
+
+    def random_activity():
+        day = rng.randrange(2)
+        start = rng.randrange(0, 1200, 30)
+        rule = random_rule()
+        if rule is not None:
+            shift = datetime.timedelta(days=day)
+            rule = Recurrence(
+                rule.start_date + shift, rule.end_date + shift, rule.interval
+            )
+        return activity(day, start, start + rng.choice((30, 60, 90, 240)), rule)
+
+    for _ in range(40):
+        schedule = Schedule()
+        kept = []
+        for _ in range(60):
+            a = random_activity()
+            if not any(clash(a, b) for b in kept):
+                schedule.add(a)
+                kept.append(a)
+        batch = [random_activity() for _ in range(80)]
+
+        result = schedule.add_many(batch)
+        accepted = []
+        order = sorted(
+            range(len(batch)), key=lambda r: (batch[r].start, batch[r].end, r)
+        )
+        for row in order:
+            a = batch[row]
+            if any(clash(a, b) for b in kept + [batch[r] for r in accepted]):
+                assert row in result.conflicts
+            else:
+                assert result.ids[row] is not None
+                accepted.append(row)
+        assert len(schedule) == len(kept) + len(accepted)
+
+
+def test_ruler_marks_and_labels():
+    assert slot_label(450, 540, 90) == "07:30 - 09:00"
+    assert slot_label(450, 480, 30) == "07:30"
+    marks = list(ruler_marks(360, 1260, 90))
+    assert marks[1] == (450, 540, "07:30 - 09:00")
+    assert marks[-1][1] == 1260
+    assert [m for m, _, _ in ruler_marks(420, 1320, 30, 500, 700)] == [
+        480,
+        540,
+        600,
+        660,
+    ]
+
+
+def test_row_span_clips_to_grid():
+    # grade 07:00–21:00 em linhas de 30 min: 28 linhas
+    assert row_span(activity(0, 480, 570), 420, 30, 28) == (2, 3)
+    assert row_span(activity(0, 485, 500), 420, 30, 28) == (2, 1)
+    assert row_span(activity(0, 360, 450), 420, 30, 28) == (0, 1)
+    assert row_span(activity(0, 1230, 1320), 420, 30, 28) == (27, 1)
+    assert row_span(activity(0, 1260, 1320), 420, 30, 28)[1] <= 0
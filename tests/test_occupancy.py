@@ -0,0 +1,63 @@
+import random
+
+from occupancy import MINUTES_PER_DAY, WeekOccupancy
+
+
+def random_week(rng, n=30):
+    # (bitset, conjunto de (dia, minuto)) com as mesmas ocupações
+    week, busy = WeekOccupancy(), set()
+    for _ in range(n):
+        day = rng.randrange(7)
+        start = rng.randrange(MINUTES_PER_DAY)
+        end = min(MINUTES_PER_DAY, start + rng.randrange(1, 300))
+        if rng.random() < 0.8:
+            week.occupy(day, start, end)
+            busy.update((day, m) for m in range(start, end))
+        else:
+            week.release(day, start, end)
+            busy.difference_update((day, m) for m in range(start, end))
+    return week, busy
+
+
+def runs(minutes):
+    found = []
+    for m in sorted(minutes):
+        if found and found[-1][1] == m:
+            found[-1][1] = m + 1
+        else:
+            found.append([m, m + 1])
+    return [tuple(r) for r in found]
+
+
+def test_queries_match_minute_sets():
+    rng = random.Random(5)
+    for _ in range(20):
+        week, busy = random_week(rng)
+        assert week.occupied_minutes() == len(busy)
+        for day in range(7):
+            minutes = {m for d, m in busy if d == day}
+            assert week.occupied_minutes(day) == len(minutes)
+            assert week.free_minutes(day) == MINUTES_PER_DAY - len(minutes)
+            assert list(week.intervals(day)) == runs(minutes)
+            free = set(range(MINUTES_PER_DAY)) - minutes
+            assert list(week.free_intervals(day)) == runs(free)
+            start = rng.randrange(MINUTES_PER_DAY - 60)
+            window = set(range(start, start + 60))
+            assert list(week.intervals(day, start, start + 60)) == runs(
+                minutes & window
+            )
+            assert week.is_free(day, start, start + 60) == (not minutes & window)
+            assert week.is_occupied(day, start) == (start in minutes)
+
+
+def test_set_operations_match_minute_sets():
+    rng = random.Random(6)
+    a, busy_a = random_week(rng)
+    b, busy_b = random_week(rng)
+    everything = {(d, m) for d in range(7) for m in range(MINUTES_PER_DAY)}
+    assert (a | b).occupied_minutes() == len(busy_a | busy_b)
+    assert (a & b).occupied_minutes() == len(busy_a & busy_b)
+    assert (~a).occupied_minutes() == len(everything - busy_a)
+    assert a.common_free(b) == ~(a | b)
+    assert a.overlaps(b) == bool(busy_a & busy_b)
+    assert a.copy() == a and a.copy() is not a
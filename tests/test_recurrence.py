@@ -0,0 +1,100 @@
+import datetime
+import random
+
+import pytest
+
+from recurrence import (
+    Recurrence,
+    common_dates,
+    date_of,
+    decode,
+    encode,
+    rules_overlap,
+    week_of,
+)
+
+MONDAY = datetime.date(2026, 1, 5)
+WEEK = datetime.timedelta(weeks=1)
+
+
+def brute_common(day, a, b, until):
+    date = date_of(week_of(MONDAY), day)
+    found = []
+    while date <= until:
+        if a.occurs_on(date) and b.occurs_on(date):
+            found.append(date)
+        date += WEEK
+    return found
+
+
+def test_week_and_date_round_trip():
+    assert date_of(week_of(MONDAY), 0) == MONDAY
+    assert date_of(week_of(MONDAY), 6) == MONDAY + datetime.timedelta(days=6)
+
+
+def test_incompatible_phases_never_meet():
+    # Quinzenais em semanas alternadas: fases diferentes módulo 2
+    a = Recurrence(MONDAY, interval=2)
+    b = Recurrence(MONDAY + WEEK, interval=2)
+    assert list(common_dates(0, a, b)) == []
+    assert not rules_overlap(0, a, b)
+
+
+def test_coprime_intervals_meet_on_crt_week():
+    # w ≡ 0 (mod 2) e w ≡ 1 (mod 3), contando da semana de MONDAY: w = 4, 10...
+    a = Recurrence(MONDAY, MONDAY + 20 * WEEK, interval=2)
+    b = Recurrence(MONDAY + WEEK, MONDAY + 20 * WEEK, interval=3)
+    assert list(common_dates(2, a, b)) == [
+        MONDAY + n * WEEK + datetime.timedelta(days=2) for n in (4, 10, 16)
+    ]
+
+
+def test_exceptions_remove_the_only_common_date():
+    date = MONDAY + 3 * WEEK
+    a = Recurrence(MONDAY, date)
+    b = Recurrence(date, MONDAY + 6 * WEEK)
+    assert rules_overlap(0, a, b)
+    b = Recurrence(date, MONDAY + 6 * WEEK, exceptions=[date])
+    assert not rules_overlap(0, a, b)
+
+
+def test_disjoint_ranges():
+    a = Recurrence(MONDAY, MONDAY + 2 * WEEK)
+    b = Recurrence(MONDAY + 3 * WEEK)
+    assert list(common_dates(0, a, b)) == []
+
+
+def test_rule_without_dates():
+    rule = Recurrence(MONDAY, MONDAY + 2 * WEEK)
+    assert list(common_dates(1, None, rule)) == list(rule.occurrences(1))
+    assert rules_overlap(1, None, None)
+    with pytest.raises(ValueError):
+        next(common_dates(1, None, None))
+
+
+def test_common_dates_match_brute_force():
+    rng = random.Random(8)
+    until = MONDAY + 80 * WEEK
+
+    def random_rule():
+        start = MONDAY + rng.randrange(20) * WEEK
+        start += datetime.timedelta(days=rng.randrange(7))
+        end = start + rng.randrange(60) * WEEK if rng.random() < 0.8 else None
+        exceptions = [start + rng.randrange(10) * WEEK for _ in range(3)]
+        return Recurrence(start, end, rng.randint(1, 4), exceptions)
+
+    for _ in range(500):
+        day = rng.randrange(7)
+        a, b = random_rule(), random_rule()
+        if a.end_date is None and b.end_date is None:
+            a = Recurrence(a.start_date, until, a.interval, a.exceptions)
+        expected = brute_common(day, a, b, until)
+        assert [d for d in common_dates(day, a, b) if d <= until] == expected
+        assert rules_overlap(day, a, b) == bool(expected)
+
+
+def test_encode_decode():
+    rule = Recurrence(MONDAY, MONDAY + 9 * WEEK, 3, [MONDAY + 3 * WEEK])
+    assert decode(encode(rule)) == rule
+    assert decode(encode(Recurrence(MONDAY))) == Recurrence(MONDAY)
+    assert encode(None) is None and decode(None) is None
@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+
+from model import Activity
+from recurrence import Recurrence
+from snapshot import HEADER, Archive, SnapshotError, is_archive, write_archive
+
+MONDAY = datetime.date(2026, 1, 5)
+
+
+def items(n, code="C"):
+    rule = Recurrence(MONDAY, MONDAY + datetime.timedelta(weeks=9), 2, [MONDAY])
+    return [
+        (
+            i + 1,
+            Activity(
+                i % 7,
+                i % 20 * 60,
+                i % 20 * 60 + 45,
+                f"{code}{i}",
+                "Álgebra",
+                0x66C5CC if i % 2 else 0xF6CF71,
+                "Azul" if i % 2 else None,
+                rule if i % 3 == 0 else None,
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "arquivo.snapshot")
+    schedules = [("Sala 1", items(10)), ("Sala 2", items(5000, "D")), ("Vazia", [])]
+    write_archive(path, schedules, tag=3)
+
+    assert is_archive(path)
+    with Archive(path) as archive:
+        archive.verify()
+        assert archive.tag == 3
+        assert archive.names() == ["Sala 1", "Sala 2", "Vazia"]
+        for i, (_, expected) in enumerate(schedules):
+            assert list(archive.items(i, batch=64)) == expected
+        assert dict(archive.load("Sala 1").activities) == dict(items(10))
+
+
+@pytest.mark.parametrize("position", [56, HEADER.size + 4])  # tag, um registro
+def test_corruption_fails_verify(tmp_path, position):
+    # Os registros e o próprio cabeçalho entram no CRC
+    path = str(tmp_path / "arquivo.snapshot")
+    write_archive(path, [("Sala", items(20))])
+    with open(path, "r+b") as f:
+        data = bytearray(f.read())
+        data[position] ^= 0xFF
+        f.seek(0)
+        f.write(data)
+    with Archive(path) as archive, pytest.raises(SnapshotError):
+        archive.verify()
+
+
+def test_close_with_live_iterator(tmp_path):
+    path = str(tmp_path / "arquivo.snapshot")
+    write_archive(path, [("Sala", items(100))])
+    archive = Archive(path)
+    live = archive.items(0, batch=10)
+    next(live)
+    archive.close()
+    with pytest.raises(SnapshotError):
+        list(live)
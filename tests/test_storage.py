@@ -0,0 +1,132 @@
+import datetime
+import random
+import threading
+
+from model import Activity, Schedule
+from recurrence import Recurrence
+from storage import SqliteStore
+
+MONDAY = datetime.date(2026, 1, 5)
+
+
+def activity(i):
+    rule = Recurrence(MONDAY, None, 2, [MONDAY]) if i % 3 == 0 else None
+    return Activity(
+        i % 7, i % 12 * 60, i % 12 * 60 + 50, f"C{i}", "Turma", 0x66C5CC, "Azul", rule
+    )
+
+
+def test_file_database_uses_wal(tmp_path):
+    store = SqliteStore(str(tmp_path / "cronograma.db"))
+    assert store.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+
+
+def test_keyset_pagination_visits_every_row_once(tmp_path):
+    store = SqliteStore(str(tmp_path / "cronograma.db"))
+    a, b = store.schedule_id("a"), store.schedule_id("b")
+    rng = random.Random(14)
+    ids_a = sorted(rng.sample(range(1, 10_000), 2_345))
+    ids_b = sorted(rng.sample(range(1, 10_000), 1_000))
+    store.insert_many(a, [(i, activity(i)) for i in ids_a])
+    store.insert_many(b, [(i, activity(i)) for i in ids_b])
+
+    rows = list(store.iter_activities(a, batch=100))
+    assert [i for _, i, _ in rows] == ids_a
+    assert all(s == a and x == activity(i) for s, i, x in rows)
+    everything = [(s, i) for s, i, _ in store.iter_activities(batch=100)]
+    assert everything == [(a, i) for i in ids_a] + [(b, i) for i in ids_b]
+    assert len(list(store.iter_activities(b, batch=1_000))) == 1_000
+    store.close()
+
+
+def test_save_and_load_schedule():
+    store = SqliteStore()
+    schedule_id = store.schedule_id("principal")
+    schedule = Schedule()
+    for i in range(84):
+        schedule.add(activity(i))  # (dia, hora) distintos
+    store.save_schedule(schedule_id, schedule)
+    loaded = store.load_schedule(schedule_id)
+    assert dict(loaded.activities) == dict(schedule.activities)
+
+    store.save_schedule(schedule_id, [(1, activity(0))])  # substitui tudo
+    assert [i for _, i, _ in store.iter_activities(schedule_id)] == [1]
+
+
+def test_sync_follows_edits():
+    store = SqliteStore()
+    schedule_id = store.schedule_id("principal")
+    schedule = Schedule()
+    store.sync(schedule_id, schedule)
+    a = schedule.add(Activity(0, 480, 600, "A", "Turma"))
+    schedule.add_many([Activity(1, 480, 600, "B", "Turma")])
+    schedule.move(a, 2, 420, 480)
+    schedule.remove(a + 1)
+    assert dict(store.load_schedule(schedule_id).activities) == dict(
+        schedule.activities
+    )
+
+
+def test_conflicts_and_free_slots():
+    store = SqliteStore()
+    schedule_id = store.schedule_id("principal")
+    items = [(1, Activity(0, 480, 600, "A", "T")), (2, Activity(0, 660, 720, "B", "T"))]
+    store.insert_many(schedule_id, items)
+    assert store.conflicts(schedule_id, 0, 590, 670) == [1, 2]
+    assert store.conflicts(schedule_id, 0, 600, 660) == []
+    assert store.free_slots(schedule_id, 0, 60, 420, 780) == [
+        (420, 480),
+        (600, 660),
+        (720, 780),
+    ]
+
+
+def test_concurrent_readers_and_writers(tmp_path):
+    store = SqliteStore(str(tmp_path / "cronograma.db"))
+    schedule_id = store.schedule_id("principal")
+    store.insert_many(schedule_id, [(i, activity(i)) for i in range(1, 3_001)])
+    abandoned = store.iter_activities(schedule_id, batch=10)
+    next(abandoned)  # gerador parado no meio não segura o lock
+    errors = []
+
+    def writer(n):
+        try:
+            for k in range(20):
+                base = 10_000 * (n + 1) + k * 10
+                items = [(base + j, activity(j)) for j in range(10)]
+                store.insert_many(schedule_id, items)
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(5):
+                ids = [i for _, i, _ in store.iter_activities(schedule_id, batch=250)]
+                assert ids == sorted(set(ids))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    threads += [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    assert not any(t.is_alive() for t in threads) and not errors
+    assert len(list(store.iter_activities(schedule_id))) == 3_000 + 4 * 200
+    store.close()
+
+
+def test_overlap_mode_is_stored_with_the_schedule():
+    store = SqliteStore()
+    schedule_id = store.schedule_id("principal")
+    assert not store.allow_overlaps(schedule_id)
+    schedule = Schedule(allow_overlaps=True)
+    schedule.add(Activity(0, 480, 600, "A", "T"))
+    schedule.add(Activity(0, 540, 660, "B", "T"))
+    store.save_schedule(schedule_id, schedule)
+
+    assert store.allow_overlaps(schedule_id)
+    loaded = store.load_schedule(schedule_id)
+    assert loaded.allow_overlaps and loaded.conflict_graph == schedule.conflict_graph